@@ -22,37 +22,49 @@ import re
 import sys
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
-from functools import total_ordering, wraps
-from threading import Lock
-from typing import Optional
+from functools import cached_property, lru_cache, total_ordering, wraps
+from threading import Event, Lock, Thread
+from typing import List, Optional
 from weakref import WeakKeyDictionary
 
 import eth_utils
-import pkg_resources
 from hexbytes import HexBytes
 
 from web3 import HTTPProvider, Web3
 from web3._utils.contracts import get_function_info, encode_abi
-from web3._utils.events import get_event_data
-from web3.exceptions import TransactionNotFound
+from web3.exceptions import LogTopicError, MismatchedABI, TransactionNotFound
 
-from eth_abi.codec import ABICodec
-from eth_abi.registry import registry as default_registry
 from eth_abi import decode_single
 
+from pyflex.abiregistry import LazyResource, abi_registry
 from pyflex.gas import DefaultGasPrice, GasPrice
 from pyflex.numeric import Wad
-from pyflex.util import synchronize, bytes_to_hexstring, is_contract_at
+from pyflex.providers import BatchingHTTPProvider, MultiplexingWebsocketProvider
+from pyflex.util import synchronize, run_blocking, bytes_to_hexstring, is_contract_at
 
 filter_threads = []
 nonce_calc = WeakKeyDictionary()
-next_nonce = {}
+call_caches = WeakKeyDictionary()
+nonce_managers = WeakKeyDictionary()
+receipt_watchers = WeakKeyDictionary()
+known_contracts = WeakKeyDictionary()
 transaction_lock = Lock()
 logger = logging.getLogger()
 
-def web3_via_http(endpoint_uri: str, timeout=60, http_pool_size=20):
+NONCE_ERROR_PATTERN = re.compile(r"nonce too low|nonce is too low|already known|known transaction|"
+                                 r"replacement transaction underpriced|incorrect nonce|invalid transaction nonce", re.IGNORECASE)
+
+def web3_via_http(endpoint_uri: str, timeout=60, http_pool_size=20, max_batch_size: Optional[int] = None,
+                  flush_interval: float = 0.005):
+    """Connects to a node over HTTP.
+
+    If `max_batch_size` is set, concurrently issued read requests are coalesced into JSON-RPC batches of at most
+    that many requests, see `BatchingHTTPProvider`.
+    """
     assert isinstance(endpoint_uri, str)
+    assert isinstance(max_batch_size, int) or max_batch_size is None
     adapter = requests.adapters.HTTPAdapter(pool_connections=http_pool_size, pool_maxsize=http_pool_size)
     session = requests.Session()
     if endpoint_uri.startswith("http"):
@@ -61,9 +73,26 @@ def web3_via_http(endpoint_uri: str, timeout=60, http_pool_size=20):
         session.mount('https://', adapter)
     else:
         raise ValueError("Unsupported protocol")
+    if max_batch_size is not None:
+        return Web3(BatchingHTTPProvider(endpoint_uri=endpoint_uri, request_kwargs={"timeout": timeout},
+                                         session=session, max_batch_size=max_batch_size,
+                                         flush_interval=flush_interval))
     return Web3(HTTPProvider(endpoint_uri=endpoint_uri, request_kwargs={"timeout": timeout}, session=session))
 
 
+def web3_via_websocket(endpoint_uri: str, timeout=60, max_concurrency=100):
+    """Connects to a node over a single WebSocket connection, with up to `max_concurrency` requests in flight.
+
+    Works with `Lifecycle`, `Transact` and everything else taking a `Web3` instance, see
+    `MultiplexingWebsocketProvider`. Keepers making many reads per block can use it in place of `web3_via_http`.
+    """
+    assert isinstance(endpoint_uri, str)
+    if not endpoint_uri.startswith("ws"):
+        raise ValueError("Unsupported protocol")
+    return Web3(MultiplexingWebsocketProvider(endpoint_uri=endpoint_uri, timeout=timeout,
+                                              max_concurrency=max_concurrency))
+
+
 class NonceCalculation(Enum):
     TX_COUNT = auto()
     PARITY_NEXTNONCE = auto()
@@ -139,6 +168,8 @@ class Address:
     """Represents an Ethereum address.
 
     Addresses get normalized automatically, so instances of this class can be safely compared to each other.
+    They are immutable and interned: constructing an address from a string or bytes seen recently returns the
+    same instance, without parsing it again. The checksum representation is computed on first use.
 
     Args:
         address: Can be any address representation allowed by web3.py
@@ -147,15 +178,26 @@ class Address:
     Attributes:
         address: Normalized hexadecimal representation of the Ethereum address.
     """
-    def __init__(self, address):
+
+    __slots__ = ('_bytes', '_address')
+
+    def __new__(cls, address):
         if isinstance(address, Address):
-            self.address = address.address
+            return address
+        elif isinstance(address, (str, bytes)):
+            return _interned_address(address)
         else:
-            self.address = eth_utils.to_checksum_address(address)
+            return _address_from_bytes(eth_utils.to_canonical_address(address))
+
+    @property
+    def address(self) -> str:
+        if self._address is None:
+            self._address = eth_utils.to_checksum_address(self._bytes)
+        return self._address
 
     def as_bytes(self) -> bytes:
         """Return the address as a 20-byte bytes array."""
-        return bytes.fromhex(self.address.replace('0x', ''))
+        return self._bytes
 
     def __str__(self):
         return f"{self.address}"
@@ -163,16 +205,38 @@ class Address:
     def __repr__(self):
         return f"Address('{self.address}')"
 
+    def __reduce__(self):
+        return Address, (self._bytes,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __hash__(self):
-        return self.address.__hash__()
+        return self._bytes.__hash__()
 
     def __eq__(self, other):
         assert(isinstance(other, Address))
-        return self.address == other.address
+        return self._bytes == other._bytes
 
     def __lt__(self, other):
         assert(isinstance(other, Address))
-        return self.address < other.address
+        return self._bytes < other._bytes
+
+
+@lru_cache(maxsize=65536)
+def _address_from_bytes(canonical_address: bytes) -> Address:
+    address = object.__new__(Address)
+    address._bytes = bytes(canonical_address)
+    address._address = None
+    return address
+
+
+@lru_cache(maxsize=65536)
+def _interned_address(address) -> Address:
+    return _address_from_bytes(eth_utils.to_canonical_address(address))
 
 
 class Contract:
@@ -197,8 +261,10 @@ class Contract:
         assert(isinstance(abi, list))
         assert(isinstance(address, Address))
 
-        if not is_contract_at(web3, address):
-            raise Exception(f"No contract found at {address}")
+        if address not in known_contracts.get(web3, ()):
+            if not is_contract_at(web3, address):
+                raise Exception(f"No contract found at {address}")
+            known_contracts.setdefault(web3, set()).add(address)
 
         return web3.eth.contract(abi=abi)(address=address.address)
 
@@ -230,12 +296,409 @@ class Contract:
         return list(map(_event_callback(cls, True), result))
 
     @staticmethod
-    def _load_abi(package, resource) -> list:
-        return json.loads(pkg_resources.resource_string(package, resource))
+    def _load_abi(package, resource) -> LazyResource:
+        """Declares the `abi` class attribute of a wrapper, parsed on first access and shared through `abi_registry`."""
+        return LazyResource(abi_registry.abi, package, resource)
+
+    @staticmethod
+    def _load_bin(package, resource) -> LazyResource:
+        """Declares the `bin` class attribute of a wrapper, read on first access and shared through `abi_registry`."""
+        return LazyResource(abi_registry.bin, package, resource)
+
+
+def prevalidate_contracts(web3: Web3, addresses: List[Address], trusted: bool = False,
+                          max_workers: int = 16) -> List[Address]:
+    """Checks at once which of `addresses` hold contracts, so wrapping them later needs no `eth_getCode` each.
+
+    The checks run concurrently, and get coalesced into a single batch by a `BatchingHTTPProvider`. Addresses found
+    to hold no contract are not remembered, so wrapping them still fails as usual. With `trusted`, for example for
+    addresses read from a deployment manifest known to be correct, all addresses are assumed to hold contracts
+    without checking.
+
+    Returns:
+        The addresses found to hold no contract.
+    """
+    assert isinstance(web3, Web3)
+    assert isinstance(addresses, list)
+    assert isinstance(trusted, bool)
+
+    addresses = list(dict.fromkeys(addresses))
+    if trusted:
+        missing = []
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            has_code = list(executor.map(lambda address: is_contract_at(web3, address), addresses))
+        missing = [address for address, code in zip(addresses, has_code) if not code]
+
+    with transaction_lock:
+        known_contracts.setdefault(web3, set()).update(address for address in addresses if address not in missing)
+
+    return missing
+
+
+class CallCache:
+    """Memoizes the results of constant contract calls (`eth_call`) for the duration of one block.
+
+    The cache is installed as a web3 middleware, so it transparently covers every view method of every
+    :py:class:`pyflex.Contract` wrapper sharing the same `Web3` instance. Calls made against the latest block
+    are pinned to the block the cache was last told about, so reads served between two blocks are consistent
+    with each other. Results are keyed by (contract, calldata, sender, block number).
+
+    Caching is opt-in, see :py:func:`pyflex.enable_call_cache`. Until the cache learns about the first block
+    (which `Lifecycle` does automatically for every new block it sees), calls are passed through.
+
+    Attributes:
+        block_number: The block the cache is currently pinned to, or `None`.
+        hits: Number of calls served from the cache.
+        misses: Number of calls forwarded to the node and cached.
+    """
+    def __init__(self):
+        self.block_number = None
+        self.hits = 0
+        self.misses = 0
+        self._results = {}
+        self._lock = Lock()
+
+    def new_block(self, block_number: int):
+        """Invalidates all cached results and pins subsequent calls to `block_number`."""
+        assert isinstance(block_number, int)
+
+        with self._lock:
+            if self.block_number is None or block_number > self.block_number:
+                self.block_number = block_number
+                self._results.clear()
+
+    def clear(self):
+        """Invalidates all cached results and resets the hit/miss counters."""
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
 
     @staticmethod
-    def _load_bin(package, resource) -> str:
-        return str(pkg_resources.resource_string(package, resource), "utf-8")
+    def _block_number(block_identifier) -> Optional[int]:
+        # By the time requests reach the middleware, web3 has formatted block numbers as hex strings
+        if isinstance(block_identifier, int):
+            return block_identifier
+        if isinstance(block_identifier, str) and re.fullmatch(r'0x[0-9a-fA-F]{1,63}', block_identifier):
+            return int(block_identifier, 16)
+        return None
+
+    def middleware(self, make_request, web3):
+        def middleware(method, params):
+            if method != 'eth_call':
+                return make_request(method, params)
+
+            transaction, block_identifier = params[0], params[1] if len(params) > 1 else 'latest'
+            if block_identifier in (None, 'latest'):
+                if self.block_number is None:
+                    return make_request(method, params)
+                block_number = self.block_number
+                params = [transaction, hex(block_number)]
+            else:
+                block_number = self._block_number(block_identifier)
+                if block_number is None:
+                    # 'pending', 'earliest' and block hashes are not cached
+                    return make_request(method, params)
+
+            key = (tuple(sorted(transaction.items())), block_number)
+            with self._lock:
+                response = self._results.get(key)
+                if response is not None:
+                    self.hits += 1
+                    return response
+
+            response = make_request(method, params)
+            with self._lock:
+                self.misses += 1
+                if 'error' not in response:
+                    self._results[key] = response
+
+            return response
+
+        return middleware
+
+    def __repr__(self):
+        return f"CallCache(block_number={self.block_number}, hits={self.hits}, misses={self.misses})"
+
+
+def enable_call_cache(web3: Web3) -> CallCache:
+    """Enables per-block memoization of constant contract calls for the given `Web3` instance.
+
+    Calling it again for the same `Web3` instance returns the already installed cache.
+    """
+    assert isinstance(web3, Web3)
+
+    if web3 not in call_caches:
+        call_caches[web3] = CallCache()
+        web3.middleware_onion.add(call_caches[web3].middleware, name='call_cache')
+
+    return call_caches[web3]
+
+
+def get_call_cache(web3: Web3) -> Optional[CallCache]:
+    """Returns the call cache installed for the given `Web3` instance, or `None` if caching is not enabled."""
+    return call_caches.get(web3)
+
+
+class NonceManager:
+    """Allocates the nonces of transactions sent from one account locally.
+
+    The next nonce is read from the node (using the method chosen by `NonceCalculation`) only when the manager
+    reconciles with the chain: before the first allocation, whenever no transaction of the account is in flight,
+    and at least every `reconcile_interval` seconds. In between, a burst of transactions gets consecutive nonces
+    without a node round trip each, so they can be signed and broadcast back-to-back.
+
+    Transactions hold `submission_lock` only while allocating a nonce, not while broadcasting, so the node may
+    receive a burst slightly out of nonce order; nodes queue transactions with future nonces until the gap closes.
+
+    Nonces of transactions which failed to broadcast are handed back with `release()`, and nonces the node has not
+    seen although no transaction is sending them anymore (i.e. dropped transactions) are found when reconciling.
+    Such gaps are filled first by subsequent allocations, so later transactions of the account do not get stuck.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        address: The account whose nonces are allocated.
+        reconcile_interval: Maximum number of seconds between reconciliations while transactions are in flight.
+    """
+
+    def __init__(self, web3: Web3, address: Address, reconcile_interval: float = 30.0):
+        assert isinstance(web3, Web3)
+        assert isinstance(address, Address)
+        assert isinstance(reconcile_interval, (int, float))
+
+        self.web3 = web3
+        self.address = address
+        self.reconcile_interval = reconcile_interval
+        self._next_nonce = None
+        self._in_flight = set()
+        self._gaps = set()
+        self._last_reconcile = 0.0
+        self._lock = Lock()
+        self.submission_lock = Lock()
+
+    def allocate(self) -> int:
+        """Returns the nonce to be used by the next transaction, and marks it as in flight."""
+        with self._lock:
+            if self._next_nonce is None or not self._in_flight \
+                    or time.time() - self._last_reconcile >= self.reconcile_interval:
+                self._reconcile()
+
+            if self._gaps:
+                nonce = min(self._gaps)
+                self._gaps.remove(nonce)
+            else:
+                nonce = self._next_nonce
+                self._next_nonce += 1
+
+            self._in_flight.add(nonce)
+            return nonce
+
+    def release(self, nonce: int):
+        """Hands back a nonce which no broadcast transaction uses, so that it gets allocated again."""
+        assert isinstance(nonce, int)
+
+        with self._lock:
+            self._in_flight.discard(nonce)
+            if self._next_nonce is not None and nonce < self._next_nonce:
+                self._gaps.add(nonce)
+
+    def finish(self, nonce: int):
+        """Marks the transaction using `nonce` as no longer in flight, either because it got mined or it failed."""
+        assert isinstance(nonce, int)
+
+        with self._lock:
+            self._in_flight.discard(nonce)
+
+    def reconcile(self):
+        """Reads the next nonce from the node, and finds nonces left unused by dropped transactions."""
+        with self._lock:
+            self._reconcile()
+
+    def _reconcile(self):
+        nonce_calculation = _get_nonce_calc(self.web3)
+        if nonce_calculation in (NonceCalculation.PARITY_NEXTNONCE, NonceCalculation.PARITY_SERIAL):
+            chain_nonce = int(self.web3.manager.request_blocking("parity_nextNonce", [self.address.address]), 16)
+        else:
+            chain_nonce = self.web3.eth.getTransactionCount(self.address.address, block_identifier='pending')
+
+        self._gaps = {nonce for nonce in self._gaps if nonce >= chain_nonce}
+        if self._next_nonce is None or chain_nonce > self._next_nonce:
+            # Transactions have been sent from this account by someone else
+            self._next_nonce = chain_nonce
+        elif nonce_calculation not in (NonceCalculation.SERIAL, NonceCalculation.PARITY_SERIAL):
+            # Nonces which the node does not know about and no transaction is sending anymore have been dropped.
+            # Providers requiring serial nonces may report a stale pending count, so gaps are not looked for there.
+            self._gaps |= set(range(chain_nonce, self._next_nonce)) - self._in_flight
+            while self._next_nonce - 1 in self._gaps:
+                self._next_nonce -= 1
+                self._gaps.remove(self._next_nonce)
+
+        self._last_reconcile = time.time()
+
+    def __repr__(self):
+        return f"NonceManager('{self.address}', next_nonce={self._next_nonce}, in_flight={len(self._in_flight)})"
+
+
+def get_nonce_manager(web3: Web3, address: Address) -> NonceManager:
+    """Returns the nonce manager of an account, creating it on first use for the given `Web3` instance."""
+    assert isinstance(web3, Web3)
+    assert isinstance(address, Address)
+
+    with transaction_lock:
+        managers = nonce_managers.setdefault(web3, {})
+        if address not in managers:
+            managers[address] = NonceManager(web3, address)
+
+        return managers[address]
+
+
+def _normalize_hash(tx_hash) -> str:
+    tx_hash = bytes_to_hexstring(tx_hash) if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash).lower()
+    return tx_hash if tx_hash.startswith('0x') else '0x' + tx_hash
+
+
+class ReceiptWatcher:
+    """Finds out which block mined a transaction, for all in-flight transactions at once.
+
+    Transactions are watched by their sender and nonce. While anything is being watched, a background thread
+    polls the block number every `poll_interval` seconds, and reads each new block (with its transactions) once.
+    Whenever a watched nonce is found in a block, the hash of the transaction which used it is recorded, so that
+    :py:class:`pyflex.Transact` knows whether one of its own transactions got mined (and only then asks for its
+    receipt) or the nonce has been used by another transaction. Detecting mined transactions costs a number of
+    requests proportional to the number of blocks, not to the number of transactions in flight.
+
+    The hashes of the last `reorg_depth` blocks read are kept. If a block does not follow the one read before it,
+    a reorganization is assumed, and blocks are read again (together with the transactions they mined) from the
+    most recent block still part of the chain.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        poll_interval: Number of seconds between checks for new blocks.
+        reorg_depth: Number of most recent blocks checked for reorganizations.
+        last_block: The most recent block already read, or `None` while nothing is watched.
+        read_errors: Number of times reading new blocks has failed, during which mined nonces may be found late.
+    """
+
+    def __init__(self, web3: Web3, poll_interval: float = 0.25, reorg_depth: int = 64):
+        assert isinstance(web3, Web3)
+        assert isinstance(poll_interval, (int, float))
+        assert isinstance(reorg_depth, int) and reorg_depth > 0
+
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.reorg_depth = reorg_depth
+        self.last_block = None
+        self.read_errors = 0
+        self._watched = {}
+        self._mined = {}
+        self._block_hashes = {}
+        self._lock = Lock()
+        self._thread = None
+        self._wake_up = Event()
+
+    def watch(self, address: Address, nonce: int):
+        """Starts watching for the transaction of `address` with `nonce`. Should be called before it is sent."""
+        assert isinstance(address, Address)
+        assert isinstance(nonce, int)
+
+        with self._lock:
+            key = (address, nonce)
+            self._watched[key] = self._watched.get(key, 0) + 1
+            if self._thread is None:
+                self.last_block = self.web3.eth.blockNumber
+                self._thread = Thread(target=self._run, name='pyflex-receipt-watcher', daemon=True)
+                self._thread.start()
+
+    def unwatch(self, address: Address, nonce: int):
+        """Stops watching for a transaction, once for every preceding `watch` call."""
+        assert isinstance(address, Address)
+        assert isinstance(nonce, int)
+
+        with self._lock:
+            key = (address, nonce)
+            if self._watched.get(key, 0) > 1:
+                self._watched[key] -= 1
+            else:
+                self._watched.pop(key, None)
+                self._mined.pop(key, None)
+
+    def mined(self, address: Address, nonce: int) -> Optional[str]:
+        """Returns the hash of the transaction which used the nonce, or `None` if it has not been mined yet."""
+        assert isinstance(address, Address)
+        assert isinstance(nonce, int)
+
+        with self._lock:
+            mined = self._mined.get((address, nonce))
+            return mined[0] if mined is not None else None
+
+    def new_block(self, block_number: int):
+        """Tells the watcher about a new block, so it does not have to wait for the next poll to read it."""
+        assert isinstance(block_number, int)
+
+        self._wake_up.set()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._watched:
+                    self._thread = None
+                    self.last_block = None
+                    self._block_hashes.clear()
+                    return
+                number = self.last_block + 1
+
+            try:
+                block_number = self.web3.eth.blockNumber
+                while number <= block_number:
+                    block = self.web3.eth.getBlock(number, full_transactions=True)
+                    if self._apply(block):
+                        number += 1
+                    else:
+                        logger.warning(f"Block #{number - 1} is no longer part of the chain, reading it again")
+                        number -= 1
+            except Exception as e:
+                with self._lock:
+                    self.read_errors += 1
+                logger.warning(f"Failed to read new blocks for watched transactions ({e})")
+
+            self._wake_up.wait(self.poll_interval)
+            self._wake_up.clear()
+
+    def _apply(self, block) -> bool:
+        number = block['number']
+        with self._lock:
+            parent_hash = self._block_hashes.get(number - 1)
+            if parent_hash is not None and parent_hash != block['parentHash']:
+                # Forget the previous block, and the transactions it mined
+                self._block_hashes.pop(number - 1)
+                self._mined = {key: mined for key, mined in self._mined.items() if mined[1] < number - 1}
+                self.last_block = number - 2
+                return False
+
+            for transaction in block['transactions']:
+                key = (Address(transaction['from']), transaction['nonce'])
+                if key in self._watched:
+                    self._mined[key] = (_normalize_hash(transaction['hash']), number)
+
+            self._block_hashes[number] = block['hash']
+            self._block_hashes.pop(number - self.reorg_depth, None)
+            self.last_block = number
+            return True
+
+    def __repr__(self):
+        return f"ReceiptWatcher(last_block={self.last_block}, watched={len(self._watched)})"
+
+
+def get_receipt_watcher(web3: Web3) -> ReceiptWatcher:
+    """Returns the receipt watcher shared by all transactions sent with the given `Web3` instance."""
+    assert isinstance(web3, Web3)
+
+    with transaction_lock:
+        if web3 not in receipt_watchers:
+            receipt_watchers[web3] = ReceiptWatcher(web3)
+
+        return receipt_watchers[web3]
 
 
 class Calldata:
@@ -311,13 +774,15 @@ class Invocation(object):
 class Receipt:
     """Represents a receipt for an Ethereum transaction.
 
+    Logs are only decoded when asked for, see `transfers` and `events()`.
+
     Attributes:
         raw_receipt: Raw receipt received from the Ethereum node.
         transaction_hash: Hash of the Ethereum transaction.
         gas_used: Amount of gas used by the Ethereum transaction.
         transfers: A list of ERC20 token transfers resulting from the execution
             of this Ethereum transaction. Each transfer is an instance of the
-            :py:class:`pyflex.Transfer` class.
+            :py:class:`pyflex.Transfer` class. Decoded on first access.
         result: Transaction-specific return value (i.e. new order id for Oasis
             order creation transaction).
         successful: Boolean flag which is `True` if the Ethereum transaction
@@ -328,7 +793,6 @@ class Receipt:
         self.raw_receipt = receipt
         self.transaction_hash = receipt['transactionHash']
         self.gas_used = receipt['gasUsed']
-        self.transfers = []
         self.result = None
         if int(str(receipt['status']), 16) == 1:
             self.successful = True
@@ -337,49 +801,82 @@ class Receipt:
         else:
             raise ValueError('unknown tx receipt status %s' % receipt)
 
-        receipt_logs = receipt['logs']
-        for receipt_log in receipt_logs:
-            if len(receipt_log['topics']) > 0:
-                # $ seth keccak $(seth --from-ascii "Transfer(address,address,uint256)")
-                # 0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef
-                if receipt_log['topics'][0] == HexBytes('0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'):
-                    from pyflex.token import ERC20Token
-                    transfer_abi = [abi for abi in ERC20Token.abi if abi.get('name') == 'Transfer'][0]
-                    codec = ABICodec(default_registry)
-                    event_data = get_event_data(codec, transfer_abi, receipt_log)
-                    self.transfers.append(Transfer(token_address=Address(event_data['address']),
-                                                   from_address=Address(event_data['args']['from']),
-                                                   to_address=Address(event_data['args']['to']),
-                                                   value=Wad(event_data['args']['value'])))
-
-                # $ seth keccak $(seth --from-ascii "Mint(address,uint256)")
-                # 0x0f6798a560793a54c3bcfe86a93cde1e73087d944c0ea20544137d4121396885
-                if receipt_log['topics'][0] == HexBytes('0x0f6798a560793a54c3bcfe86a93cde1e73087d944c0ea20544137d4121396885'):
-                    from pyflex.token import DSToken
-                    transfer_abi = [abi for abi in DSToken.abi if abi.get('name') == 'Mint'][0]
-                    codec = ABICodec(default_registry)
-                    event_data = get_event_data(codec, transfer_abi, receipt_log)
-                    self.transfers.append(Transfer(token_address=Address(event_data['address']),
-                                                   from_address=Address('0x0000000000000000000000000000000000000000'),
-                                                   to_address=Address(event_data['args']['guy']),
-                                                   value=Wad(event_data['args']['wad'])))
-
-                # $ seth keccak $(seth --from-ascii "Burn(address,uint256)")
-                # 0xcc16f5dbb4873280815c1ee09dbd06736cffcc184412cf7a71a0fdb75d397ca5
-                if receipt_log['topics'][0] == HexBytes('0xcc16f5dbb4873280815c1ee09dbd06736cffcc184412cf7a71a0fdb75d397ca5'):
-                    from pyflex.token import DSToken
-                    transfer_abi = [abi for abi in DSToken.abi if abi.get('name') == 'Burn'][0]
-                    codec = ABICodec(default_registry)
-                    event_data = get_event_data(codec, transfer_abi, receipt_log)
-                    self.transfers.append(Transfer(token_address=Address(event_data['address']),
-                                                   from_address=Address(event_data['args']['guy']),
-                                                   to_address=Address('0x0000000000000000000000000000000000000000'),
-                                                   value=Wad(event_data['args']['wad'])))
-
     @property
     def logs(self):
         return self.raw_receipt['logs']
 
+    @cached_property
+    def transfers(self) -> list:
+        decoders = _transfer_decoders()
+        transfers = []
+        for receipt_log in self.logs:
+            topics = receipt_log['topics']
+            if len(topics) > 0 and topics[0] in decoders:
+                decoder, read_transfer = decoders[topics[0]]
+                try:
+                    event_data = decoder.decode(receipt_log)
+                except (LogTopicError, MismatchedABI):
+                    # Same signature with other indexed arguments, e.g. an ERC721 transfer
+                    continue
+                from_address, to_address, value = read_transfer(event_data['args'])
+                transfers.append(Transfer(token_address=Address(event_data['address']),
+                                          from_address=Address(from_address),
+                                          to_address=Address(to_address),
+                                          value=Wad(value)))
+
+        return transfers
+
+    def events(self, *contracts) -> list:
+        """Decodes the events of any of `contracts` emitted by the transaction, in one pass over its logs.
+
+        Args:
+            contracts: `Contract` subclasses, whose events are decoded whichever address emitted them,
+                or `Contract` instances, whose events are decoded only when emitted by their address.
+
+        Returns:
+            Event data as decoded by `web3.py`, with the `event` name, its `args` and the emitting `address`,
+            in the order the events were emitted in.
+        """
+        decoders = {}
+        for contract in contracts:
+            assert isinstance(contract, Contract) or (isinstance(contract, type) and issubclass(contract, Contract))
+            address = contract.address if isinstance(contract, Contract) else None
+            for topic, decoder in abi_registry.decoders(contract.abi).items():
+                decoders.setdefault(topic, []).append((address, decoder))
+
+        events = []
+        for receipt_log in self.logs:
+            topics = receipt_log['topics']
+            for address, decoder in decoders.get(topics[0], ()) if len(topics) > 0 else ():
+                if address is None or address == Address(receipt_log['address']):
+                    try:
+                        events.append(decoder.decode(receipt_log))
+                        break
+                    except (LogTopicError, MismatchedABI):
+                        continue
+
+        return events
+
+
+@lru_cache(maxsize=None)
+def _transfer_decoders() -> dict:
+    """Returns decoders of the events which transfer tokens by their topic, with how to read the transfer."""
+    # Imported here, as `pyflex.token` depends on this module
+    from pyflex.token import DSToken, ERC20Token
+
+    # $ seth keccak $(seth --from-ascii "Transfer(address,address,uint256)")
+    transfer = HexBytes('0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef')
+    # $ seth keccak $(seth --from-ascii "Mint(address,uint256)")
+    mint = HexBytes('0x0f6798a560793a54c3bcfe86a93cde1e73087d944c0ea20544137d4121396885')
+    # $ seth keccak $(seth --from-ascii "Burn(address,uint256)")
+    burn = HexBytes('0xcc16f5dbb4873280815c1ee09dbd06736cffcc184412cf7a71a0fdb75d397ca5')
+
+    zero_address = '0x0000000000000000000000000000000000000000'
+    return {transfer: (abi_registry.decoders(ERC20Token.abi)[transfer],
+                       lambda args: (args['from'], args['to'], args['value'])),
+            mint: (abi_registry.decoders(DSToken.abi)[mint], lambda args: (zero_address, args['guy'], args['wad'])),
+            burn: (abi_registry.decoders(DSToken.abi)[burn], lambda args: (args['guy'], zero_address, args['wad']))}
+
 
 class TransactStatus(Enum):
      NEW = auto()
@@ -417,6 +914,8 @@ class Transact:
 
     logger = logging.getLogger()
     gas_estimate_for_bad_txs = None
+    nonce_check_interval = 5.0
+    receipt_wait_blocks = 12
 
     def __init__(self,
                  origin: Optional[object],
@@ -454,6 +953,7 @@ class Transact:
         self.gas_price = None
         self.gas_price_last = 0
         self.tx_hashes = []
+        self._watched_nonce = None
 
 
     def _get_receipt(self, transaction_hash: str) -> Optional[Receipt]:
@@ -594,6 +1094,9 @@ class Transact:
 
         Out-of-gas exceptions are automatically recognized as transaction failures.
 
+        The transaction is executed on the long-lived event loop returned by :py:func:`pyflex.util.event_loop`,
+        so this method may also be called by applications running their own asyncio event loop.
+
         Allowed keyword arguments are: `from_address`, `replace`, `gas`, `gas_buffer`, `gas_price`.
         `gas_price` needs to be an instance of a class inheriting from :py:class:`pyflex.gas.GasPrice`.
         `from_address` needs to be an instance of :py:class:`pyflex.Address`.
@@ -618,6 +1121,9 @@ class Transact:
 
         Out-of-gas exceptions are automatically recognized as transaction failures.
 
+        Runs on the event loop of the caller. Blocking node requests are made on a shared thread pool
+        (see :py:func:`pyflex.util.run_blocking`), so many transactions can be executed concurrently.
+
         Allowed keyword arguments are: `from_address`, `replace`, `gas`, `gas_buffer`, `gas_price`.
         `gas_price` needs to be an instance of a class inheriting from :py:class:`pyflex.gas.GasPrice`.
 
@@ -629,16 +1135,13 @@ class Transact:
             A future value of either a :py:class:`pyflex.Receipt` object if the transaction
             invocation was successful, or `None` if it failed.
         """
-        global next_nonce
         self.initial_time = time.time()
         unknown_kwargs = set(kwargs.keys()) - {'from_address', 'replace', 'gas', 'gas_buffer', 'gas_price'}
         if len(unknown_kwargs) > 0:
             raise ValueError(f"Unknown kwargs: {unknown_kwargs}")
 
-        # Get the from account. Initialize the first nonce for the account.
+        # Get the from account.
         from_account = kwargs['from_address'].address if ('from_address' in kwargs) else self.web3.eth.defaultAccount
-        if not next_nonce or from_account not in next_nonce:
-            next_nonce[from_account] = self.web3.eth.getTransactionCount(from_account, block_identifier='pending')
 
         # First we try to estimate the gas usage of the transaction. If gas estimation fails
         # it means there is no point in sending the transaction, thus we fail instantly and
@@ -646,7 +1149,7 @@ class Transact:
         # gas value (plus some `gas_buffer`) to the subsequent `transact` calls so it does not
         # try to estimate it again.
         try:
-            gas_estimate = self.estimated_gas(Address(from_account))
+            gas_estimate = await run_blocking(self.estimated_gas, Address(from_account))
         except:
             if Transact.gas_estimate_for_bad_txs:
                 self.logger.warning(f"Transaction {self.name()} will fail, submitting anyway")
@@ -664,11 +1167,15 @@ class Transact:
         # If there is one, try to borrow the nonce from it as long as that transaction isn't finished.
         replaced_tx = kwargs['replace'] if ('replace' in kwargs) else None
         if replaced_tx is not None:
-            while replaced_tx.nonce is None and replaced_tx.status != TransactStatus.FINISHED:
+            # Wait for the original to be broadcast, so that the replacement does not reach the node first
+            while (replaced_tx.nonce is None or not replaced_tx.tx_hashes) \
+                    and replaced_tx.status != TransactStatus.FINISHED:
                 await asyncio.sleep(0.25)
 
-            replaced_tx.replaced = True
             self.nonce = replaced_tx.nonce
+            # Watch the nonce before the original stops watching it, so that a block mining it can not be missed
+            await run_blocking(self._watch, from_account)
+            replaced_tx.replaced = True
             # Gas should be calculated from the original time of submission
             self.initial_time = replaced_tx.initial_time if replaced_tx.initial_time else time.time()
             # Use gas strategy from the original transaction if one was not provided
@@ -680,94 +1187,160 @@ class Transact:
                 most_recent_tx = replaced_tx.tx_hashes[-1]
                 self.tx_hashes = [most_recent_tx]
 
-        while True:
-            seconds_elapsed = int(time.time() - self.initial_time)
+        receipt_watcher = get_receipt_watcher(self.web3)
+        # The receipt watcher only reads blocks mined after the nonce started being watched. The transaction count
+        # is only read if the nonce may have been used before: by the transaction being replaced, when a send gets
+        # rejected because of its nonce, or when the watcher failed to read some blocks.
+        next_nonce_check = time.time() if replaced_tx is not None else None
+        nonce_rejected = False
+        read_errors = receipt_watcher.read_errors
+        nonce_used_at = None
+        try:
+            while True:
+                seconds_elapsed = int(time.time() - self.initial_time)
+
+                mined_hash = receipt_watcher.mined(Address(from_account), self.nonce) if self._watched_nonce is not None else None
+                if mined_hash is None and nonce_used_at is None and self._watched_nonce is not None \
+                        and (nonce_rejected or receipt_watcher.read_errors > read_errors
+                             or (next_nonce_check is not None and time.time() >= next_nonce_check)):
+                    if next_nonce_check is not None:
+                        next_nonce_check = time.time() + Transact.nonce_check_interval
+                    nonce_rejected = False
+                    read_errors = receipt_watcher.read_errors
+                    if await run_blocking(self._nonce_used, from_account):
+                        nonce_used_at = receipt_watcher.last_block or 0
+
+                if mined_hash is None and nonce_used_at is not None:
+                    # Wait for the node to serve the receipt of one of our transactions, unless the watcher finds
+                    # another transaction using the nonce or none of ours shows up for `receipt_wait_blocks` blocks
+                    mined_hash = await run_blocking(self._find_mined_hash)
+                    if mined_hash is None and (receipt_watcher.last_block or 0) - nonce_used_at >= Transact.receipt_wait_blocks:
+                        self.logger.warning(f"Transaction {self.name()} has been overridden by another transaction"
+                                            f" with the same nonce, which means it has failed")
+                        return None
 
-            if self.nonce is not None and self.web3.eth.getTransactionCount(from_account) > self.nonce:
-                # Check if any transaction sent so far has been mined (has a receipt).
-                # If it has, we return either the receipt (if if was successful) or `None`.
-                for attempt in range(1, 11):
+                if mined_hash is not None:
+                    # A transaction with our nonce has been mined. If it is one of ours, we return either
+                    # the receipt (if it was successful) or `None`.
                     if self.replaced:
                         self.logger.debug(f"Transaction with nonce={self.nonce} was replaced with a newer transaction")
                         return None
 
-                    for tx_hash in self.tx_hashes:
-                        receipt = self._get_receipt(tx_hash)
+                    if mined_hash in map(_normalize_hash, self.tx_hashes):
+                        receipt = await run_blocking(self._get_receipt, mined_hash)
                         if receipt:
                             if receipt.successful:
-                                self.logger.info(f"Transaction {self.name()} was successful (tx_hash={bytes_to_hexstring(tx_hash)})")
+                                self.logger.info(f"Transaction {self.name()} was successful (tx_hash={mined_hash})")
                                 return receipt
                             else:
                                 self.logger.warning(f"Transaction {self.name()} status is '0x0'."
-                                                    f" Assuming it has failed (tx_hash={bytes_to_hexstring(tx_hash)})")
+                                                    f" Assuming it has failed (tx_hash={mined_hash})")
                                 return None
 
-                    self.logger.debug(f"No receipt found in attempt #{attempt}/10 (nonce={self.nonce},"
-                                      f" getTransactionCount={self.web3.eth.getTransactionCount(from_account)})")
+                        self.logger.debug(f"No receipt found yet for mined transaction (nonce={self.nonce}, tx_hash={mined_hash})")
 
-                    await asyncio.sleep(0.5)
+                    else:
+                        # If the nonce has been used by a transaction we did not send,
+                        # then it means that the transaction we tried to send failed.
+                        self.logger.warning(f"Transaction {self.name()} has been overridden by another transaction"
+                                            f" with the same nonce, which means it has failed")
+                        return None
 
-                # If we can not find a mined receipt but at the same time we know last used nonce
-                # has increased, then it means that the transaction we tried to send failed.
-                self.logger.warning(f"Transaction {self.name()} has been overridden by another transaction"
-                                    f" with the same nonce, which means it has failed")
-                return None
+                # Trap replacement after the tx has entered the mempool and before it has been mined
+                if self.replaced:
+                    self.logger.info(f"Transaction {self.name()} with nonce={self.nonce} is being replaced")
+                    return None
+
+                # Send a transaction if:
+                # - no transaction has been sent yet, or
+                # - the requested gas price has changed enough since the last transaction has been sent
+                # - the gas price on a replacement has sufficiently exceeded that of the original transaction
+                gas_price_value = self.gas_price.get_gas_price(seconds_elapsed)
+                transaction_was_sent = len(self.tx_hashes) > 0 or (replaced_tx is not None and len(replaced_tx.tx_hashes) > 0)
+                # Uncomment this to debug state during transaction submission
+                # self.logger.debug(f"Transaction {self.name()} is churning: was_sent={transaction_was_sent}, gas_price_value={gas_price_value} gas_price_last={self.gas_price_last}")
+                if not transaction_was_sent or (gas_price_value is not None and gas_price_value > self.gas_price_last * 1.125):
+                    self.gas_price_last = gas_price_value
 
-            # Trap replacement after the tx has entered the mempool and before it has been mined
-            if self.replaced:
-                self.logger.info(f"Transaction {self.name()} with nonce={self.nonce} is being replaced")
-                return None
+                    try:
+                        tx_hash = await run_blocking(self._send, from_account, gas, gas_price_value)
+                        if tx_hash is None:
+                            return None
 
-            # Send a transaction if:
-            # - no transaction has been sent yet, or
-            # - the requested gas price has changed enough since the last transaction has been sent
-            # - the gas price on a replacement has sufficiently exceeded that of the original transaction
-            gas_price_value = self.gas_price.get_gas_price(seconds_elapsed)
-            transaction_was_sent = len(self.tx_hashes) > 0 or (replaced_tx is not None and len(replaced_tx.tx_hashes) > 0)
-            # Uncomment this to debug state during transaction submission
-            # self.logger.debug(f"Transaction {self.name()} is churning: was_sent={transaction_was_sent}, gas_price_value={gas_price_value} gas_price_last={self.gas_price_last}")
-            if not transaction_was_sent or (gas_price_value is not None and gas_price_value > self.gas_price_last * 1.125):
-                self.gas_price_last = gas_price_value
+                        self.logger.info(f"Sent transaction {self.name()} with nonce={self.nonce}, gas={gas},"
+                                         f" gas_price={gas_price_value if gas_price_value is not None else 'default'}"
+                                         f" (tx_hash={bytes_to_hexstring(tx_hash)})")
+                    except Exception as e:
+                        self.logger.warning(f"Failed to send transaction {self.name()} with nonce={self.nonce}, gas={gas},"
+                                            f" gas_price={gas_price_value if gas_price_value is not None else 'default'}"
+                                            f" ({e})")
 
-                try:
-                    # We need the lock in order to not try to send two transactions with the same nonce.
-                    with transaction_lock:
-                        if self.nonce is None:
-                            nonce_calculation = _get_nonce_calc(self.web3)
-                            if nonce_calculation == NonceCalculation.PARITY_NEXTNONCE:
-                                self.nonce = int(self.web3.manager.request_blocking("parity_nextNonce", [from_account]), 16)
-                            elif nonce_calculation == NonceCalculation.TX_COUNT:
-                                self.nonce = self.web3.eth.getTransactionCount(from_account, block_identifier='pending')
-                            elif nonce_calculation == NonceCalculation.SERIAL:
-                                tx_count = self.web3.eth.getTransactionCount(from_account, block_identifier='pending')
-                                next_serial = next_nonce[from_account]
-                                self.nonce = max(tx_count, next_serial)
-                            elif nonce_calculation == NonceCalculation.PARITY_SERIAL:
-                                tx_count = int(self.web3.manager.request_blocking("parity_nextNonce", [from_account]), 16)
-                                next_serial = next_nonce[from_account]
-                                self.nonce = max(tx_count, next_serial)
-                            next_nonce[from_account] = self.nonce + 1
-
-                        # Trap replacement while original is holding the lock awaiting nonce assignment
-                        if self.replaced:
-                            self.logger.info(f"Transaction {self.name()} with nonce={self.nonce} was replaced")
-                            return None
+                        if len(self.tx_hashes) == 0:
+                            raise
+                        nonce_rejected = NONCE_ERROR_PATTERN.search(str(e)) is not None
 
-                        tx_hash = self._func(from_account, gas, gas_price_value, self.nonce)
-                        self.tx_hashes.append(tx_hash)
+                await asyncio.sleep(0.25)
+        finally:
+            self._unwatch(from_account)
+            # A replacing transaction takes over the nonce
+            if self.nonce is not None and not self.replaced:
+                get_nonce_manager(self.web3, Address(from_account)).finish(self.nonce)
+
+    def _watch(self, from_account: str):
+        if self.nonce is not None and self._watched_nonce != self.nonce:
+            self._unwatch(from_account)
+            get_receipt_watcher(self.web3).watch(Address(from_account), self.nonce)
+            self._watched_nonce = self.nonce
+
+    def _unwatch(self, from_account: str):
+        if self._watched_nonce is not None:
+            get_receipt_watcher(self.web3).unwatch(Address(from_account), self._watched_nonce)
+            self._watched_nonce = None
+
+    def _nonce_used(self, from_account: str) -> bool:
+        return self.web3.eth.getTransactionCount(from_account) > self.nonce
+
+    def _find_mined_hash(self) -> Optional[str]:
+        for tx_hash in self.tx_hashes:
+            if self._get_receipt(tx_hash):
+                return _normalize_hash(tx_hash)
 
-                    self.logger.info(f"Sent transaction {self.name()} with nonce={self.nonce}, gas={gas},"
-                                     f" gas_price={gas_price_value if gas_price_value is not None else 'default'}"
-                                     f" (tx_hash={bytes_to_hexstring(tx_hash)})")
-                except Exception as e:
-                    self.logger.warning(f"Failed to send transaction {self.name()} with nonce={self.nonce}, gas={gas},"
-                                        f" gas_price={gas_price_value if gas_price_value is not None else 'default'}"
-                                        f" ({e})")
+        return None
 
-                    if len(self.tx_hashes) == 0:
-                        raise
+    def _send(self, from_account: str, gas: int, gas_price: Optional[int]):
+        # The lock is only held to allocate the nonce, not until the node responds, so that a burst of transactions
+        # is broadcast back-to-back. Nodes queue transactions whose nonces arrive slightly out of order.
+        nonce_manager = get_nonce_manager(self.web3, Address(from_account))
+        for attempt in range(2):
+            with nonce_manager.submission_lock:
+                # Trap replacement while original is awaiting nonce assignment
+                if self.replaced:
+                    self.logger.info(f"Transaction {self.name()} with nonce={self.nonce} was replaced")
+                    return None
+
+                reuse_nonce = self.nonce is not None
+                if not reuse_nonce:
+                    self.nonce = nonce_manager.allocate()
+
+            try:
+                # Watch before sending, so that the block mining the transaction can not be missed
+                self._watch(from_account)
+                tx_hash = self._func(from_account, gas, gas_price, self.nonce)
+                self.tx_hashes.append(tx_hash)
+                return tx_hash
+            except Exception as e:
+                if reuse_nonce:
+                    raise
 
-            await asyncio.sleep(0.25)
+                self._unwatch(from_account)
+                nonce_manager.release(self.nonce)
+                self.nonce = None
+                if attempt > 0 or not NONCE_ERROR_PATTERN.search(str(e)):
+                    raise
+
+                # Transactions have been sent from this account without the nonce manager knowing about them
+                self.logger.debug(f"Nonce rejected for {self.name()} ({e}), retrying with a nonce read from the node")
+                nonce_manager.reconcile()
 
     def invocation(self) -> Invocation:
         """Returns the `Invocation` object for this pending Ethereum transaction.
@@ -825,28 +1398,36 @@ class RecoveredTransact(Transact):
             self.logger.warning(f"Recovery gas price is less than current gas price {self.current_gas}; "
                                 "cancellation will be deferred until the strategy produces an acceptable price.")
 
-        while True:
-            seconds_elapsed = int(time.time() - initial_time)
-            gas_price_value = gas_price.get_gas_price(seconds_elapsed)
-            if gas_price_value > self.gas_price_last * 1.125:
-                self.gas_price_last = gas_price_value
-                # Transaction lock isn't needed here, as we are replacing an existing nonce
-                tx_hash = bytes_to_hexstring(self.web3.eth.sendTransaction({'from': self.address.address,
-                                                                            'to': self.address.address,
-                                                                            'gasPrice': gas_price_value,
-                                                                            'nonce': self.nonce,
-                                                                            'value': 0}))
-                self.tx_hashes.append(tx_hash)
-                self.logger.info(f"Attempting to cancel recovered tx with nonce={self.nonce}, "
-                                 f"gas_price={gas_price_value} (tx_hash={tx_hash})")
-
-            for tx_hash in self.tx_hashes:
-                receipt = self._get_receipt(tx_hash)
-                if receipt:
-                    self.logger.info(f"{self.name()} was cancelled (tx_hash={tx_hash})")
+        receipt_watcher = get_receipt_watcher(self.web3)
+        await run_blocking(self._watch, self.address.address)
+        try:
+            while True:
+                seconds_elapsed = int(time.time() - initial_time)
+                gas_price_value = gas_price.get_gas_price(seconds_elapsed)
+                if gas_price_value > self.gas_price_last * 1.125:
+                    self.gas_price_last = gas_price_value
+                    # Transaction lock isn't needed here, as we are replacing an existing nonce
+                    tx_hash = bytes_to_hexstring(await run_blocking(self.web3.eth.sendTransaction,
+                                                                    {'from': self.address.address,
+                                                                     'to': self.address.address,
+                                                                     'gasPrice': gas_price_value,
+                                                                     'nonce': self.nonce,
+                                                                     'value': 0}))
+                    self.tx_hashes.append(tx_hash)
+                    self.logger.info(f"Attempting to cancel recovered tx with nonce={self.nonce}, "
+                                     f"gas_price={gas_price_value} (tx_hash={tx_hash})")
+
+                mined_hash = receipt_watcher.mined(self.address, self.nonce)
+                if mined_hash is not None:
+                    if mined_hash in map(_normalize_hash, self.tx_hashes):
+                        self.logger.info(f"{self.name()} was cancelled (tx_hash={mined_hash})")
+                    else:
+                        self.logger.info(f"{self.name()} was mined before it could be cancelled (tx_hash={mined_hash})")
                     return
 
-            await asyncio.sleep(0.75)
+                await asyncio.sleep(0.75)
+        finally:
+            self._unwatch(self.address.address)
 
     def __str__(self):
         return f"RecoveredTransact(address: {self.address}, nonce: {self.nonce}, current_gas: {self.current_gas})"
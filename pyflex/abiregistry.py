@@ -0,0 +1,172 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import pkgutil
+from functools import lru_cache
+from threading import Lock
+from typing import Callable, Dict
+
+from eth_abi.codec import ABICodec
+from eth_abi.registry import registry as default_registry
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector, hexstr_if_str, to_bytes, \
+    to_checksum_address
+from hexbytes import HexBytes
+from web3._utils.abi import exclude_indexed_event_inputs, get_abi_input_names, get_indexed_event_inputs, \
+    normalize_event_input_types
+from web3._utils.events import get_event_abi_types_for_decoding, get_event_data
+from web3.datastructures import AttributeDict
+from web3.exceptions import LogTopicError, MismatchedABI
+
+
+class AbiRegistry:
+    """Loads contract ABIs and bytecode on first use, and keeps them parsed.
+
+    Each resource is read and parsed at most once per process, however many wrapper classes or contracts use it.
+    Function selector and event topic maps of an ABI are computed once as well, see `selectors()` and `topics()`.
+
+    Attributes:
+        codec: An `ABICodec` to decode calls and events with, shared instead of creating one for every decode.
+    """
+
+    def __init__(self):
+        self.codec = ABICodec(default_registry)
+        self._resources = {}
+        self._maps = {}
+        self._lock = Lock()
+
+    def _resource(self, package: str, resource: str, parse: Callable):
+        key = (package, resource)
+        if key not in self._resources:
+            value = parse(pkgutil.get_data(package, resource))
+            with self._lock:
+                self._resources.setdefault(key, value)
+
+        return self._resources[key]
+
+    def abi(self, package: str, resource: str) -> list:
+        """Returns the parsed ABI at `resource`, relative to the module or package `package`."""
+        return self._resource(package, resource, json.loads)
+
+    def bin(self, package: str, resource: str) -> str:
+        """Returns the bytecode at `resource`, relative to the module or package `package`."""
+        return self._resource(package, resource, lambda data: str(data, "utf-8"))
+
+    def _map(self, kind: str, abi: list, build: Callable) -> dict:
+        key = (kind, id(abi))
+        if key not in self._maps:
+            # Keeping a reference to the ABI ensures its id is not reused while the map is cached
+            value = (abi, build(abi))
+            with self._lock:
+                self._maps.setdefault(key, value)
+
+        return self._maps[key][1]
+
+    def selectors(self, abi: list) -> Dict[HexBytes, dict]:
+        """Returns the functions of `abi` by their 4-byte selector."""
+        return self._map('selectors', abi, lambda abi: {HexBytes(function_abi_to_4byte_selector(member)): member
+                                                        for member in abi if member.get('type') == 'function'})
+
+    def topics(self, abi: list) -> Dict[HexBytes, dict]:
+        """Returns the non-anonymous events of `abi` by their topic."""
+        return self._map('topics', abi, lambda abi: {HexBytes(event_abi_to_log_topic(member)): member
+                                                     for member in abi
+                                                     if member.get('type') == 'event' and not member.get('anonymous')})
+
+    def decoders(self, abi: list) -> Dict[HexBytes, 'EventDecoder']:
+        """Returns decoders of the non-anonymous events of `abi` by their topic, see `EventDecoder`."""
+        return self._map('decoders', abi, lambda abi: {topic: EventDecoder(self.codec, event_abi)
+                                                       for topic, event_abi in self.topics(abi).items()})
+
+
+_checksum_address = lru_cache(maxsize=65536)(to_checksum_address)
+
+
+class EventDecoder:
+    """Decodes logs of one non-anonymous event into the same event data as `web3.py` does.
+
+    Everything derived from the event ABI, like the types and names of the arguments, is computed once instead of
+    for every log.
+    """
+
+    def __init__(self, codec: ABICodec, event_abi: dict):
+        self.codec = codec
+        self.event_abi = event_abi
+        self.topic = HexBytes(event_abi_to_log_topic(event_abi))
+
+        topic_inputs = get_indexed_event_inputs(event_abi)
+        data_inputs = exclude_indexed_event_inputs(event_abi)
+        self.topic_types = list(get_event_abi_types_for_decoding(normalize_event_input_types(topic_inputs)))
+        self.topic_names = get_abi_input_names({'inputs': topic_inputs})
+        self.data_types = list(get_event_abi_types_for_decoding(normalize_event_input_types(data_inputs)))
+        self.data_names = get_abi_input_names({'inputs': data_inputs})
+
+        # Decoded addresses get checksummed; only plain `address` arguments can be without walking the values
+        types = self.topic_types + self.data_types
+        self._general = bool(set(self.topic_names) & set(self.data_names)) or \
+            any('address' in type and type != 'address' for type in types)
+
+    def _normalize(self, types: list, values) -> list:
+        return [_checksum_address(value) if type == 'address' else value for type, value in zip(types, values)]
+
+    def decode(self, log: dict) -> AttributeDict:
+        """Decodes a log, raising `MismatchedABI` or `LogTopicError` if it has not been emitted by this event."""
+        if self._general:
+            return get_event_data(self.codec, self.event_abi, log)
+
+        topics = log['topics']
+        if not topics or HexBytes(topics[0]) != self.topic:
+            raise MismatchedABI("The event signature did not match the provided ABI")
+        if len(topics) - 1 != len(self.topic_types):
+            raise LogTopicError(f"Expected {len(self.topic_types)} log topics.  Got {len(topics) - 1}")
+
+        topic_values = [self.codec.decode_single(type, topic) for type, topic in zip(self.topic_types, topics[1:])]
+        data_values = self.codec.decode_abi(self.data_types, hexstr_if_str(to_bytes, log['data']))
+
+        args = dict(zip(self.topic_names, self._normalize(self.topic_types, topic_values)))
+        args.update(zip(self.data_names, self._normalize(self.data_types, data_values)))
+        return AttributeDict({
+            'args': AttributeDict(args),
+            'event': self.event_abi['name'],
+            'logIndex': log['logIndex'],
+            'transactionIndex': log['transactionIndex'],
+            'transactionHash': log['transactionHash'],
+            'address': log['address'],
+            'blockHash': log['blockHash'],
+            'blockNumber': log['blockNumber'],
+        })
+
+    def __repr__(self):
+        return f"EventDecoder('{self.event_abi['name']}')"
+
+
+class LazyResource:
+    """A class attribute holding a resource of `AbiRegistry`, loaded on first access."""
+
+    def __init__(self, load: Callable, package: str, resource: str):
+        self.load = load
+        self.package = package
+        self.resource = resource
+
+    def __get__(self, instance, owner):
+        return self.load(self.package, self.resource)
+
+    def __repr__(self):
+        return f"LazyResource('{self.package}', '{self.resource}')"
+
+
+abi_registry = AbiRegistry()
@@ -0,0 +1,198 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import copy
+import logging
+from datetime import datetime
+from threading import RLock
+from typing import Dict, List, Optional, Set
+
+from hexbytes import HexBytes
+
+from pyflex.abiregistry import abi_registry
+from pyflex.auctions import AuctionContract
+from pyflex.logs import LogFetcher
+from pyflex.multicall import Multicall
+
+
+logger = logging.getLogger()
+
+
+class AuctionBook:
+    """Keeps the state of every unfinished auction of one auction house in memory, following its events.
+
+    The book is seeded with one read of all unfinished auctions, and then kept up to date by calling `sync()`,
+    typically from a `Lifecycle.on_block` callback. Logs of the auction house are applied as follows:
+
+    * `IncreaseBidSize` and `DecreaseSoldAmount` carry the resulting bid state, and are applied without
+      reading the chain,
+    * `SettleAuction` and `TerminateAuctionPrematurely` remove the auction,
+    * any other log of an auction (like `StartAuction`, `BuyCollateral` or `RestartAuction`, whose effect can
+      not be fully derived from the log) causes that auction to be reconciled with a single batched `bids()`
+      read at the synced block.
+
+    Attributes:
+        auction_house: The auction house whose auctions are tracked.
+        multicall: Optional :py:class:`pyflex.multicall.Multicall` used to read bids in batches.
+        last_block: The most recent block already applied to the book, or `None` if not seeded yet.
+    """
+
+    def __init__(self, auction_house: AuctionContract, multicall: Optional[Multicall] = None,
+                 log_fetcher: Optional[LogFetcher] = None):
+        assert isinstance(auction_house, AuctionContract)
+        assert isinstance(multicall, Multicall) or multicall is None
+        assert isinstance(log_fetcher, LogFetcher) or log_fetcher is None
+
+        self.auction_house = auction_house
+        self.multicall = multicall
+        self.log_fetcher = log_fetcher if log_fetcher is not None else LogFetcher(auction_house.web3)
+        self.last_block = None
+        self._auctions: Dict[int, object] = {}
+        self._lock = RLock()
+        self._decoders = abi_registry.decoders(auction_house.abi)
+
+    def seed(self):
+        """Reads all unfinished auctions from the chain and starts following events from the current block."""
+        with self._lock:
+            self.last_block = self.auction_house.web3.eth.blockNumber
+            self._auctions = {bid.id: bid for bid in self.auction_house.unfinished_auctions(self.multicall)}
+
+            logger.debug(f"Seeded {self} at block #{self.last_block}")
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """Applies all auction house logs emitted since the last applied block.
+
+        Args:
+            to_block: Newest block to apply, defaults to the current block.
+
+        Returns:
+            The number of logs applied.
+        """
+        assert isinstance(to_block, int) or to_block is None
+
+        with self._lock:
+            if self.last_block is None:
+                raise Exception("AuctionBook has to be seeded first")
+
+            if to_block is None:
+                to_block = self.auction_house.web3.eth.blockNumber
+            if to_block <= self.last_block:
+                return 0
+
+            logs = self.log_fetcher.get_logs(self.auction_house.address, None, self.last_block + 1, to_block)
+            stale = self.apply(logs)
+            if stale:
+                self.reconcile(sorted(stale), to_block)
+            self.last_block = to_block
+
+            return len(logs)
+
+    def apply(self, logs: list) -> Set[int]:
+        """Applies raw auction house logs to the book, in the order given.
+
+        Returns:
+            Identifiers of the auctions whose state could not be derived from the logs alone,
+            and should be passed to `reconcile`.
+        """
+        assert isinstance(logs, list)
+
+        stale = set()
+        with self._lock:
+            for log in logs:
+                event = self._decode(log)
+                if event is None or 'id' not in event['args']:
+                    continue
+
+                id = int(event['args']['id'])
+                name = event['event']
+                if name in ('SettleAuction', 'TerminateAuctionPrematurely'):
+                    self._auctions.pop(id, None)
+                    stale.discard(id)
+                elif id in stale or id not in self._auctions:
+                    stale.add(id)
+                elif name in ('IncreaseBidSize', 'DecreaseSoldAmount'):
+                    self._apply_bid(id, self.auction_house.parse_event(log))
+                else:
+                    stale.add(id)
+
+        return stale
+
+    def reconcile(self, ids: Optional[List[int]] = None, block_identifier: Optional[int] = None):
+        """Reads the state of auctions from the chain, replacing what the book knows about them.
+
+        Args:
+            ids: Auctions to read, defaults to all auctions in the book.
+            block_identifier: Block to read at, defaults to the current block.
+        """
+        assert isinstance(ids, list) or ids is None
+        assert isinstance(block_identifier, int) or block_identifier is None
+
+        with self._lock:
+            if ids is None:
+                ids = sorted(self._auctions.keys())
+
+            if self.multicall is not None:
+                bids = self.auction_house.multiple_bids(ids, self.multicall, block_identifier)
+            else:
+                bids = [self.auction_house.bids(id) for id in ids]
+
+            for bid in bids:
+                if self.auction_house.is_finished(bid):
+                    self._auctions.pop(bid.id, None)
+                else:
+                    self._auctions[bid.id] = bid
+
+            logger.debug(f"Reconciled {len(ids)} auctions of {self.auction_house}")
+
+    def bid(self, id: int):
+        """Returns the state of an unfinished auction, or `None` if the auction is finished or unknown."""
+        assert isinstance(id, int)
+
+        with self._lock:
+            return self._auctions.get(id)
+
+    def unfinished_auctions(self) -> list:
+        """Returns all unfinished auctions, ordered by their identifier."""
+        with self._lock:
+            return [self._auctions[id] for id in sorted(self._auctions.keys())]
+
+    def active_auctions(self) -> list:
+        """Returns all auctions which are currently running, ordered by their identifier."""
+        now = datetime.now().timestamp()
+        return [bid for bid in self.unfinished_auctions() if self.auction_house.is_active(bid, now)]
+
+    def _decode(self, log):
+        topics = log.get('topics')
+        if not topics or HexBytes(topics[0]) not in self._decoders:
+            return None
+
+        return self._decoders[HexBytes(topics[0])].decode(log)
+
+    def _apply_bid(self, id: int, event):
+        bid = copy.copy(self._auctions[id])
+        bid.high_bidder = event.high_bidder
+        bid.amount_to_sell = event.amount_to_buy
+        bid.bid_amount = event.rad if hasattr(event, 'rad') else event.bid
+        bid.bid_expiry = event.bid_expiry
+        self._auctions[id] = bid
+
+    def __len__(self):
+        with self._lock:
+            return len(self._auctions)
+
+    def __repr__(self):
+        return f"AuctionBook({self.auction_house}, last_block={self.last_block}, auctions={len(self)})"
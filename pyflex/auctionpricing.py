@@ -0,0 +1,208 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy
+
+from pyflex import Address
+from pyflex.auctions import IncreasingDiscountCollateralAuctionHouse
+from pyflex.numeric import Wad, Ray
+
+
+WAD = 10**18
+RAY = 10**27
+
+
+def rpower(x: int, n: int, base: int) -> int:
+    """Integer exponentiation by squaring, rounding every step like `rpower` in the GEB `Math` contract."""
+    assert isinstance(x, int)
+    assert isinstance(n, int) and n >= 0
+    assert isinstance(base, int)
+
+    if x == 0:
+        return base if n == 0 else 0
+
+    z = x if n % 2 else base
+    half = base // 2
+    n //= 2
+    while n:
+        x = (x * x + half) // base
+        if n % 2:
+            z = (z * x + half) // base
+        n //= 2
+
+    return z
+
+
+class IncreasingDiscountPricing:
+    """Prices `buyCollateral` bids of an `IncreasingDiscountCollateralAuctionHouse` locally.
+
+    Holds the per-block inputs of the auction house pricing (the oracle prices, the last read redemption price and
+    the house parameters), read once with `from_auction_house()`. Quotes for any number of auctions and bid sizes are
+    then computed with the same integer math the contract uses, without calling the node. Only the quote actually
+    submitted needs to be checked with `get_approximate_collateral_bought`.
+
+    The collateral FSM and system coin prices are read through `getCollateralFSMAndFinalSystemCoinPrices`, so they
+    already have the FSM validity check and the system coin deviation bounds applied.
+
+    Attributes:
+        minimum_bid: `minimumBid` of the auction house.
+        redemption_price: `lastReadRedemptionPrice` of the auction house.
+        collateral_fsm_price: Price of the collateral from the collateral FSM, `Wad(0)` if invalid.
+        system_coin_price: Price of the system coin, bounded around the redemption price.
+        collateral_median_price: Price of the collateral from the median behind the FSM, `Wad(0)` if unavailable.
+        lower_collateral_median_deviation: `lowerCollateralMedianDeviation` of the auction house.
+        upper_collateral_median_deviation: `upperCollateralMedianDeviation` of the auction house.
+    """
+
+    def __init__(self, minimum_bid: Wad, redemption_price: Ray, collateral_fsm_price: Wad, system_coin_price: Ray,
+                 collateral_median_price: Wad, lower_collateral_median_deviation: Wad,
+                 upper_collateral_median_deviation: Wad):
+        assert isinstance(minimum_bid, Wad)
+        assert isinstance(redemption_price, Ray)
+        assert isinstance(collateral_fsm_price, Wad)
+        assert isinstance(system_coin_price, Ray)
+        assert isinstance(collateral_median_price, Wad)
+        assert isinstance(lower_collateral_median_deviation, Wad)
+        assert isinstance(upper_collateral_median_deviation, Wad)
+
+        self.minimum_bid = minimum_bid
+        self.redemption_price = redemption_price
+        self.collateral_fsm_price = collateral_fsm_price
+        self.system_coin_price = system_coin_price
+        self.collateral_median_price = collateral_median_price
+        self.lower_collateral_median_deviation = lower_collateral_median_deviation
+        self.upper_collateral_median_deviation = upper_collateral_median_deviation
+
+    @staticmethod
+    def from_auction_house(auction_house: IncreasingDiscountCollateralAuctionHouse,
+                           block_identifier: Union[int, str] = 'latest'):
+        """Reads the pricing inputs of an auction house, optionally at a given block."""
+        assert isinstance(auction_house, IncreasingDiscountCollateralAuctionHouse)
+        assert isinstance(block_identifier, (int, str))
+
+        functions = auction_house._contract.functions
+        redemption_price = functions.lastReadRedemptionPrice().call(block_identifier=block_identifier)
+        if redemption_price > 0:
+            collateral_fsm_price, system_coin_price = functions.getCollateralFSMAndFinalSystemCoinPrices(
+                redemption_price).call(block_identifier=block_identifier)
+        else:
+            collateral_fsm_price, system_coin_price = 0, 0
+
+        return IncreasingDiscountPricing(
+            minimum_bid=Wad(functions.minimumBid().call(block_identifier=block_identifier)),
+            redemption_price=Ray(redemption_price),
+            collateral_fsm_price=Wad(collateral_fsm_price),
+            system_coin_price=Ray(system_coin_price),
+            collateral_median_price=Wad(functions.getCollateralMedianPrice().call(block_identifier=block_identifier)),
+            lower_collateral_median_deviation=Wad(
+                functions.lowerCollateralMedianDeviation().call(block_identifier=block_identifier)),
+            upper_collateral_median_deviation=Wad(
+                functions.upperCollateralMedianDeviation().call(block_identifier=block_identifier)))
+
+    @staticmethod
+    def next_discount(bid: IncreasingDiscountCollateralAuctionHouse.Bid, timestamp: int) -> Wad:
+        """Returns the discount `buyCollateral` would apply at `timestamp`, like `getNextCurrentDiscount`."""
+        assert isinstance(bid, IncreasingDiscountCollateralAuctionHouse.Bid)
+        assert isinstance(timestamp, int)
+
+        if bid.forgone_collateral_receiver == Address('0x0000000000000000000000000000000000000000'):
+            return Wad(RAY)
+
+        current_discount = bid.current_discount.value
+        max_discount = bid.max_discount.value
+        if timestamp < bid.discount_increase_deadline and current_discount > max_discount:
+            # The discount value decreases (the discount increases) towards max_discount every second
+            elapsed = timestamp - bid.latest_discount_update_time
+            rate = rpower(bid.per_second_discount_update_rate.value, elapsed, RAY)
+            return Wad(max(rate * current_discount // RAY, max_discount))
+        elif (current_discount == 0 and max_discount > 0) or \
+                (timestamp >= bid.discount_increase_deadline and current_discount != max_discount):
+            return Wad(max_discount)
+        else:
+            return Wad(current_discount)
+
+    def collateral_price(self) -> Wad:
+        """Returns the collateral price used by the auction house, like `getFinalBaseCollateralPrice`."""
+        fsm_price = self.collateral_fsm_price.value
+        floor_price = fsm_price * self.lower_collateral_median_deviation.value // WAD
+        ceiling_price = fsm_price * (2 * WAD - self.upper_collateral_median_deviation.value) // WAD
+
+        median_price = self.collateral_median_price.value if self.collateral_median_price.value > 0 else fsm_price
+        if median_price < fsm_price:
+            return Wad(max(median_price, floor_price))
+        else:
+            return Wad(min(median_price, ceiling_price))
+
+    def discounted_collateral_price(self, discount: Wad) -> Wad:
+        """Returns the collateral price in system coins after `discount`, like `getDiscountedCollateralPrice`."""
+        assert isinstance(discount, Wad)
+
+        return Wad(self.collateral_price().value * RAY // self.system_coin_price.value * discount.value // WAD)
+
+    def collateral_bought(self, bid: IncreasingDiscountCollateralAuctionHouse.Bid, wad: Wad,
+                          discount: Optional[Wad] = None) -> Tuple[Wad, Wad]:
+        """Returns the collateral bought for `wad` system coins and the bid actually taken from the bidder.
+
+        With the default `discount`, this matches `getApproximateCollateralBought`, which prices with the discount
+        last stored in the auction. Pass `next_discount(bid, timestamp)` to price the way `buyCollateral`
+        would at `timestamp` instead.
+        """
+        assert isinstance(wad, Wad)
+
+        return self.collateral_bought_ladder(bid, [wad.value], discount)[0]
+
+    def collateral_bought_ladder(self, bid: IncreasingDiscountCollateralAuctionHouse.Bid, wads: Sequence[int],
+                                 discount: Optional[Wad] = None) -> List[Tuple[Wad, Wad]]:
+        """Prices a whole ladder of bids on one auction at once, see `collateral_bought`.
+
+        Args:
+            bid: Current state of the auction, as returned by `bids()`.
+            wads: Raw `Wad` values of the system coin amounts to bid.
+            discount: Discount to price with, defaults to the discount last stored in the auction.
+
+        Returns:
+            Pairs of collateral bought and adjusted bid, in the order of `wads`.
+        """
+        assert isinstance(bid, IncreasingDiscountCollateralAuctionHouse.Bid)
+        assert isinstance(discount, Wad) or discount is None
+
+        wads = numpy.array(wads, dtype=object)
+        if self.redemption_price.value == 0:
+            return [(Wad(0), Wad(int(wad))) for wad in wads]
+
+        # Bound the amount offered to what is still left to raise, see `getAdjustedBid`
+        amount_to_raise = bid.amount_to_raise.value
+        rejected = (wads == 0) | (wads < self.minimum_bid.value)
+        if bid.amount_to_sell == Wad(0) or amount_to_raise == 0:
+            rejected[:] = True
+        adjusted_bids = numpy.where(wads * RAY > amount_to_raise, amount_to_raise // RAY + 1, wads)
+        remaining = numpy.where(adjusted_bids * RAY > amount_to_raise, 0, amount_to_raise - adjusted_bids * RAY)
+        adjusted_bids = numpy.where(rejected, wads, adjusted_bids)
+        valid = ~rejected & ~((remaining > 0) & (remaining < RAY))
+
+        bought = numpy.zeros(len(wads), dtype=object)
+        if self.collateral_fsm_price.value > 0 and valid.any():
+            price = self.discounted_collateral_price(discount if discount is not None else bid.current_discount)
+            bought[valid] = numpy.minimum(adjusted_bids[valid] * WAD // price.value, bid.amount_to_sell.value)
+
+        return [(Wad(int(collateral)), Wad(int(adjusted_bid))) for collateral, adjusted_bid in zip(bought, adjusted_bids)]
+
+    def __repr__(self):
+        return f"IncreasingDiscountPricing(redemption_price={self.redemption_price}, " \
+               f"collateral_price={self.collateral_price()}, system_coin_price={self.system_coin_price})"
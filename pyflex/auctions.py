@@ -17,7 +17,7 @@
 
 from datetime import datetime
 from pprint import pformat
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from web3 import Web3
 
 from web3._utils.events import get_event_data
@@ -25,7 +25,8 @@ from web3._utils.events import get_event_data
 from eth_abi.codec import ABICodec
 from eth_abi.registry import registry as default_registry
 
-from pyflex import Contract, Address, Transact
+from pyflex import Calldata, Contract, Address, Invocation, Transact
+from pyflex.multicall import Multicall
 from pyflex.numeric import Wad, Rad, Ray
 from pyflex.token import ERC20Token
 
@@ -53,12 +54,18 @@ class AuctionContract(Contract):
         self._contract = self._get_contract(web3, abi, address)
         self._bids = bids
 
+        # Auctions below `_first_unfinished_auction` and in `_finished_auctions` are known to be settled or deleted
+        self._first_unfinished_auction = 1
+        self._finished_auctions = set()
+
         # Set ABIs for event names that are present in all auctions 
         for member in abi:
             if member.get('name') == 'StartAuction':
                 self.start_auction_abi = member
             elif member.get('name') == 'SettleAuction':
                 self.settle_auction_abi = member
+            elif member.get('name') == 'bids' and member.get('type') == 'function':
+                self._bids_output_types = [output['type'] for output in member['outputs']]
 
     def safe_engine(self) -> Address:
         """Returns the `safeEngine` address.
@@ -85,17 +92,76 @@ class AuctionContract(Contract):
         approval_function(token=ERC20Token(web3=self.web3, address=source),
                           spender_address=self.address, spender_name=self.__class__.__name__)
 
-    def active_auctions(self) -> list:
-        active_auctions = []
-        auction_count = self.auctions_started()
-        for index in range(1, auction_count + 1):
-            bid = self._bids(index)
-            if bid.high_bidder != Address("0x0000000000000000000000000000000000000000"):
-                now = datetime.now().timestamp()
-                if (bid.bid_expiry == 0 or now < bid.bid_expiry) and now < bid.auction_deadline:
-                    active_auctions.append(bid)
+    def active_auctions(self, multicall: Optional[Multicall] = None) -> list:
+        """Returns the details of all auctions which are currently running.
+
+        Auctions found settled or deleted are remembered and not read again on subsequent calls.
+
+        Args:
+            multicall: Optional :py:class:`pyflex.multicall.Multicall` used to read the bids in batches,
+                instead of one `eth_call` per auction.
+        """
+        now = datetime.now().timestamp()
+        return [bid for bid in self.unfinished_auctions(multicall) if self.is_active(bid, now)]
+
+    def unfinished_auctions(self, multicall: Optional[Multicall] = None) -> list:
+        """Returns the details of all auctions which have not been settled or deleted yet.
+
+        Unlike `active_auctions`, this includes auctions which have expired but may still be restarted.
+        """
+        assert isinstance(multicall, Multicall) or multicall is None
+
+        ids = [id for id in range(self._first_unfinished_auction, self.auctions_started() + 1)
+               if id not in self._finished_auctions]
+        if multicall is not None:
+            bids = self.multiple_bids(ids, multicall)
+        else:
+            bids = [self._bids(id) for id in ids]
+
+        unfinished_auctions = []
+        for bid in bids:
+            if self.is_finished(bid):
+                self._finished_auctions.add(bid.id)
+            else:
+                unfinished_auctions.append(bid)
+
+        while self._first_unfinished_auction in self._finished_auctions:
+            self._finished_auctions.remove(self._first_unfinished_auction)
+            self._first_unfinished_auction += 1
+
+        return unfinished_auctions
 
-        return active_auctions
+    def multiple_bids(self, ids: List[int], multicall: Multicall, block_identifier: Optional[int] = None) -> list:
+        """Reads the details of many auctions in batched `eth_call`s, all at the same block.
+
+        Args:
+            ids: Auction identifiers.
+            multicall: :py:class:`pyflex.multicall.Multicall` used to aggregate the reads.
+            block_identifier: Optional block to read at, defaults to the current block.
+
+        Returns:
+            The auction details, in the same order as `ids`.
+        """
+        assert isinstance(ids, list)
+        assert isinstance(multicall, Multicall)
+
+        invocations = [Invocation(self.address, Calldata(self._contract.functions.bids(id)._encode_transaction_data()))
+                       for id in ids]
+
+        return [self._to_bid(id, self.web3.codec.decode_abi(self._bids_output_types, data))
+                for id, data in zip(ids, multicall.aggregate(invocations, block_identifier))]
+
+    def is_finished(self, bid) -> bool:
+        """Tells whether the auction has been settled or deleted. Finished auctions never become active again."""
+        # bids are deleted once an auction is settled, and no auction can be started under the same id again
+        return bid.high_bidder == Address("0x0000000000000000000000000000000000000000")
+
+    def is_active(self, bid, now: float) -> bool:
+        """Tells whether the auction is running at timestamp `now`."""
+        return (bid.bid_expiry == 0 or now < bid.bid_expiry) and now < bid.auction_deadline
+
+    def _to_bid(self, id: int, array: list):
+        raise NotImplemented()
 
     def total_auction_length(self) -> int:
         """Returns the total auction length.
@@ -276,7 +342,9 @@ class EnglishCollateralAuctionHouse(AuctionContract):
         """
         assert(isinstance(id, int))
 
-        array = self._contract.functions.bids(id).call()
+        return self._to_bid(id, self._contract.functions.bids(id).call())
+
+    def _to_bid(self, id: int, array: list) -> Bid:
         return EnglishCollateralAuctionHouse.Bid(id=id,
                            bid_amount=Rad(array[0]),
                            amount_to_sell=Wad(array[1]),
@@ -459,8 +527,9 @@ class PreSettlementSurplusAuctionHouse(AuctionContract):
         """
         assert(isinstance(id, int))
 
-        array = self._contract.functions.bids(id).call()
+        return self._to_bid(id, self._contract.functions.bids(id).call())
 
+    def _to_bid(self, id: int, array: list) -> Bid:
         return PreSettlementSurplusAuctionHouse.Bid(id=id,
                            bid_amount=Wad(array[0]),
                            amount_to_sell=Rad(array[1]),
@@ -634,8 +703,9 @@ class DebtAuctionHouse(AuctionContract):
         """
         assert(isinstance(id, int))
 
-        array = self._contract.functions.bids(id).call()
+        return self._to_bid(id, self._contract.functions.bids(id).call())
 
+    def _to_bid(self, id: int, array: list) -> Bid:
         return DebtAuctionHouse.Bid(id=id,
                            bid_amount=Rad(array[0]),
                            amount_to_sell=Wad(array[1]),
@@ -784,15 +854,11 @@ class FixedDiscountCollateralAuctionHouse(AuctionContract):
 
         assert self._contract.functions.AUCTION_TYPE().call() == toBytes('FIXED_DISCOUNT')
 
-    def active_auctions(self) -> list:
-        active_auctions = []
-        auction_count = self.auctions_started()
-        for index in range(1, auction_count + 1):
-            bid = self._bids(index)
-            if bid.amount_to_sell > Wad(0) and bid.amount_to_raise > Rad(0):
-                active_auctions.append(bid)
+    def is_finished(self, bid) -> bool:
+        return bid.amount_to_sell == Wad(0) or bid.amount_to_raise == Rad(0)
 
-        return active_auctions
+    def is_active(self, bid, now: float) -> bool:
+        return bid.amount_to_sell > Wad(0) and bid.amount_to_raise > Rad(0)
    
     def get_collateral_median_price(self) -> Ray:
         """Returns the market price from system coin oracle.
@@ -841,8 +907,9 @@ class FixedDiscountCollateralAuctionHouse(AuctionContract):
         """
         assert(isinstance(id, int))
 
-        array = self._contract.functions.bids(id).call()
+        return self._to_bid(id, self._contract.functions.bids(id).call())
 
+    def _to_bid(self, id: int, array: list) -> Bid:
         return FixedDiscountCollateralAuctionHouse.Bid(id=id,
                            raised_amount=Rad(array[0]),
                            sold_amount=Wad(array[1]),
@@ -1007,15 +1074,11 @@ class IncreasingDiscountCollateralAuctionHouse(AuctionContract):
         #assert self._contract.functions.AUCTION_TYPE().call() == toBytes('INCREASING_DISCOUNT')
         #assert self._contract.functions.AUCTION_TYPE().call() == toBytes('FIXED_DISCOUNT')
    
-    def active_auctions(self) -> list:
-        active_auctions = []
-        auction_count = self.auctions_started()
-        for index in range(1, auction_count + 1):
-            bid = self._bids(index)
-            if bid.amount_to_sell > Wad(0) and bid.amount_to_raise > Rad(0):
-                active_auctions.append(bid)
+    def is_finished(self, bid) -> bool:
+        return bid.amount_to_sell == Wad(0) or bid.amount_to_raise == Rad(0)
 
-        return active_auctions
+    def is_active(self, bid, now: float) -> bool:
+        return bid.amount_to_sell > Wad(0) and bid.amount_to_raise > Rad(0)
 
     def get_collateral_median_price(self) -> Ray:
         """Returns the market price from system coin oracle.
@@ -1087,8 +1150,9 @@ class IncreasingDiscountCollateralAuctionHouse(AuctionContract):
         """
         assert(isinstance(id, int))
 
-        array = self._contract.functions.bids(id).call()
+        return self._to_bid(id, self._contract.functions.bids(id).call())
 
+    def _to_bid(self, id: int, array: list) -> Bid:
         return IncreasingDiscountCollateralAuctionHouse.Bid(id=id,
                            amount_to_sell=Wad(array[0]),
                            amount_to_raise=Rad(array[1]),
@@ -1277,8 +1341,9 @@ class StakedTokenAuctionHouse(AuctionContract):
         """
         assert(isinstance(id, int))
 
-        array = self._contract.functions.bids(id).call()
+        return self._to_bid(id, self._contract.functions.bids(id).call())
 
+    def _to_bid(self, id: int, array: list) -> Bid:
         return StakedTokenAuctionHouse.Bid(id=id,
                            bid_amount=Rad(array[0]),
                            amount_to_sell=Wad(array[1]),
@@ -16,18 +16,21 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import json
+import logging
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
-import pkg_resources
 from pyflex.auctions import PreSettlementSurplusAuctionHouse
 from pyflex.auctions import IncreasingDiscountCollateralAuctionHouse, EnglishCollateralAuctionHouse
 from pyflex.auctions import FixedDiscountCollateralAuctionHouse, DebtAuctionHouse
 from pyflex.auctions import StakedTokenAuctionHouse
 from web3 import Web3, HTTPProvider
 
-from pyflex import Address
+from pyflex import Address, prevalidate_contracts
+from pyflex.abiregistry import abi_registry
 from pyflex.approval import directly, approve_safe_modification_directly
 from pyflex.auth import DSGuard
 from pyflex.gf import LiquidationEngine, Collateral, CoinJoin, BasicCollateralJoin, CollateralType
@@ -37,6 +40,7 @@ from pyflex.gf import GebStaking
 from pyflex.proxy import ProxyRegistry, GebProxyActions
 from pyflex.feed import DSValue
 from pyflex.gas import DefaultGasPrice
+from pyflex.multicall import Multicall
 from pyflex.governance import DSPause
 from pyflex.numeric import Wad, Ray
 from pyflex.oracles import OSM
@@ -44,6 +48,8 @@ from pyflex.shutdown import ESM, GlobalSettlement
 from pyflex.token import DSToken, DSEthToken
 from pyflex.safemanager import SafeManager
 
+logger = logging.getLogger()
+
 def deploy_contract(web3: Web3, contract_name: str, args: Optional[list] = None) -> Address:
     """Deploys a new contract.
 
@@ -59,8 +65,8 @@ def deploy_contract(web3: Web3, contract_name: str, args: Optional[list] = None)
     assert(isinstance(contract_name, str))
     assert(isinstance(args, list) or (args is None))
 
-    abi = json.loads(pkg_resources.resource_string('pyflex.deployment', f'abi/{contract_name}.abi'))
-    bytecode = str(pkg_resources.resource_string('pyflex.deployment', f'abi/{contract_name}.bin'), 'utf-8')
+    abi = abi_registry.abi('pyflex.deployment', f'abi/{contract_name}.abi')
+    bytecode = abi_registry.bin('pyflex.deployment', f'abi/{contract_name}.bin')
     if args is not None:
         tx_hash = web3.eth.contract(abi=abi, bytecode=bytecode).constructor(*args).transact()
     else:
@@ -90,7 +96,8 @@ class GfDeployment:
                      global_settlement: GlobalSettlement,
                      proxy_registry: ProxyRegistry, proxy_actions: GebProxyActions, safe_manager: SafeManager,
                      uniswap_factory: Address, uniswap_router: Address, mc_keeper_flash_proxy: GebMCKeeperFlashProxy,
-                     starting_block_number: int, collaterals: Optional[Dict[str, Collateral]] = None):
+                     starting_block_number: int, collaterals: Optional[Dict[str, Collateral]] = None,
+                     multicall: Optional[Multicall] = None):
             self.pause = pause
             self.safe_engine = safe_engine
             self.accounting_engine = accounting_engine
@@ -117,10 +124,25 @@ class GfDeployment:
             self.mc_keeper_flash_proxy = mc_keeper_flash_proxy
             self.starting_block_number = starting_block_number
             self.collaterals = collaterals or {}
+            self.multicall = multicall
 
         @staticmethod
-        def from_json(web3: Web3, conf: str):
+        def from_json(web3: Web3, conf: str, trusted: bool = False):
+            """Builds the deployment from a json description of all the system addresses.
+
+            All addresses are checked for code concurrently upfront, instead of one `eth_getCode` request per
+            contract wrapper. With `trusted`, the addresses are assumed to be correct and are not checked at all.
+            Contracts the wrappers only refer to, like the `SAFEEngine` of a `LiquidationEngine`, are read on first use.
+            """
+            assert isinstance(trusted, bool)
+
+            started = time.time()
             conf = json.loads(conf)
+            addresses = [Address(value) for value in conf.values()
+                         if isinstance(value, str) and re.fullmatch(r'0x[0-9a-fA-F]{40}', value)]
+            prevalidate_contracts(web3, addresses, trusted)
+            validated = time.time()
+
             pause = DSPause(web3, Address(conf['GEB_PAUSE']))
             safe_engine = SAFEEngine(web3, Address(conf['GEB_SAFE_ENGINE']))
             accounting_engine = AccountingEngine(web3, Address(conf['GEB_ACCOUNTING_ENGINE']))
@@ -162,6 +184,11 @@ class GfDeployment:
             except:
                 esm = None
            
+            try:
+                multicall = Multicall(web3, Address(conf['MULTICALL']))
+            except:
+                multicall = None
+
             try:
                 uniswap_factory = Address(conf['UNISWAP_FACTORY'])
             except:
@@ -173,6 +200,7 @@ class GfDeployment:
                 uniswap_router = None
 
             collaterals = {}
+            network = GfDeployment.NETWORKS.get(web3.net.version, "testnet")
             for name in GfDeployment.Config._infer_collaterals_from_addresses(conf.keys()):
                 collateral_type = CollateralType(name[0].replace('_', '-'))
                 if name[1] == "ETH":
@@ -182,8 +210,6 @@ class GfDeployment:
 
                 # osm_address contract may be a DSValue, OSM, DSM, or bogus address.
                 osm_address = Address(conf[f'FEED_SECURITY_MODULE_{name[1]}'])
-                network = GfDeployment.NETWORKS.get(web3.net.version, "testnet")
-
                 osm = DSValue(web3, osm_address) if network == "testnet" else OSM(web3, osm_address)
 
                 adapter = BasicCollateralJoin(web3, Address(conf[f'GEB_JOIN_{name[0]}']))
@@ -228,12 +254,14 @@ class GfDeployment:
 
                 collaterals[collateral_type.name] = collateral
 
+            logger.info(f"Loaded deployment in {time.time() - started:.3f}s ({validated - started:.3f}s checking"
+                        f" {len(addresses)} addresses{' skipped, trusted' if trusted else ''})")
             return GfDeployment.Config(pause, safe_engine, accounting_engine, tax_collector, liquidation_engine, geb_staking,
                                        surplus_auction_house, debt_auction_house, staked_token_auction_house,
                                        coin_savings_acct, system_coin, system_coin_adapter,
                                        prot, oracle_relayer, redemption_price_snap, esm, global_settlement, proxy_registry, proxy_actions,
                                        safe_manager, uniswap_factory, uniswap_router, mc_keeper_flash_proxy, 
-                                       starting_block_number, collaterals)
+                                       starting_block_number, collaterals, multicall)
 
         @staticmethod
         def _infer_collaterals_from_addresses(keys: []) -> List:
@@ -271,6 +299,7 @@ class GfDeployment:
                 'UNISWAP_FACTORY': self.uniswap_factory.address,
                 'UNISWAP_ROUTER': self.uniswap_router.address,
                 'GEB_MC_KEEPER_FLASH_PROXY': self.mc_keeper_flash_proxy.address.address,
+                'MULTICALL': self.multicall.address.address if self.multicall else None,
                 'STARTING_BLOCK_NUMBER': self.starting_block_number
             }
 
@@ -319,16 +348,17 @@ class GfDeployment:
         self.uniswap_router = config.uniswap_router
         self.mc_keeper_flash_proxy = config.mc_keeper_flash_proxy
         self.starting_block_number = config.starting_block_number
+        self.multicall = config.multicall
 
     @staticmethod
-    def from_file(web3: Web3, addresses_path: str):
-        return GfDeployment(web3, GfDeployment.Config.from_json(web3, open(addresses_path, "r").read()))
+    def from_file(web3: Web3, addresses_path: str, trusted: bool = False):
+        return GfDeployment(web3, GfDeployment.Config.from_json(web3, open(addresses_path, "r").read(), trusted))
 
     def to_json(self) -> str:
         return self.config.to_json()
 
     @staticmethod
-    def from_node(web3: Web3, system_coin: str):
+    def from_node(web3: Web3, system_coin: str, trusted: bool = False):
         assert isinstance(web3, Web3)
 
         network = GfDeployment.NETWORKS.get(web3.net.version, "testnet")
@@ -339,17 +369,17 @@ class GfDeployment:
                 raise RuntimeError(f"system coin '{system_coin}' does not match testchain {testchain}")
             network = '-'.join(testchain.split('-')[1:]) # eg. testchain-value-fixed-discount-uniswap-vote-quorum
 
-        return GfDeployment.from_network(web3=web3, network=network, system_coin=system_coin)
+        return GfDeployment.from_network(web3=web3, network=network, system_coin=system_coin, trusted=trusted)
 
     @staticmethod
-    def from_network(web3: Web3, network: str, system_coin: str):
+    def from_network(web3: Web3, network: str, system_coin: str, trusted: bool = False):
         assert isinstance(web3, Web3)
         assert isinstance(network, str)
 
         cwd = os.path.dirname(os.path.realpath(__file__))
         addresses_path = os.path.join(cwd, "../config", f"{system_coin}-{network}-addresses.json")
 
-        return GfDeployment.from_file(web3, addresses_path)
+        return GfDeployment.from_file(web3, addresses_path, trusted)
 
     def approve_system_coin(self, address: Address, **kwargs):
         """
@@ -365,18 +395,36 @@ class GfDeployment:
                                  source=self.safe_engine.address)
         self.system_coin.approve(self.system_coin_adapter.address).transact(from_address=address, gas_price=gas_price)
 
-    def active_auctions(self) -> dict:
-        collateral_auctions = {}
-        for collateral in self.collaterals.values():
-            # Each collateral has it's own collateral auction contract; add auctions from each.
-            collateral_auctions[collateral.collateral_type.name] = collateral.collateral_auction_house.active_auctions()
-
-        return {
-            "collateral_auctions": collateral_auctions,
-            "surplus_auctions": self.surplus_auction_house.active_auctions(),
-            "debt_auctions": self.debt_auction_house.active_auctions(),
-            "staked_token_auctions": self.staked_token_auction_house.active_auctions()
-        }
+    def active_auctions(self, max_workers: int = 8) -> dict:
+        """Returns the active auctions of every auction house, reading all houses concurrently.
+
+        Bids are read in batches through `Multicall` if the deployment has one configured.
+        """
+        assert isinstance(max_workers, int) and max_workers > 0
+
+        def active_auctions(auction_house):
+            return auction_house.active_auctions(self.multicall) if auction_house is not None else []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each collateral has it's own collateral auction contract, but collateral types of the same token
+            # may share it; read each contract only once.
+            futures = {}
+            collateral_auctions = {}
+            for name, collateral in self.collaterals.items():
+                auction_house = collateral.collateral_auction_house
+                if auction_house.address not in futures:
+                    futures[auction_house.address] = executor.submit(active_auctions, auction_house)
+                collateral_auctions[name] = futures[auction_house.address]
+            surplus_auctions = executor.submit(active_auctions, self.surplus_auction_house)
+            debt_auctions = executor.submit(active_auctions, self.debt_auction_house)
+            staked_token_auctions = executor.submit(active_auctions, self.staked_token_auction_house)
+
+            return {
+                "collateral_auctions": {name: future.result() for name, future in collateral_auctions.items()},
+                "surplus_auctions": surplus_auctions.result(),
+                "debt_auctions": debt_auctions.result(),
+                "staked_token_auctions": staked_token_auctions.result()
+            }
 
     def __repr__(self):
         return f'GfDeployment({self.config.to_json()})'
@@ -0,0 +1,313 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import sqlite3
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import BlockNotFound
+
+from pyflex import Address
+from pyflex.gf import SAFEEngine, LiquidationEngine
+from pyflex.logs import LogFetcher
+from pyflex.util import bytes_to_hexstring
+
+
+logger = logging.getLogger()
+
+
+class EventIndex:
+    """A persistent, append-only store of the logs emitted by a set of contracts, backed by SQLite.
+
+    Logs are fetched with :py:class:`pyflex.logs.LogFetcher` and stored undecoded, so any of the existing
+    parsers (like `SAFEEngine.LogModifySAFECollateralization.from_event`, `LiquidationEngine.LogLiquidate.from_event`
+    or the `parse_event` method of auction contracts) can be applied when reading them back.
+
+    Only the logs matching the topic filter given for their contract are indexed, so that busy contracts like
+    `SAFEEngine` do not fill the index with unrelated events.
+
+    Every call to `sync()` resumes from the last indexed block. If the hash of that block no longer matches
+    the chain, a reorganization is assumed and the last `reorg_depth` blocks are discarded and indexed again.
+
+    Example:
+        index = EventIndex.for_deployment(geb, 'events.db')
+        index.sync()
+        modifications = index.events(geb.safe_engine.address, SAFEEngine.LogModifySAFECollateralization.from_event)
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        path: Path of the SQLite database, or `:memory:`.
+        addresses: Addresses of the contracts whose logs are indexed.
+        topics: Topic filter (as accepted by `eth_getLogs`) of the logs indexed for each address. Addresses
+            without one have all their logs indexed.
+        starting_block: First block indexed when the database is empty.
+        reorg_depth: Number of most recent blocks discarded when a reorganization is detected.
+        log_fetcher: Fetcher used to retrieve the logs from the node.
+    """
+
+    AUCTION_EVENTS = {'StartAuction', 'IncreaseBidSize', 'DecreaseSoldAmount', 'BuyCollateral', 'RestartAuction',
+                      'TerminateAuctionPrematurely', 'SettleAuction'}
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS logs (block_number INTEGER NOT NULL, log_index INTEGER NOT NULL,"
+        " address TEXT NOT NULL, topic TEXT, log TEXT NOT NULL, PRIMARY KEY (block_number, log_index))",
+        "CREATE INDEX IF NOT EXISTS logs_address ON logs (address, block_number)",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+    ]
+
+    def __init__(self, web3: Web3, path: str, addresses: List[Address], starting_block: int, reorg_depth: int = 12,
+                 log_fetcher: Optional[LogFetcher] = None, topics: Optional[Dict[Address, list]] = None):
+        assert isinstance(web3, Web3)
+        assert isinstance(path, str)
+        assert isinstance(addresses, list) and len(addresses) > 0
+        assert all(isinstance(address, Address) for address in addresses)
+        assert isinstance(topics, dict) or topics is None
+        assert all(address in addresses and isinstance(topics[address], list) for address in (topics or {}))
+        assert isinstance(starting_block, int) and starting_block >= 0
+        assert isinstance(reorg_depth, int) and reorg_depth > 0
+        assert isinstance(log_fetcher, LogFetcher) or log_fetcher is None
+
+        self.web3 = web3
+        self.path = path
+        self.addresses = sorted(set(addresses))
+        self.starting_block = starting_block
+        self.reorg_depth = reorg_depth
+        self.log_fetcher = log_fetcher if log_fetcher is not None else LogFetcher(web3)
+        self.topics = topics if topics is not None else {}
+
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            for statement in self.SCHEMA:
+                self._connection.execute(statement)
+
+        addresses = json.dumps([address.address for address in self.addresses])
+        indexed = self._get_meta('addresses')
+        if indexed is None:
+            with self._connection:
+                self._set_meta('addresses', addresses)
+        elif indexed != addresses:
+            raise Exception(f"Event index at {path} was built for a different set of contracts")
+
+        topics = json.dumps({address.address: self.topics[address] for address in self.addresses
+                             if address in self.topics})
+        indexed = self._get_meta('topics')
+        if indexed is None:
+            with self._connection:
+                self._set_meta('topics', topics)
+        elif indexed != topics:
+            raise Exception(f"Event index at {path} was built for a different set of events")
+
+    @staticmethod
+    def for_deployment(geb, path: str, reorg_depth: int = 12):
+        """Creates an index of SAFE modifications, liquidations and auction events of a `GfDeployment`.
+
+        Indexing starts at the `starting_block_number` of the deployment. Besides `ModifySAFECollateralization`,
+        the `TransferSAFECollateralAndDebt` and `ConfiscateSAFECollateralAndDebt` logs are indexed, so that
+        :py:class:`pyflex.safeindex.SafeIndex` can be seeded from the index.
+        """
+        topics = {
+            geb.safe_engine.address: [[bytes_to_hexstring(SAFEEngine.LogModifySAFECollateralization.topic),
+                                       bytes_to_hexstring(SAFEEngine.LogTransferSAFECollateralAndDebt.topic),
+                                       bytes_to_hexstring(SAFEEngine.LogConfiscateSAFECollateralAndDebt.topic)]],
+            geb.liquidation_engine.address: [bytes_to_hexstring(LiquidationEngine.LogLiquidate.topic)]
+        }
+
+        auction_houses = [collateral.collateral_auction_house for collateral in geb.collaterals.values()]
+        auction_houses += [geb.surplus_auction_house, geb.debt_auction_house]
+        for auction_house in auction_houses:
+            if auction_house is not None:
+                topics[auction_house.address] = EventIndex._auction_topics(auction_house)
+
+        return EventIndex(geb.web3, path, list(topics.keys()), geb.starting_block_number, reorg_depth, topics=topics)
+
+    def last_block(self) -> Optional[int]:
+        """Returns the number of the most recent block already indexed, or `None` if the index is empty."""
+        last_block = self._get_meta('last_block')
+        return int(last_block) if last_block is not None else None
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """Indexes all logs emitted since the last indexed block.
+
+        Args:
+            to_block: Newest block to index, defaults to the current block.
+
+        Returns:
+            The number of logs added to the index.
+        """
+        assert isinstance(to_block, int) or to_block is None
+
+        with self._lock:
+            if to_block is None:
+                to_block = self.web3.eth.blockNumber
+
+            last_block = self.last_block()
+            if last_block is not None and self._get_meta('last_block_hash') != self._block_hash(last_block):
+                rollback_to = max(last_block - self.reorg_depth, self.starting_block - 1)
+                logger.warning(f"Block #{last_block} is no longer part of the chain, "
+                               f"rolling the event index back to block #{rollback_to}")
+                self._rollback(rollback_to)
+                last_block = rollback_to
+
+            from_block = last_block + 1 if last_block is not None else self.starting_block
+            if from_block > to_block:
+                return 0
+
+            # If `to_block` gets reorganized while the logs are fetched, they may come from either chain
+            for attempt in range(3):
+                to_block_hash = self._block_hash(to_block)
+                logs = []
+                for address in self.addresses:
+                    logs += self.log_fetcher.get_logs(address, self.topics.get(address), from_block, to_block)
+
+                if self._block_hash(to_block) == to_block_hash and \
+                        all(bytes_to_hexstring(log['blockHash']) == to_block_hash
+                            for log in logs if log['blockNumber'] == to_block):
+                    break
+
+                logger.warning(f"Block #{to_block} was reorganized while indexing, fetching the logs again")
+            else:
+                raise Exception(f"Block #{to_block} keeps being reorganized, giving up indexing")
+
+            with self._connection:
+                self._connection.executemany("INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?)",
+                                             [(log['blockNumber'],
+                                               log['logIndex'],
+                                               Address(log['address']).address,
+                                               bytes_to_hexstring(log['topics'][0]) if log['topics'] else None,
+                                               json.dumps(self._serialize(log))) for log in logs])
+                self._set_meta('last_block', str(to_block))
+                self._set_meta('last_block_hash', to_block_hash)
+
+            logger.debug(f"Indexed {len(logs)} logs from block #{from_block} to #{to_block}")
+            return len(logs)
+
+    def logs(self, address: Optional[Address] = None, topic: Optional[str] = None,
+             from_block: Optional[int] = None, to_block: Optional[int] = None) -> List[AttributeDict]:
+        """Reads raw logs back from the index, ordered by block number and log index.
+
+        Args:
+            address: Only return logs emitted by this contract.
+            topic: Only return logs with this first topic (event signature), as a hex string.
+            from_block: Oldest block to return the logs from.
+            to_block: Newest block to return the logs from.
+
+        Returns:
+            Logs in the same format as returned by `web3.eth.getLogs`.
+        """
+        assert isinstance(address, Address) or address is None
+        assert isinstance(topic, str) or topic is None
+        assert isinstance(from_block, int) or from_block is None
+        assert isinstance(to_block, int) or to_block is None
+
+        conditions = []
+        params = []
+        if address is not None:
+            conditions.append("address = ?")
+            params.append(address.address)
+        if topic is not None:
+            conditions.append("topic = ?")
+            params.append(topic.lower())
+        if from_block is not None:
+            conditions.append("block_number >= ?")
+            params.append(from_block)
+        if to_block is not None:
+            conditions.append("block_number <= ?")
+            params.append(to_block)
+
+        query = "SELECT log FROM logs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY block_number, log_index"
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        return [self._deserialize(json.loads(row[0])) for row in rows]
+
+    def events(self, address: Address, parser: Callable, from_block: Optional[int] = None,
+               to_block: Optional[int] = None) -> list:
+        """Reads logs of one contract back from the index and decodes them.
+
+        Args:
+            address: Address of the contract which emitted the logs.
+            parser: Function decoding a single log, returning `None` for logs it does not recognize.
+            from_block: Oldest block to return the events from.
+            to_block: Newest block to return the events from.
+
+        Returns:
+            Decoded events, ordered by block number and log index.
+        """
+        assert isinstance(address, Address)
+        assert callable(parser)
+
+        events = map(parser, self.logs(address=address, from_block=from_block, to_block=to_block))
+        return [event for event in events if event is not None]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _auction_topics(auction_house) -> list:
+        return [[bytes_to_hexstring(event_abi_to_log_topic(member)) for member in auction_house.abi
+                 if member.get('type') == 'event' and member.get('name') in EventIndex.AUCTION_EVENTS]]
+
+    def _block_hash(self, block_number: int) -> Optional[str]:
+        try:
+            return bytes_to_hexstring(self.web3.eth.getBlock(block_number)['hash'])
+        except BlockNotFound:
+            return None
+
+    def _rollback(self, block_number: int):
+        with self._connection:
+            self._connection.execute("DELETE FROM logs WHERE block_number > ?", (block_number,))
+            if block_number >= self.starting_block:
+                self._set_meta('last_block', str(block_number))
+                self._set_meta('last_block_hash', self._block_hash(block_number))
+            else:
+                self._connection.execute("DELETE FROM meta WHERE key IN ('last_block', 'last_block_hash')")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _set_meta(self, key: str, value: str):
+        self._connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _serialize(log) -> dict:
+        return {key: bytes_to_hexstring(value) if isinstance(value, bytes)
+                else [bytes_to_hexstring(topic) for topic in value] if key == 'topics'
+                else value
+                for key, value in log.items()}
+
+    @staticmethod
+    def _deserialize(log: dict) -> AttributeDict:
+        return AttributeDict({key: HexBytes(value) if key in ('blockHash', 'transactionHash')
+                              else [HexBytes(topic) for topic in value] if key == 'topics'
+                              else value
+                              for key, value in log.items()})
+
+    def __repr__(self):
+        return f"EventIndex('{self.path}')"
@@ -19,6 +19,7 @@
 import logging
 from collections import defaultdict
 from datetime import datetime
+from functools import cached_property
 from pprint import pformat
 from typing import Optional, List, Union
 
@@ -30,14 +31,17 @@ from web3._utils.events import get_event_data
 from eth_abi.codec import ABICodec
 from eth_abi.registry import registry as default_registry
 
-from pyflex import Address, Contract, Transact
+from pyflex import Address, Calldata, Contract, Invocation, Transact
 from pyflex.approval import directly, approve_safe_modification_directly
 from pyflex.auctions import PreSettlementSurplusAuctionHouse
 from pyflex.auctions import FixedDiscountCollateralAuctionHouse, EnglishCollateralAuctionHouse
 from pyflex.auctions import IncreasingDiscountCollateralAuctionHouse, DebtAuctionHouse
 from pyflex.gas import DefaultGasPrice
+from pyflex.logs import LogFetcher
+from pyflex.multicall import Multicall
 from pyflex.token import DSToken, ERC20Token
 from pyflex.numeric import Wad, Ray, Rad
+from pyflex.util import bytes_to_hexstring
 
 
 logger = logging.getLogger()
@@ -164,6 +168,9 @@ class SAFE:
 
 
 class BasicTokenAdapter(Contract):
+    # Token joined by the adapter, read on first use by the subclasses
+    _token: DSToken = None
+
     def __init__(self, web3: Web3, address: Address):
         assert isinstance(web3, Web3)
         assert isinstance(address, Address)
@@ -171,7 +178,6 @@ class BasicTokenAdapter(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
-        self._token: DSToken = None
 
     def approve(self, approval_function, source: Address):
         assert(callable(approval_function))
@@ -208,7 +214,10 @@ class CoinJoin(BasicTokenAdapter):
 
     def __init__(self, web3: Web3, address: Address):
         super(CoinJoin, self).__init__(web3, address)
-        self._token = self.system_coin()
+
+    @cached_property
+    def _token(self) -> DSToken:
+        return self.system_coin()
 
     def system_coin(self) -> DSToken:
         address = Address(self._contract.functions.systemCoin().call())
@@ -226,7 +235,10 @@ class BasicCollateralJoin(BasicTokenAdapter):
 
     def __init__(self, web3: Web3, address: Address):
         super(BasicCollateralJoin, self).__init__(web3, address)
-        self._token = self.collateral()
+
+    @cached_property
+    def _token(self) -> DSToken:
+        return self.collateral()
 
     def collateral_type(self):
         return CollateralType.fromBytes(self._contract.functions.collateralType().call())
@@ -388,11 +400,13 @@ class SAFEEngine(Contract):
             self.global_debt = Wad(log['args']['globalDebt'])
             self.raw = log
 
+        topic = HexBytes('0x182725621f9c0d485fb256f86699c82616bd6e4670325087fd08f643cab7d917')
+
         @classmethod
         def from_event(cls, event: dict):
 
             topics = event.get('topics')
-            if topics and topics[0] == HexBytes('0x182725621f9c0d485fb256f86699c82616bd6e4670325087fd08f643cab7d917'):
+            if topics and topics[0] == cls.topic:
                 log_abi = [abi for abi in SAFEEngine.abi if abi.get('name') == 'ModifySAFECollateralization'][0]
                 codec = ABICodec(default_registry)
                 event_data = get_event_data(codec, log_abi, event)
@@ -405,6 +419,70 @@ class SAFEEngine(Contract):
         def __repr__(self):
             return f"LogModifySAFECollateralization({pformat(vars(self))})"
 
+    # This information is read from the `TransferSAFECollateralAndDebt` event emitted from `SAFEEngine.transferSAFECollateralAndDebt`
+    class LogTransferSAFECollateralAndDebt:
+        def __init__(self, log):
+            self.collateral_type = CollateralType.fromBytes(log['args']['collateralType']).name
+            self.src = Address(log['args']['src'])
+            self.dst = Address(log['args']['dst'])
+            self.delta_collateral = Wad(log['args']['deltaCollateral'])
+            self.delta_debt = Wad(log['args']['deltaDebt'])
+            self.src_locked_collateral = Wad(log['args']['srcLockedCollateral'])
+            self.src_generated_debt = Wad(log['args']['srcGeneratedDebt'])
+            self.dst_locked_collateral = Wad(log['args']['dstLockedCollateral'])
+            self.dst_generated_debt = Wad(log['args']['dstGeneratedDebt'])
+            self.raw = log
+
+        topic = HexBytes('0x4b49cc19514005253f36d0517c21b92404f50cc0d9e0c070af00b96e296b0835')
+
+        @classmethod
+        def from_event(cls, event: dict):
+
+            topics = event.get('topics')
+            if topics and topics[0] == cls.topic:
+                log_abi = [abi for abi in SAFEEngine.abi if abi.get('name') == 'TransferSAFECollateralAndDebt'][0]
+                codec = ABICodec(default_registry)
+                event_data = get_event_data(codec, log_abi, event)
+                return SAFEEngine.LogTransferSAFECollateralAndDebt(event_data)
+
+        def __eq__(self, other):
+            assert isinstance(other, SAFEEngine.LogTransferSAFECollateralAndDebt)
+            return self.__dict__ == other.__dict__
+
+        def __repr__(self):
+            return f"LogTransferSAFECollateralAndDebt({pformat(vars(self))})"
+
+    # This information is read from the `ConfiscateSAFECollateralAndDebt` event emitted from `SAFEEngine.confiscateSAFECollateralAndDebt`
+    class LogConfiscateSAFECollateralAndDebt:
+        def __init__(self, log):
+            self.collateral_type = CollateralType.fromBytes(log['args']['collateralType']).name
+            self.safe = Address(log['args']['safe'])
+            self.collateral_counterparty = Address(log['args']['collateralCounterparty'])
+            self.debt_counterparty = Address(log['args']['debtCounterparty'])
+            self.delta_collateral = Wad(log['args']['deltaCollateral'])
+            self.delta_debt = Wad(log['args']['deltaDebt'])
+            self.global_unbacked_debt = Rad(log['args']['globalUnbackedDebt'])
+            self.raw = log
+
+        topic = HexBytes('0x9bef7b734be54aaed05e906c2ccf923767f44a93d136b674e212ce858a6d031c')
+
+        @classmethod
+        def from_event(cls, event: dict):
+
+            topics = event.get('topics')
+            if topics and topics[0] == cls.topic:
+                log_abi = [abi for abi in SAFEEngine.abi if abi.get('name') == 'ConfiscateSAFECollateralAndDebt'][0]
+                codec = ABICodec(default_registry)
+                event_data = get_event_data(codec, log_abi, event)
+                return SAFEEngine.LogConfiscateSAFECollateralAndDebt(event_data)
+
+        def __eq__(self, other):
+            assert isinstance(other, SAFEEngine.LogConfiscateSAFECollateralAndDebt)
+            return self.__dict__ == other.__dict__
+
+        def __repr__(self):
+            return f"LogConfiscateSAFECollateralAndDebt({pformat(vars(self))})"
+
     abi = Contract._load_abi(__name__, 'abi/SAFEEngine.abi')
     bin = Contract._load_bin(__name__, 'abi/SAFEEngine.bin')
 
@@ -415,6 +493,7 @@ class SAFEEngine(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
+        self._log_fetcher = None
 
     def init(self, collateral_type: CollateralType) -> Transact:
         assert isinstance(collateral_type, CollateralType)
@@ -474,6 +553,64 @@ class SAFEEngine(Contract):
         (locked_collateral, generated_debt) = self._contract.functions.safes(collateral_type.toBytes(), address.address).call()
         return SAFE(address, collateral_type, Wad(locked_collateral), Wad(generated_debt))
 
+    def safes(self, collateral_type: CollateralType, addresses: List[Address], multicall: Multicall,
+              block_identifier: Optional[int] = None) -> List[SAFE]:
+        """Reads many SAFEs of one collateral type in batched `eth_call`s, all at the same block.
+
+        Args:
+            collateral_type: Identifies the type of collateral.
+            addresses: SAFE holders (addresses of the SAFEs).
+            multicall: :py:class:`pyflex.multicall.Multicall` used to aggregate the reads.
+            block_identifier: Optional block to read at, defaults to the current block.
+
+        Returns:
+            List of :py:class:`pyflex.gf.SAFE`, in the same order as `addresses`.
+        """
+        assert isinstance(collateral_type, CollateralType)
+        assert isinstance(addresses, list)
+        assert isinstance(multicall, Multicall)
+
+        b32_collateral_type = collateral_type.toBytes()
+        invocations = [Invocation(self.address, Calldata(self._contract.functions.safes(b32_collateral_type, address.address)
+                                                         ._encode_transaction_data()))
+                       for address in addresses]
+
+        safes = []
+        for address, data in zip(addresses, multicall.aggregate(invocations, block_identifier)):
+            (locked_collateral, generated_debt) = self.web3.codec.decode_abi(['uint256', 'uint256'], data)
+            safes.append(SAFE(address, collateral_type, Wad(locked_collateral), Wad(generated_debt)))
+
+        return safes
+
+    def collateral_types(self, names: List[str], multicall: Multicall,
+                         block_identifier: Optional[int] = None) -> List[CollateralType]:
+        """Reads many collateral types in batched `eth_call`s, all at the same block.
+
+        Args:
+            names: Names of the collateral types, i.e. `ETH-A`.
+            multicall: :py:class:`pyflex.multicall.Multicall` used to aggregate the reads.
+            block_identifier: Optional block to read at, defaults to the current block.
+
+        Returns:
+            List of :py:class:`pyflex.gf.CollateralType`, in the same order as `names`.
+        """
+        assert isinstance(names, list)
+        assert isinstance(multicall, Multicall)
+
+        invocations = [Invocation(self.address, Calldata(self._contract.functions.collateralTypes(CollateralType(name).toBytes())
+                                                         ._encode_transaction_data()))
+                       for name in names]
+
+        collateral_types = []
+        for name, data in zip(names, multicall.aggregate(invocations, block_identifier)):
+            (safe_debt, rate, safety_price, d_ceiling, d_floor, liq_price) = self.web3.codec.decode_abi(['uint256'] * 6, data)
+            collateral_types.append(CollateralType(name, accumulated_rate=Ray(rate), safe_collateral=Wad(0),
+                                                   safe_debt=Wad(safe_debt), safety_price=Ray(safety_price),
+                                                   liquidation_price=Ray(liq_price), debt_ceiling=Rad(d_ceiling),
+                                                   debt_floor=Rad(d_floor)))
+
+        return collateral_types
+
     def global_debt(self) -> Rad:
         return Rad(self._contract.functions.globalDebt().call())
 
@@ -635,13 +772,15 @@ class SAFEEngine(Contract):
         assert calm and is_safe and neat
 
     def past_safe_modifications(self, from_block: int, to_block: int = None, collateral_type: CollateralType = None,
-                               chunk_size=20000) -> List[LogModifySAFECollateralization]:
+                               chunk_size=20000, max_workers=4) -> List[LogModifySAFECollateralization]:
         """Synchronously retrieve a list showing which collateral types and safes have been modified.
          Args:
             from_block: Oldest Ethereum block to retrieve the events from.
             to_block: Optional newest Ethereum block to retrieve the events from, defaults to current block
             collateral_type: Optionally filter safe modification by collateral_type.name
-            chunk_size: Number of blocks to fetch from chain at one time, for performance tuning
+            chunk_size: Initial number of blocks to fetch from chain at one time; adapts to the density of events.
+                Only applies to the first call, later calls start from the chunk size learned by earlier ones
+            max_workers: Number of block ranges queried concurrently; only applies to the first call
          Returns:
             List of past `LogModifySAFECollateralization` events represented as 
             :py:class:`pyflex.gf.SAFEEngine.LogModifySAFECollateralization` class.
@@ -659,39 +798,20 @@ class SAFEEngine(Contract):
         assert chunk_size > 0
 
         logger.debug(f"Consumer requested safe modification data from block {from_block} to {to_block}")
-        start = from_block
-        end = None
-        chunks_queried = 0
-        retval = []
-        while end is None or start <= to_block:
-            chunks_queried += 1
-            end = min(to_block, start+chunk_size)
-
-            filter_params = {
-                'address': self.address.address,
-                'fromBlock': start,
-                'toBlock': end
-            }
-            logger.debug(f"Querying safe modifications from block {start} to {end} ({end-start} blocks); "
-                         f"accumulated {len(retval)} safe modification in {chunks_queried-1} requests")
 
-            logs = self.web3.eth.getLogs(filter_params)
-            logger.debug(f"Found {len(logs)} total logs from block {start} to {end}")
-            logger.debug(logs)
+        # filter by event signature and, optionally, by the indexed collateral type on the node side
+        topics = [bytes_to_hexstring(SAFEEngine.LogModifySAFECollateralization.topic)]
+        if collateral_type is not None:
+            topics.append(bytes_to_hexstring(collateral_type.toBytes()))
 
-            log_modifications = list(map(lambda l: SAFEEngine.LogModifySAFECollateralization.from_event(l), logs))
+        if self._log_fetcher is None:
+            self._log_fetcher = LogFetcher(self.web3, chunk_size=chunk_size, min_chunk_size=1, max_workers=max_workers)
+        logs = self._log_fetcher.get_logs(self.address, topics, from_block, to_block)
 
-            log_modifications = [l for l in log_modifications if l is not None]
+        retval = [SAFEEngine.LogModifySAFECollateralization.from_event(log) for log in logs]
+        retval = [log for log in retval if log is not None]
 
-            logger.debug(f"Found {len(log_modifications)} total mod safe logs from block {start} to {end}")
-
-            if collateral_type is not None:
-                log_modifications = list(filter(lambda l: l.collateral_type == collateral_type.name, log_modifications))
-
-            retval.extend(log_modifications)
-            start += chunk_size
-
-        logger.debug(f"Found {len(retval)} safe modifications in {chunks_queried} requests")
+        logger.debug(f"Found {len(retval)} safe modifications")
         return retval
 
     def settle_debt(self, amount: Rad) -> Transact:
@@ -817,7 +937,10 @@ class AccountingEngine(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
-        self.safe_engine = SAFEEngine(web3, Address(self._contract.functions.safeEngine().call()))
+
+    @cached_property
+    def safe_engine(self) -> SAFEEngine:
+        return SAFEEngine(self.web3, Address(self._contract.functions.safeEngine().call()))
 
     def add_authorization(self, address: Address) -> Transact:
         assert isinstance(address, Address)
@@ -928,8 +1051,14 @@ class TaxCollector(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
-        self.safe_engine = SAFEEngine(web3, Address(self._contract.functions.safeEngine().call()))
-        self.accounting_engine = AccountingEngine(web3, Address(self._contract.functions.primaryTaxReceiver().call()))
+
+    @cached_property
+    def safe_engine(self) -> SAFEEngine:
+        return SAFEEngine(self.web3, Address(self._contract.functions.safeEngine().call()))
+
+    @cached_property
+    def accounting_engine(self) -> AccountingEngine:
+        return AccountingEngine(self.web3, Address(self._contract.functions.primaryTaxReceiver().call()))
 
     def initialize_collateral_type(self, collateral_type: CollateralType) -> Transact:
         assert isinstance(collateral_type, CollateralType)
@@ -980,12 +1109,14 @@ class LiquidationEngine(Contract):
             self.collateral_auctioneer = Address(log['args']['collateralAuctioneer'])
             self.raw = log
 
+        topic = HexBytes('0x99b5620489b6ef926d4518936cfec15d305452712b88bd59da2d9c10fb0953e8')
+
         @classmethod
         def from_event(cls, event: dict):
             assert isinstance(event, dict)
 
             topics = event.get('topics')
-            if topics and topics[0] == HexBytes('0x99b5620489b6ef926d4518936cfec15d305452712b88bd59da2d9c10fb0953e8'):
+            if topics and topics[0] == cls.topic:
                 log_liquidate_abi = [abi for abi in LiquidationEngine.abi if abi.get('name') == 'Liquidate'][0]
                 codec = ABICodec(default_registry)
                 event_data = get_event_data(codec, log_liquidate_abi, event)
@@ -1011,8 +1142,14 @@ class LiquidationEngine(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
-        self.safe_engine = SAFEEngine(web3, Address(self._contract.functions.safeEngine().call()))
-        self.accounting_engine = AccountingEngine(web3, Address(self._contract.functions.accountingEngine().call()))
+
+    @cached_property
+    def safe_engine(self) -> SAFEEngine:
+        return SAFEEngine(self.web3, Address(self._contract.functions.safeEngine().call()))
+
+    @cached_property
+    def accounting_engine(self) -> AccountingEngine:
+        return AccountingEngine(self.web3, Address(self._contract.functions.accountingEngine().call()))
 
     def contract_enabled(self) -> bool:
         return self._contract.functions.contractEnabled().call() > 0
@@ -17,6 +17,7 @@
 
 import datetime
 import logging
+import queue
 import signal
 import threading
 import time
@@ -24,9 +25,13 @@ import time
 import pytz
 from pyflex.sign import eth_sign
 from web3 import Web3
+from web3._utils.method_formatters import block_formatter
+from web3.datastructures import AttributeDict
 from web3.exceptions import BlockNotFound, BlockNumberOutofRange
 
 from pyflex import register_filter_thread, any_filter_thread_present, stop_all_filter_threads, all_filter_threads_alive
+from pyflex import get_call_cache, receipt_watchers
+from pyflex.providers import MultiplexingWebsocketProvider
 from pyflex.util import AsyncCallback
 
 NUM_GETBLOCK_ATTEMPTS = 3
@@ -88,6 +93,8 @@ class Lifecycle:
         self.startup_function = None
         self.shutdown_function = None
         self.block_function = None
+        self._block_function_with_block = False
+        self.do_subscribe_to_new_heads = True
         self.every_timers = []
         self.event_timers = []
 
@@ -226,6 +233,12 @@ class Lifecycle:
 
         self.do_wait_for_sync = wait_for_sync
 
+    def subscribe_to_new_heads(self, subscribe_to_new_heads: bool):
+        """Choose whether new blocks are pushed by the node when connected over a websocket, see `on_block`."""
+        assert(isinstance(subscribe_to_new_heads, bool))
+
+        self.do_subscribe_to_new_heads = subscribe_to_new_heads
+
     def initial_delay(self, initial_delay: int):
         """Make the keeper wait for specified amount of time before startup.
 
@@ -284,17 +297,24 @@ class Lifecycle:
 
         self.terminated_internally = True
 
-    def on_block(self, callback):
+    def on_block(self, callback, with_block: bool = False):
         """Register the specified callback to be run for each new block received by the node.
 
+        If `web3` is connected through a `MultiplexingWebsocketProvider`, new blocks are pushed by the node
+        through a `newHeads` subscription, otherwise a `latest` block filter is polled every `block_check_interval`
+        seconds. The poller is also used while subscribing fails.
+
         Args:
             callback: Function to be called for each new blocks.
+            with_block: If `True`, the callback is called with the block header, so it does not have to read it again.
         """
         assert(callable(callback))
+        assert(isinstance(with_block, bool))
 
         assert(self.web3 is not None)
         assert(self.block_function is None)
         self.block_function = callback
+        self._block_function_with_block = with_block
 
     def on_event(self, event: threading.Event, min_frequency_in_seconds: int, callback):
         """
@@ -329,50 +349,110 @@ class Lifecycle:
             self.terminated_externally = True
 
     def _start_watching_blocks(self):
+        def process_block(block):
+            block_number = block['number']
+            block_hash = block['hash']
+
+            # Advanced even if the block callback is still busy, so that reads from other threads are not pinned
+            # to a stale block
+            call_cache = get_call_cache(self.web3)
+            if call_cache is not None:
+                call_cache.new_block(block_number)
+
+            def on_start():
+                self.logger.debug(f"Processing block #{block_number} ({block_hash.hex()})")
+
+            def on_finish():
+                self.logger.debug(f"Finished processing block #{block_number} ({block_hash.hex()})")
+
+            if not self.terminated_internally and not self.terminated_externally and not self.fatal_termination:
+                if not self._on_block_callback.trigger(on_start, on_finish, (block,) if self._block_function_with_block else ()):
+                    self.logger.debug(f"Ignoring block #{block_number} ({block_hash.hex()}),"
+                                      f" as previous callback is still running")
+            else:
+                self.logger.debug(f"Ignoring block #{block_number} as keeper is already terminating")
+
+        def notify_receipt_watcher(block_number: int):
+            receipt_watcher = receipt_watchers.get(self.web3)
+            if receipt_watcher is not None:
+                receipt_watcher.new_block(block_number)
+
         def new_block_callback(block_hash):
             self._last_block_time = datetime.datetime.now(tz=pytz.UTC)
             block = self.web3.eth.getBlock(block_hash)
             block_number = block['number']
+            notify_receipt_watcher(block_number)
             if not self.web3.eth.syncing:
                 max_block_number = self.web3.eth.blockNumber
                 if block_number >= max_block_number:
-                    def on_start():
-                        self.logger.debug(f"Processing block #{block_number} ({block_hash.hex()})")
-
-                    def on_finish():
-                        self.logger.debug(f"Finished processing block #{block_number} ({block_hash.hex()})")
-
-                    if not self.terminated_internally and not self.terminated_externally and not self.fatal_termination:
-                        if not self._on_block_callback.trigger(on_start, on_finish):
-                            self.logger.debug(f"Ignoring block #{block_number} ({block_hash.hex()}),"
-                                              f" as previous callback is still running")
-                    else:
-                        self.logger.debug(f"Ignoring block #{block_number} as keeper is already terminating")
+                    process_block(block)
                 else:
                     self.logger.debug(f"Ignoring block #{block_number} ({block_hash.hex()}),"
                                       f" as there is already block #{max_block_number} available")
             else:
                 self.logger.info(f"Ignoring block #{block_number} ({block_hash.hex()}), as the node is syncing")
 
+        def new_head_callback(head):
+            self._last_block_time = datetime.datetime.now(tz=pytz.UTC)
+            block = AttributeDict.recursive(block_formatter(head))
+            notify_receipt_watcher(block['number'])
+            process_block(block)
+
+        def poll_new_blocks(event_filter):
+            try:
+                # old blocks are ignored in new_block_callback,
+                # so process only the last filter entry
+                for event in event_filter.get_new_entries()[-1:]:
+                    new_block_callback(event)
+            except (BlockNotFound, BlockNumberOutofRange, ValueError) as ex:
+                self.logger.warning("Node dropped event emitter; recreating latest block filter")
+                event_filter = self.web3.eth.filter('latest')
+            finally:
+                time.sleep(self.block_check_interval)
+
+            return event_filter
+
         def new_block_watch():
             event_filter = self.web3.eth.filter('latest')
             logging.debug(f"Created event filter: {event_filter}")
             while True:
-                try:
-                    # old blocks are ignored in new_block_callback,
-                    # so process only the last filter entry
-                    for event in event_filter.get_new_entries()[-1:]:
-                        new_block_callback(event)
-                except (BlockNotFound, BlockNumberOutofRange, ValueError) as ex: 
-                    self.logger.warning("Node dropped event emitter; recreating latest block filter")
-                    event_filter = self.web3.eth.filter('latest')
-                finally:
-                    time.sleep(self.block_check_interval)
+                event_filter = poll_new_blocks(event_filter)
+
+        def new_head_watch():
+            heads = queue.Queue()
+            subscribed = False
+            event_filter = None
+            while True:
+                if not subscribed:
+                    try:
+                        self.web3.provider.subscribe(['newHeads'], heads.put)
+                        subscribed = True
+                        event_filter = None
+                        self.logger.info("Subscribed to new block headers")
+                    except Exception as e:
+                        if event_filter is None:
+                            self.logger.warning(f"Failed to subscribe to new block headers ({e}),"
+                                                f" polling for new blocks instead")
+                            event_filter = self.web3.eth.filter('latest')
+
+                if subscribed:
+                    head = heads.get()
+                    # only the most recent header is of interest if several arrived at once
+                    while head is not None and not heads.empty():
+                        head = heads.get_nowait()
+                    if head is None:
+                        self.logger.warning("New block headers subscription lost, subscribing again")
+                        subscribed = False
+                    else:
+                        new_head_callback(head)
+                else:
+                    event_filter = poll_new_blocks(event_filter)
 
         if self.block_function:
             self._on_block_callback = AsyncCallback(self.block_function)
 
-            block_filter = threading.Thread(target=new_block_watch, daemon=True)
+            subscribe = self.do_subscribe_to_new_heads and isinstance(self.web3.provider, MultiplexingWebsocketProvider)
+            block_filter = threading.Thread(target=new_head_watch if subscribe else new_block_watch, daemon=True)
             block_filter.start()
             register_filter_thread(block_filter)
 
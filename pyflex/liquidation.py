@@ -0,0 +1,250 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from bisect import bisect_left, insort
+from fractions import Fraction
+from threading import Lock
+from typing import Dict, List, Sequence, Tuple
+
+import numpy
+
+from pyflex import Address
+from pyflex.gf import CollateralType, LiquidationEngine, SAFE
+from pyflex.numeric import Wad, Ray, Rad
+
+
+class SafeHealthQueue:
+    """Keeps the SAFEs of one collateral type ordered from the least to the most healthy.
+
+    A SAFE is critical when `locked_collateral * liquidation_price < generated_debt * accumulated_rate`. SAFEs are
+    ordered by their collateral-to-debt ratio, which does not depend on either the price or the rate, so whenever
+    one of those changes the critical SAFEs are found with a binary search instead of evaluating every SAFE.
+    Updating a SAFE and finding the critical ones take `O(log n)` comparisons, plus one step per critical SAFE.
+
+    Ratios are kept as exact fractions, so the criticality check matches the integer comparison done on chain.
+    Only criticality is screened; callers should still check auction limits with `LiquidationEngine.can_liquidate`
+    before liquidating.
+
+    SAFEs without debt can never become critical and are not kept in the queue.
+
+    Attributes:
+        collateral_type: The collateral type whose SAFEs are queued.
+    """
+
+    def __init__(self, collateral_type: CollateralType):
+        assert isinstance(collateral_type, CollateralType)
+
+        self.collateral_type = collateral_type
+        self._entries: List[Tuple[Fraction, Address]] = []
+        self._safes: Dict[Address, Tuple[Fraction, SAFE]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def from_safes(collateral_type: CollateralType, safes: List[SAFE]):
+        """Creates a queue from a list of SAFEs, for example from `SafeIndex.safes(collateral_type)`."""
+        assert isinstance(collateral_type, CollateralType)
+        assert isinstance(safes, list)
+
+        queue = SafeHealthQueue(collateral_type)
+        for safe in safes:
+            assert isinstance(safe, SAFE)
+            if safe.generated_debt.value > 0:
+                ratio = Fraction(safe.locked_collateral.value, safe.generated_debt.value)
+                queue._safes[safe.address] = (ratio, safe)
+                queue._entries.append((ratio, safe.address))
+        queue._entries.sort()
+
+        return queue
+
+    def update(self, safe: SAFE):
+        """Inserts a SAFE, moves it after its collateral or debt changed, or removes it once it has no debt."""
+        assert isinstance(safe, SAFE)
+        assert safe.collateral_type is None or safe.collateral_type.name == self.collateral_type.name
+
+        with self._lock:
+            self._remove(safe.address)
+            if safe.generated_debt.value > 0:
+                ratio = Fraction(safe.locked_collateral.value, safe.generated_debt.value)
+                self._safes[safe.address] = (ratio, safe)
+                insort(self._entries, (ratio, safe.address))
+
+    def remove(self, address: Address):
+        assert isinstance(address, Address)
+
+        with self._lock:
+            self._remove(address)
+
+    def critical(self, accumulated_rate: Ray, liquidation_price: Ray) -> List[SAFE]:
+        """Returns the SAFEs which are critical at the given rate and price, the least healthy first.
+
+        Args:
+            accumulated_rate: The current `accumulated_rate` of the collateral type.
+            liquidation_price: The current `liquidation_price` of the collateral type.
+        """
+        assert isinstance(accumulated_rate, Ray)
+        assert isinstance(liquidation_price, Ray)
+
+        with self._lock:
+            if accumulated_rate.value <= 0:
+                return []
+            if liquidation_price.value <= 0:
+                count = len(self._entries)
+            else:
+                threshold = Fraction(accumulated_rate.value, liquidation_price.value)
+                count = bisect_left(self._entries, (threshold,))
+
+            return [self._safes[address][1] for _, address in self._entries[:count]]
+
+    def safes(self) -> List[SAFE]:
+        """Returns all queued SAFEs, the least healthy first."""
+        with self._lock:
+            return [self._safes[address][1] for _, address in self._entries]
+
+    def _remove(self, address: Address):
+        if address in self._safes:
+            ratio, _ = self._safes.pop(address)
+            index = bisect_left(self._entries, (ratio, address))
+            assert self._entries[index] == (ratio, address)
+            del self._entries[index]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, address: Address):
+        return address in self._safes
+
+    def __repr__(self):
+        return f"SafeHealthQueue('{self.collateral_type.name}', safes={len(self)})"
+
+
+class LiquidationCandidate:
+    """A SAFE found liquidatable by :py:func:`screen_safes`, with the amounts `liquidateSAFE` would move.
+
+    Attributes:
+        index: Position of the SAFE in the arrays passed to `screen_safes`.
+        delta_debt: Debt which would be sent to auction.
+        delta_collateral: Collateral which would be seized.
+    """
+
+    def __init__(self, index: int, delta_debt: Wad, delta_collateral: Wad):
+        assert isinstance(index, int)
+        assert isinstance(delta_debt, Wad)
+        assert isinstance(delta_collateral, Wad)
+
+        self.index = index
+        self.delta_debt = delta_debt
+        self.delta_collateral = delta_collateral
+
+    def __eq__(self, other):
+        assert isinstance(other, LiquidationCandidate)
+        return self.__dict__ == other.__dict__
+
+    def __repr__(self):
+        return f"LiquidationCandidate(index={self.index}, delta_debt={self.delta_debt}, " \
+               f"delta_collateral={self.delta_collateral})"
+
+
+def screen_safes(collateral_type: CollateralType, locked_collateral: Sequence[int], generated_debt: Sequence[int],
+                 liquidation_quantity: Rad, liquidation_penalty: Wad, room: Rad,
+                 tolerance: float = 1e-9) -> List[LiquidationCandidate]:
+    """Finds the liquidatable SAFEs of a whole collateral type at once.
+
+    Mirrors `LiquidationEngine.can_liquidate`, but evaluates every SAFE in one vectorized pass. Criticality
+    is screened with floating point arithmetic first; SAFEs within `tolerance` of the liquidation threshold
+    are then checked again with exact integer arithmetic. The debt to liquidate and the collateral to seize are
+    computed for the critical SAFEs only, with the same integer math `LiquidationEngine.liquidateSAFE` uses.
+
+    Args:
+        collateral_type: Collateral type with current `accumulated_rate`, `liquidation_price` and `debt_floor`,
+            as returned by `SAFEEngine.collateral_type`.
+        locked_collateral: Raw `Wad` values of the collateral locked in each SAFE.
+        generated_debt: Raw `Wad` values of the debt generated by each SAFE, in the same order.
+        liquidation_quantity: `LiquidationEngine.liquidation_quantity` of the collateral type.
+        liquidation_penalty: `LiquidationEngine.liquidation_penalty` of the collateral type.
+        room: System coins which may still be put on auction, i.e. `on_auction_system_coin_limit` minus
+            `current_on_auction_system_coins`.
+        tolerance: Relative distance from the threshold below which the floating point result is not trusted.
+
+    Returns:
+        Liquidatable SAFEs, in the order they were passed in.
+    """
+    assert isinstance(collateral_type, CollateralType)
+    assert isinstance(collateral_type.accumulated_rate, Ray)
+    assert isinstance(collateral_type.liquidation_price, Ray)
+    assert isinstance(collateral_type.debt_floor, Rad)
+    assert len(locked_collateral) == len(generated_debt)
+    assert isinstance(liquidation_quantity, Rad)
+    assert isinstance(liquidation_penalty, Wad)
+    assert isinstance(room, Rad)
+    assert 0 < tolerance < 1
+
+    # Ensure there's room
+    if room <= Rad(0) or room < collateral_type.debt_floor or len(locked_collateral) == 0:
+        return []
+
+    rate = collateral_type.accumulated_rate.value
+    price = collateral_type.liquidation_price.value
+    locked = numpy.array(locked_collateral, dtype=object)
+    debt = numpy.array(generated_debt, dtype=object)
+
+    # Collateral value should be less than the product of our stablecoin debt and the debt multiplier
+    collateral_value = locked.astype(numpy.float64) * float(price)
+    debt_value = debt.astype(numpy.float64) * float(rate)
+    critical = collateral_value < debt_value * (1 - tolerance)
+    near_threshold = numpy.flatnonzero(~critical & (collateral_value <= debt_value * (1 + tolerance)))
+    for index in near_threshold:
+        critical[index] = locked[index] * price < debt[index] * rate
+
+    indexes = numpy.flatnonzero(critical)
+    if len(indexes) == 0:
+        return []
+
+    # Prevent null auction
+    debt_limit = min(liquidation_quantity.value, room.value) * 10**18 // rate // liquidation_penalty.value
+    critical_locked = locked[indexes]
+    critical_debt = debt[indexes]
+    delta_debt = numpy.minimum(critical_debt, debt_limit)
+    delta_collateral = numpy.minimum(critical_locked, critical_locked * delta_debt // critical_debt)
+
+    return [LiquidationCandidate(int(index), Wad(int(dd)), Wad(int(dc)))
+            for index, dd, dc in zip(indexes, delta_debt, delta_collateral) if dd > 0 and dc > 0]
+
+
+def screen_collateral_type(liquidation_engine: LiquidationEngine, collateral_type: CollateralType,
+                           safes: List[SAFE]) -> List[Tuple[SAFE, LiquidationCandidate]]:
+    """Screens SAFEs of one collateral type with :py:func:`screen_safes`, reading the parameters it needs.
+
+    Unlike `LiquidationEngine.can_liquidate`, this reads the collateral type and the auction limits once for
+    all SAFEs. The SAFEs themselves are not refreshed, so they should come from a fresh source like `SafeIndex`.
+
+    Returns:
+        Pairs of liquidatable SAFEs and the amounts their liquidation would move.
+    """
+    assert isinstance(liquidation_engine, LiquidationEngine)
+    assert isinstance(collateral_type, CollateralType)
+    assert isinstance(safes, list)
+
+    collateral_type = liquidation_engine.safe_engine.collateral_type(collateral_type.name)
+    room = liquidation_engine.on_auction_system_coin_limit() - liquidation_engine.current_on_auction_system_coins()
+    candidates = screen_safes(collateral_type,
+                              [safe.locked_collateral.value for safe in safes],
+                              [safe.generated_debt.value for safe in safes],
+                              liquidation_engine.liquidation_quantity(collateral_type),
+                              liquidation_engine.liquidation_penalty(collateral_type),
+                              room)
+
+    return [(safes[candidate.index], candidate) for candidate in candidates]
@@ -0,0 +1,163 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional
+
+import requests
+from web3 import Web3
+
+from pyflex import Address
+
+
+logger = logging.getLogger()
+
+# Error messages returned by popular nodes and providers when a `eth_getLogs` query covers too much data
+TOO_MANY_RESULTS_PATTERNS = [
+    re.compile(r"more than \d+ results", re.IGNORECASE),               # Infura
+    re.compile(r"log response size exceeded", re.IGNORECASE),          # Alchemy
+    re.compile(r"block range", re.IGNORECASE),                         # "block range is too wide", "exceeds max block range"
+    re.compile(r"query timeout exceeded", re.IGNORECASE),              # geth
+    re.compile(r"too many (results|logs)", re.IGNORECASE),
+]
+
+
+def is_too_many_results(error: Exception) -> bool:
+    """Tells whether `error` is a node rejecting an `eth_getLogs` query for covering too much data."""
+    assert isinstance(error, Exception)
+
+    # Nodes and providers may not answer an oversized query before the HTTP read timeout
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+
+    payload = error.args[0] if len(error.args) > 0 else None
+    if isinstance(payload, dict):
+        if payload.get('code') == -32005:
+            return True
+        message = str(payload.get('message', ''))
+    else:
+        message = str(error)
+
+    return any(pattern.search(message) for pattern in TOO_MANY_RESULTS_PATTERNS)
+
+
+class LogFetcher:
+    """Retrieves event logs over long block ranges using several concurrent `eth_getLogs` queries.
+
+    The block range is walked in chunks, with up to `max_workers` chunks in flight at once. Chunk size adapts
+    to the density of the logs: a chunk rejected by the node for returning too many results, or timing out, is split
+    in half and retried, and the chunk size is doubled whenever a response contains fewer than half of `target_logs`.
+    The chunk size learned during one call is kept for the next one.
+
+    Filtering by address and topics happens on the node side, so only matching logs are transferred.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        chunk_size: Current number of blocks queried in one request.
+        min_chunk_size: Lower bound on the chunk size.
+        max_chunk_size: Upper bound on the chunk size.
+        target_logs: Number of logs per response the chunk size is tuned towards.
+        max_workers: Maximum number of queries in flight at once.
+    """
+
+    def __init__(self, web3: Web3, chunk_size: int = 20000, min_chunk_size: int = 100, max_chunk_size: int = 1000000,
+                 target_logs: int = 2000, max_workers: int = 4):
+        assert isinstance(web3, Web3)
+        assert isinstance(chunk_size, int) and chunk_size > 0
+        assert isinstance(min_chunk_size, int) and min_chunk_size > 0
+        assert isinstance(max_chunk_size, int) and max_chunk_size >= min_chunk_size
+        assert isinstance(target_logs, int) and target_logs > 0
+        assert isinstance(max_workers, int) and max_workers > 0
+
+        self.web3 = web3
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.chunk_size = min(max(chunk_size, min_chunk_size), max_chunk_size)
+        self.target_logs = target_logs
+        self.max_workers = max_workers
+
+    def get_logs(self, address: Address, topics: Optional[list], from_block: int, to_block: int) -> List[dict]:
+        """Retrieves all logs emitted by `address` matching `topics` between two blocks (both inclusive).
+
+        Args:
+            address: Address of the contract which emitted the logs.
+            topics: Topic filter as accepted by `eth_getLogs`, or `None` to retrieve all logs.
+            from_block: Oldest block to retrieve the logs from.
+            to_block: Newest block to retrieve the logs from.
+
+        Returns:
+            Raw logs, ordered by block number and log index.
+        """
+        assert isinstance(address, Address)
+        assert isinstance(topics, list) or topics is None
+        assert isinstance(from_block, int)
+        assert isinstance(to_block, int)
+        assert from_block <= to_block
+
+        retries = deque()
+        next_block = from_block
+        in_flight = {}
+        queries = 0
+        logs = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while in_flight or retries or next_block <= to_block:
+                while len(in_flight) < self.max_workers and (retries or next_block <= to_block):
+                    if retries:
+                        start, end = retries.popleft()
+                    else:
+                        start, end = next_block, min(to_block, next_block + self.chunk_size - 1)
+                        next_block = end + 1
+
+                    filter_params = {'address': address.address, 'fromBlock': start, 'toBlock': end}
+                    if topics is not None:
+                        filter_params['topics'] = topics
+
+                    in_flight[executor.submit(self.web3.eth.getLogs, filter_params)] = (start, end)
+                    queries += 1
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, end = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except (ValueError, requests.exceptions.Timeout) as e:
+                        if start == end or not is_too_many_results(e):
+                            raise
+
+                        middle = (start + end) // 2
+                        retries.appendleft((middle + 1, end))
+                        retries.appendleft((start, middle))
+                        self.chunk_size = max(self.min_chunk_size, min(self.chunk_size, (end - start + 1) // 2))
+                        logger.debug(f"Too many logs from block {start} to {end}, splitting the range;"
+                                     f" chunk size is now {self.chunk_size} blocks")
+                        continue
+
+                    logger.debug(f"Found {len(result)} logs from block {start} to {end} ({end-start+1} blocks)")
+                    logs.extend(result)
+
+                    if len(result) < self.target_logs // 2 and end - start + 1 >= self.chunk_size:
+                        self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+
+        logger.debug(f"Found {len(logs)} logs from block {from_block} to {to_block} in {queries} requests")
+        return sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
+
+    def __repr__(self):
+        return f"LogFetcher(chunk_size={self.chunk_size}, max_workers={self.max_workers})"
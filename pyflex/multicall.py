@@ -0,0 +1,125 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from typing import List, Optional
+
+from web3 import Web3
+
+from pyflex import Address, Contract, Invocation
+
+
+logger = logging.getLogger()
+
+
+class Multicall(Contract):
+    """A client for the `Multicall` contract, which aggregates results from multiple constant function calls.
+
+    Reads are packed into as few `aggregate` calls as possible and all of them are evaluated at the same block,
+    so the results form a consistent snapshot of chain state.
+
+    You can find the source code of the `Multicall` contract here:
+    <https://github.com/makerdao/multicall/blob/master/src/Multicall.sol>.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        address: Ethereum address of the `Multicall` contract.
+        max_calls: Maximum number of invocations packed into one `eth_call`; bounds the gas used by each call.
+        max_calldata: Maximum size (in bytes) of the calldata packed into one `eth_call`.
+    """
+
+    abi = Contract._load_abi(__name__, 'abi/Multicall.abi')
+    bin = Contract._load_bin(__name__, 'abi/Multicall.bin')
+
+    def __init__(self, web3: Web3, address: Address, max_calls: int = 500, max_calldata: int = 64 * 1024):
+        assert isinstance(web3, Web3)
+        assert isinstance(address, Address)
+        assert isinstance(max_calls, int) and max_calls > 0
+        assert isinstance(max_calldata, int) and max_calldata > 0
+
+        self.web3 = web3
+        self.address = address
+        self.max_calls = max_calls
+        self.max_calldata = max_calldata
+        self._contract = self._get_contract(web3, self.abi, address)
+
+    @staticmethod
+    def deploy(web3: Web3):
+        return Multicall(web3=web3, address=Contract._deploy(web3, Multicall.abi, Multicall.bin, []))
+
+    def chunks(self, invocations: List[Invocation]) -> List[List[Invocation]]:
+        """Splits invocations into batches honoring `max_calls` and `max_calldata`, preserving order.
+
+        An invocation whose calldata alone exceeds `max_calldata` is placed in a batch of its own.
+        """
+        assert isinstance(invocations, list)
+
+        chunks = []
+        current = []
+        current_size = 0
+        for invocation in invocations:
+            assert isinstance(invocation, Invocation)
+
+            # 20 bytes of target address plus the calldata itself
+            size = 20 + len(invocation.calldata.as_bytes())
+            if current and (len(current) >= self.max_calls or current_size + size > self.max_calldata):
+                chunks.append(current)
+                current = []
+                current_size = 0
+
+            current.append(invocation)
+            current_size += size
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    def aggregate(self, invocations: List[Invocation], block_identifier: Optional[int] = None) -> List[bytes]:
+        """Executes many constant calls in as few `eth_call` round trips as possible.
+
+        Args:
+            invocations: List of :py:class:`pyflex.Invocation` objects to execute.
+            block_identifier: Block at which all calls are evaluated; defaults to the current block.
+                The block is pinned once, so results of all chunks are consistent with each other.
+
+        Returns:
+            Raw return data of each invocation, in the same order as `invocations`.
+        """
+        assert isinstance(invocations, list)
+        assert isinstance(block_identifier, int) or block_identifier is None
+
+        if len(invocations) == 0:
+            return []
+
+        if block_identifier is None:
+            block_identifier = self.web3.eth.blockNumber
+
+        chunks = self.chunks(invocations)
+        logger.debug(f"Aggregating {len(invocations)} calls in {len(chunks)} requests at block {block_identifier}")
+
+        results = []
+        for chunk in chunks:
+            calls = [(invocation.address.address, invocation.calldata.as_bytes()) for invocation in chunk]
+            _, return_data = self._contract.functions.aggregate(calls).call(block_identifier=block_identifier)
+            assert len(return_data) == len(chunk)
+            results.extend(return_data)
+
+        return results
+
+    def __repr__(self):
+        return f"Multicall('{self.address}')"
@@ -16,12 +16,25 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from decimal import Context, Decimal, ROUND_DOWN
 from functools import total_ordering, reduce
-from decimal import *
 
 
 _context = Context(prec=1000, rounding=ROUND_DOWN)
 
+# Scales of the fixed-point types, so operations do not need to compute powers of ten
+_WAD = 10**18
+_RAY = 10**27
+_RAD = 10**45
+_WAD_TO_RAY = 10**9
+
+
+def _divide(numerator: int, denominator: int) -> int:
+    """Integer division rounding towards zero, as the contracts do, rather than towards negative infinity."""
+    if (numerator >= 0) == (denominator > 0):
+        return numerator // denominator
+    return -(-numerator // denominator)
+
 
 @total_ordering
 class Wad:
@@ -36,8 +49,11 @@ class Wad:
     Notes:
         The internal representation of `Wad` is an unbounded integer, the last 18 digits of it being treated
         as decimal places. It is similar to the representation used in Maker contracts (`uint128`).
+        All arithmetic is done on that integer, results being rounded towards zero.
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """Creates a new Wad number.
 
@@ -46,24 +62,22 @@ class Wad:
                 of Maker contracts is used which means that passing `1` will create an instance of `Wad`
                 with a value of `0.000000000000000001'.
         """
-        if isinstance(value, Wad):
+        if isinstance(value, int):
+            # assert(value >= 0)
+            self.value = value
+        elif isinstance(value, Wad):
             self.value = value.value
         elif isinstance(value, Ray):
-            self.value = int((Decimal(value.value) // (Decimal(10)**Decimal(9))).quantize(1, context=_context))
+            self.value = _divide(value.value, _WAD_TO_RAY)
         elif isinstance(value, Rad):
-            self.value = int((Decimal(value.value) // (Decimal(10)**Decimal(27))).quantize(1, context=_context))
-        elif isinstance(value, int):
-            # assert(value >= 0)
-            self.value = value
+            self.value = _divide(value.value, _RAY)
         else:
             raise ArithmeticError
 
     @classmethod
     def from_number(cls, number):
         # assert(number >= 0)
-        pwr = Decimal(10) ** 18
-        dec = Decimal(str(number)) * pwr
-        return Wad(int(dec.quantize(1, context=_context)))
+        return Wad(int(Decimal(str(number)).scaleb(18, _context)))
 
     def __repr__(self):
         return "Wad(" + str(self.value) + ")"
@@ -93,22 +107,19 @@ class Wad:
     # z = cast((uint256(x) * y + WAD / 2) / WAD);
     def __mul__(self, other):
         if isinstance(other, Wad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(18))
-            return Wad(int(result.quantize(1, context=_context)))
+            return Wad(_divide(self.value * other.value, _WAD))
         elif isinstance(other, Ray):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(27))
-            return Wad(int(result.quantize(1, context=_context)))
+            return Wad(_divide(self.value * other.value, _RAY))
         elif isinstance(other, Rad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(45))
-            return Wad(int(result.quantize(1, context=_context)))
+            return Wad(_divide(self.value * other.value, _RAD))
         elif isinstance(other, int):
-            return Wad(int((Decimal(self.value) * Decimal(other)).quantize(1, context=_context)))
+            return Wad(self.value * other)
         else:
             raise ArithmeticError
 
     def __truediv__(self, other):
         if isinstance(other, Wad):
-            return Wad(int((Decimal(self.value) * (Decimal(10) ** Decimal(18)) / Decimal(other.value)).quantize(1, context=_context)))
+            return Wad(_divide(self.value * _WAD, other.value))
         else:
             raise ArithmeticError
 
@@ -131,10 +142,10 @@ class Wad:
             raise ArithmeticError
 
     def __int__(self):
-        return int(self.value / 10**18)
+        return _divide(self.value, _WAD)
 
     def __float__(self):
-        return self.value / 10**18
+        return self.value / _WAD
 
     def __round__(self, ndigits: int = 0):
         return Wad(round(self.value, -18 + ndigits))
@@ -163,8 +174,11 @@ class Ray:
     Notes:
         The internal representation of `Ray` is an unbounded integer, the last 27 digits of it being treated
         as decimal places. It is similar to the representation used in Maker contracts (`uint128`).
+        All arithmetic is done on that integer, results being rounded towards zero.
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """Creates a new Ray number.
 
@@ -173,24 +187,22 @@ class Ray:
                 of Maker contracts is used which means that passing `1` will create an instance of `Ray`
                 with a value of `0.000000000000000000000000001'.
         """
-        if isinstance(value, Ray):
+        if isinstance(value, int):
+            # assert(value >= 0)
+            self.value = value
+        elif isinstance(value, Ray):
             self.value = value.value
         elif isinstance(value, Wad):
-            self.value = int((Decimal(value.value) * (Decimal(10)**Decimal(9))).quantize(1, context=_context))
+            self.value = value.value * _WAD_TO_RAY
         elif isinstance(value, Rad):
-            self.value = int((Decimal(value.value) / (Decimal(10)**Decimal(18))).quantize(1, context=_context))
-        elif isinstance(value, int):
-            # assert(value >= 0)
-            self.value = value
+            self.value = _divide(value.value, _WAD)
         else:
             raise ArithmeticError
 
     @classmethod
     def from_number(cls, number):
         # assert(number >= 0)
-        pwr = Decimal(10) ** 27
-        dec = Decimal(str(number)) * pwr
-        return Ray(int(dec.quantize(1, context=_context)))
+        return Ray(int(Decimal(str(number)).scaleb(27, _context)))
 
     def __repr__(self):
         return "Ray(" + str(self.value) + ")"
@@ -219,22 +231,19 @@ class Ray:
 
     def __mul__(self, other):
         if isinstance(other, Ray):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(27))
-            return Ray(int(result.quantize(1, context=_context)))
+            return Ray(_divide(self.value * other.value, _RAY))
         elif isinstance(other, Wad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(18))
-            return Ray(int(result.quantize(1, context=_context)))
+            return Ray(_divide(self.value * other.value, _WAD))
         elif isinstance(other, Rad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(45))
-            return Ray(int(result.quantize(1, context=_context)))
+            return Ray(_divide(self.value * other.value, _RAD))
         elif isinstance(other, int):
-            return Ray(int((Decimal(self.value) * Decimal(other)).quantize(1, context=_context)))
+            return Ray(self.value * other)
         else:
             raise ArithmeticError
 
     def __truediv__(self, other):
         if isinstance(other, Ray):
-            return Ray(int((Decimal(self.value) * (Decimal(10) ** Decimal(27)) / Decimal(other.value)).quantize(1, context=_context)))
+            return Ray(_divide(self.value * _RAY, other.value))
         else:
             raise ArithmeticError
 
@@ -257,10 +266,10 @@ class Ray:
             raise ArithmeticError
 
     def __int__(self):
-        return int(self.value / 10**27)
+        return _divide(self.value, _RAY)
 
     def __float__(self):
-        return self.value / 10**27
+        return self.value / _RAY
 
     def __round__(self, ndigits: int = 0):
         return Ray(round(self.value, -27 + ndigits))
@@ -288,9 +297,11 @@ class Rad:
 
     Notes:
         The internal representation of `Rad` is an unbounded integer, the last 45 digits of it being treated
-        as decimal places.
+        as decimal places. All arithmetic is done on that integer, results being rounded towards zero.
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """Creates a new Rad number.
 
@@ -299,24 +310,22 @@ class Rad:
                 of Maker contracts is used which means that passing `1` will create an instance of `Rad`
                 with a value of `0.000000000000000000000000000000000000000000001'.
         """
-        if isinstance(value, Rad):
+        if isinstance(value, int):
+            # assert(value >= 0)
+            self.value = value
+        elif isinstance(value, Rad):
             self.value = value.value
         elif isinstance(value, Ray):
-            self.value = int((Decimal(value.value) * (Decimal(10)**Decimal(18))).quantize(1, context=_context))
+            self.value = value.value * _WAD
         elif isinstance(value, Wad):
-            self.value = int((Decimal(value.value) * (Decimal(10)**Decimal(27))).quantize(1, context=_context))
-        elif isinstance(value, int):
-            # assert(value >= 0)
-            self.value = value
+            self.value = value.value * _RAY
         else:
             raise ArithmeticError
 
     @classmethod
     def from_number(cls, number):
         # assert(number >= 0)
-        pwr = Decimal(10) ** 45
-        dec = Decimal(str(number)) * pwr
-        return Rad(int(dec.quantize(1, context=_context)))
+        return Rad(int(Decimal(str(number)).scaleb(45, _context)))
 
     def __repr__(self):
         return "Rad(" + str(self.value) + ")"
@@ -345,22 +354,19 @@ class Rad:
 
     def __mul__(self, other):
         if isinstance(other, Rad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(45))
-            return Rad(int(result.quantize(1, context=_context)))
+            return Rad(_divide(self.value * other.value, _RAD))
         elif isinstance(other, Ray):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(27))
-            return Rad(int(result.quantize(1, context=_context)))
+            return Rad(_divide(self.value * other.value, _RAY))
         elif isinstance(other, Wad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(18))
-            return Rad(int(result.quantize(1, context=_context)))
+            return Rad(_divide(self.value * other.value, _WAD))
         elif isinstance(other, int):
-            return Rad(int((Decimal(self.value) * Decimal(other)).quantize(1, context=_context)))
+            return Rad(self.value * other)
         else:
             raise ArithmeticError
 
     def __truediv__(self, other):
         if isinstance(other, Rad):
-            return Rad(int((Decimal(self.value) * (Decimal(10) ** Decimal(45)) / Decimal(other.value)).quantize(1, context=_context)))
+            return Rad(_divide(self.value * _RAD, other.value))
         else:
             raise ArithmeticError
 
@@ -383,10 +389,10 @@ class Rad:
             raise ArithmeticError
 
     def __int__(self):
-        return int(self.value / 10**45)
+        return _divide(self.value, _RAD)
 
     def __float__(self):
-        return self.value / 10**45
+        return self.value / _RAD
 
     def __round__(self, ndigits: int = 0):
         return Rad(round(self.value, -45 + ndigits))
@@ -400,3 +406,176 @@ class Rad:
     def max(*args):
         """Returns the higher of the Rad values"""
         return reduce(lambda x, y: x if x > y else y, args[1:], args[0])
+
+
+def _numpy():
+    # Imported on first use, as the scalar types are used by every keeper but the arrays by a few
+    import numpy
+    return numpy
+
+
+def _divide_array(numerator, denominator):
+    """Elementwise `_divide`, for arrays of integers or an array and an integer."""
+    quotient = numerator // denominator
+    # Floor division rounds inexact negative quotients down, while they should be rounded towards zero
+    return quotient + ((quotient < 0) & (quotient * denominator != numerator))
+
+
+class _FixedPointArray:
+    """Base of `WadArray`, `RayArray` and `RadArray`, holding the values in a NumPy array of unbounded integers."""
+
+    __slots__ = ('values',)
+
+    scalar = None
+    scale = None
+
+    def __init__(self, values):
+        if isinstance(values, _FixedPointArray):
+            if values.scale <= self.scale:
+                self.values = values.values * (self.scale // values.scale)
+            else:
+                self.values = _divide_array(values.values, values.scale // self.scale)
+        else:
+            values = values.tolist() if isinstance(values, _numpy().ndarray) else list(values)
+            if not all(isinstance(value, (int, self.scalar)) for value in values):
+                raise ArithmeticError
+            self.values = _numpy().array([value if isinstance(value, int) else value.value for value in values],
+                                         dtype=object)
+
+    @classmethod
+    def _from_values(cls, values):
+        array = object.__new__(cls)
+        array.values = values
+        return array
+
+    def _other_values(self, other):
+        if isinstance(other, type(self)):
+            return other.values
+        elif isinstance(other, self.scalar):
+            return other.value
+        else:
+            raise ArithmeticError
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, _numpy().integer)):
+            return self.scalar(int(self.values[index]))
+        return self._from_values(self.values[index])
+
+    def to_list(self) -> list:
+        return [self.scalar(value) for value in self.values.tolist()]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.values.tolist()})"
+
+    def __add__(self, other):
+        return self._from_values(self.values + self._other_values(other))
+
+    def __sub__(self, other):
+        return self._from_values(self.values - self._other_values(other))
+
+    def __mul__(self, other):
+        if isinstance(other, _FixedPointArray):
+            return self._from_values(_divide_array(self.values * other.values, other.scale))
+        elif isinstance(other, (Wad, Ray, Rad)):
+            return self._from_values(_divide_array(self.values * other.value, _SCALES[type(other)]))
+        elif isinstance(other, int):
+            return self._from_values(self.values * other)
+        else:
+            raise ArithmeticError
+
+    def __rmul__(self, other):
+        if isinstance(other, int):
+            return self._from_values(self.values * other)
+        else:
+            raise ArithmeticError
+
+    def __truediv__(self, other):
+        return self._from_values(_divide_array(self.values * self.scale, self._other_values(other)))
+
+    def __abs__(self):
+        return self._from_values(abs(self.values))
+
+    def __eq__(self, other):
+        return self.values == self._other_values(other)
+
+    def __ne__(self, other):
+        return self.values != self._other_values(other)
+
+    def __lt__(self, other):
+        return self.values < self._other_values(other)
+
+    def __le__(self, other):
+        return self.values <= self._other_values(other)
+
+    def __gt__(self, other):
+        return self.values > self._other_values(other)
+
+    def __ge__(self, other):
+        return self.values >= self._other_values(other)
+
+    __hash__ = None
+
+    def minimum(self, other):
+        """Returns the elementwise lower of the values of this array and `other`, an array or a single value"""
+        return self._from_values(_numpy().minimum(self.values, self._other_values(other)))
+
+    def maximum(self, other):
+        """Returns the elementwise higher of the values of this array and `other`, an array or a single value"""
+        return self._from_values(_numpy().maximum(self.values, self._other_values(other)))
+
+    def sum(self):
+        return self.scalar(sum(self.values.tolist()))
+
+    def min(self):
+        """Returns the lowest value of the array"""
+        return self.scalar(min(self.values.tolist()))
+
+    def max(self):
+        """Returns the highest value of the array"""
+        return self.scalar(max(self.values.tolist()))
+
+
+class WadArray(_FixedPointArray):
+    """Represents many numbers with 18 decimal places, for computations over all SAFEs of a system at once.
+
+    Operations work elementwise on arrays of the same length, or on an array and a single value, and round
+    exactly like the `Wad` operations. Addition, subtraction, division and comparisons work with other instances
+    of `WadArray` or with `Wad` values; comparisons return NumPy arrays of booleans. Multiplication also works with
+    `RayArray`, `RadArray`, `Ray`, `Rad` and `int`, the result always being a `WadArray`.
+
+    Args:
+        values: `Wad` values or integers in the internal representation of `Wad`, or a `RayArray` or `RadArray`
+            to convert.
+    """
+
+    __slots__ = ()
+
+    scalar = Wad
+    scale = _WAD
+
+
+class RayArray(_FixedPointArray):
+    """Represents many numbers with 27 decimal places, see `WadArray`."""
+
+    __slots__ = ()
+
+    scalar = Ray
+    scale = _RAY
+
+
+class RadArray(_FixedPointArray):
+    """Represents many numbers with 45 decimal places, see `WadArray`."""
+
+    __slots__ = ()
+
+    scalar = Rad
+    scale = _RAD
+
+
+_SCALES = {Wad: _WAD, Ray: _RAY, Rad: _RAD}
@@ -0,0 +1,318 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import websockets
+from web3 import HTTPProvider
+from web3._utils.request import make_post_request
+from web3.providers.base import JSONBaseProvider
+
+
+logger = logging.getLogger()
+
+
+class _BatchedRequest:
+    def __init__(self, method: str, params: Any, id: int):
+        self.method = method
+        self.params = params
+        self.id = id
+        self.response = None
+        self.error = None
+        self.done = Event()
+
+    def as_dict(self) -> dict:
+        return {"jsonrpc": "2.0", "method": self.method, "params": self.params or [], "id": self.id}
+
+
+class BatchingHTTPProvider(HTTPProvider):
+    """An `HTTPProvider` which coalesces concurrently issued read requests into JSON-RPC batches.
+
+    A request of one of the `batched_methods` waits up to `flush_interval` seconds for other threads to issue
+    requests too, and all of them are then sent to the node in a single HTTP POST, as a JSON-RPC batch of at most
+    `max_batch_size` requests. Responses (including errors) are handed back to each caller separately, so to web3
+    every request still looks like it was made on its own. All other methods, including everything sending
+    transactions, are passed through unbatched.
+
+    Batching pays off when many threads read from the node at once, for example a `ThreadPoolExecutor` reading
+    SAFEs or auctions, or many transactions in flight. A single-threaded caller only sees the added `flush_interval`.
+
+    If the node does not answer a batch with an array (some providers do not support batches), the requests
+    of that batch are sent one by one instead.
+
+    Attributes:
+        max_batch_size: Maximum number of requests sent in one batch.
+        flush_interval: Number of seconds the first request of a batch waits for others to join.
+        batched_methods: JSON-RPC methods which are batched.
+    """
+
+    BATCHED_METHODS = frozenset(['eth_call', 'eth_getTransactionReceipt', 'eth_getLogs', 'eth_getBlockByNumber',
+                                 'eth_getBlockByHash', 'eth_getTransactionCount', 'eth_getBalance', 'eth_getCode'])
+
+    def __init__(self, endpoint_uri: Optional[str] = None, request_kwargs: Optional[Any] = None,
+                 session: Optional[Any] = None, max_batch_size: int = 100, flush_interval: float = 0.005,
+                 batched_methods: Optional[frozenset] = None):
+        assert isinstance(max_batch_size, int) and max_batch_size > 0
+        assert isinstance(flush_interval, (int, float)) and flush_interval >= 0
+
+        super().__init__(endpoint_uri=endpoint_uri, request_kwargs=request_kwargs, session=session)
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.batched_methods = batched_methods if batched_methods is not None else self.BATCHED_METHODS
+        self._queue: List[_BatchedRequest] = []
+        self._lock = Lock()
+
+    def make_request(self, method, params):
+        if method not in self.batched_methods:
+            return super().make_request(method, params)
+
+        request = _BatchedRequest(method, params, next(self.request_counter))
+        with self._lock:
+            self._queue.append(request)
+            leader = len(self._queue) == 1
+            batch = self._take_batch() if len(self._queue) >= self.max_batch_size else None
+
+        if batch is None and leader:
+            # The first request of a batch waits for others to join, and then sends whatever has been queued
+            time.sleep(self.flush_interval)
+            with self._lock:
+                batch = self._take_batch()
+
+        if batch:
+            self._send_batch(batch)
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+
+        return request.response
+
+    def _take_batch(self) -> List[_BatchedRequest]:
+        batch = self._queue[:self.max_batch_size]
+        del self._queue[:self.max_batch_size]
+        return batch
+
+    def _send_batch(self, batch: List[_BatchedRequest]):
+        try:
+            if len(batch) == 1:
+                batch[0].response = super().make_request(batch[0].method, batch[0].params)
+            else:
+                logger.debug(f"Making batch request HTTP. URI: {self.endpoint_uri}, Requests: {len(batch)}")
+                raw_response = make_post_request(self.endpoint_uri,
+                                                 json.dumps([request.as_dict() for request in batch]).encode(),
+                                                 **self.get_request_kwargs())
+                responses = self.decode_rpc_response(raw_response)
+
+                if isinstance(responses, list):
+                    by_id = {response.get('id'): response for response in responses if isinstance(response, dict)}
+                    for request in batch:
+                        request.response = by_id.get(request.id, {
+                            "jsonrpc": "2.0",
+                            "id": request.id,
+                            "error": {"code": -32603, "message": "No response to the request in the JSON-RPC batch"}
+                        })
+                else:
+                    logger.debug(f"JSON-RPC batch rejected by {self.endpoint_uri} ({responses}),"
+                                 f" sending {len(batch)} requests one by one")
+                    for request in batch:
+                        try:
+                            request.response = super().make_request(request.method, request.params)
+                        except Exception as e:
+                            request.error = e
+        except Exception as e:
+            for request in batch:
+                if request.response is None:
+                    request.error = e
+        finally:
+            for request in batch:
+                request.done.set()
+
+    def __str__(self):
+        return f"Batching RPC connection {self.endpoint_uri}"
+
+
+_io_loop = None
+_io_loop_thread = None
+_io_loop_lock = Lock()
+
+
+def _get_io_loop() -> asyncio.AbstractEventLoop:
+    global _io_loop, _io_loop_thread
+
+    with _io_loop_lock:
+        if _io_loop is None:
+            _io_loop = asyncio.new_event_loop()
+            _io_loop_thread = Thread(target=_io_loop.run_forever, name='pyflex-websocket', daemon=True)
+            _io_loop_thread.start()
+
+        return _io_loop
+
+
+class MultiplexingWebsocketProvider(JSONBaseProvider):
+    """A WebSocket provider which keeps many requests in flight on one persistent connection.
+
+    Unlike the `WebsocketProvider` shipped with web3, which sends a request and then waits for its response before
+    the next one can be sent, requests are written to the socket as soon as they are made and responses are matched
+    back to them by id. Any number of threads (or coroutines, see `make_request_async`) can use the same provider,
+    up to `max_concurrency` requests being in flight at a time. The connection is opened on first use and reopened
+    after it gets closed, failing the requests which were in flight on it.
+
+    It also supports `eth_subscribe` subscriptions, see `subscribe()`.
+
+    All socket I/O happens on a dedicated event loop thread, so the provider can also be used by `web3` calls made
+    on threads running other event loops, like the ones `run_blocking` uses.
+
+    Attributes:
+        endpoint_uri: WebSocket URI of the node, `ws://` or `wss://`.
+        timeout: Number of seconds to wait for a response before raising `asyncio.TimeoutError`.
+        max_concurrency: Maximum number of requests in flight at any time.
+    """
+
+    def __init__(self, endpoint_uri: str, timeout: float = 60, max_concurrency: int = 100,
+                 websocket_kwargs: Optional[dict] = None):
+        assert isinstance(endpoint_uri, str)
+        assert isinstance(timeout, (int, float))
+        assert isinstance(max_concurrency, int) and max_concurrency > 0
+        assert isinstance(websocket_kwargs, dict) or websocket_kwargs is None
+
+        super().__init__()
+        self.endpoint_uri = endpoint_uri
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.websocket_kwargs = websocket_kwargs or {}
+        self.loop = _get_io_loop()
+        self._websocket = None
+        self._pending: Dict[int, Tuple[Any, asyncio.Future]] = {}
+        self._subscriptions: Dict[str, Tuple[Any, Callable]] = {}
+        self._connect_lock = None
+        self._semaphore = None
+
+    async def _connection(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._websocket is None or self._websocket.closed:
+                logger.debug(f"Connecting to {self.endpoint_uri}")
+                self._websocket = await asyncio.wait_for(websockets.connect(self.endpoint_uri, max_size=None,
+                                                                            **self.websocket_kwargs),
+                                                         timeout=self.timeout)
+                self.loop.create_task(self._read(self._websocket))
+
+            return self._websocket
+
+    async def _read(self, websocket):
+        try:
+            async for message in websocket:
+                response = json.loads(message)
+                for item in response if isinstance(response, list) else [response]:
+                    self._dispatch(item)
+        except Exception as e:
+            logger.debug(f"Connection to {self.endpoint_uri} lost ({e})")
+        finally:
+            if self._websocket is websocket:
+                self._websocket = None
+            for sent_on, future in list(self._pending.values()):
+                if sent_on is websocket and not future.done():
+                    future.set_exception(ConnectionError(f"Connection to {self.endpoint_uri} closed"))
+            for subscription_id, (subscribed_on, callback) in list(self._subscriptions.items()):
+                if subscribed_on is websocket:
+                    del self._subscriptions[subscription_id]
+                    callback(None)
+
+    def _dispatch(self, response: dict):
+        if response.get('method') == 'eth_subscription':
+            params = response.get('params') or {}
+            _, callback = self._subscriptions.get(params.get('subscription'), (None, None))
+            if callback is not None:
+                callback(params.get('result'))
+            return
+
+        _, future = self._pending.get(response.get('id'), (None, None))
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    async def coro_make_request(self, method: str, params: Any) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            request_id = next(self.request_counter)
+            future = self.loop.create_future()
+            try:
+                websocket = await self._connection()
+                self._pending[request_id] = (websocket, future)
+                await websocket.send(json.dumps({"jsonrpc": "2.0", "method": method,
+                                                 "params": params or [], "id": request_id}))
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            finally:
+                self._pending.pop(request_id, None)
+
+    def make_request(self, method, params):
+        if threading.current_thread() is _io_loop_thread:
+            raise RuntimeError("Requests can not be made synchronously from the websocket event loop")
+
+        logger.debug(f"Making request WebSocket. URI: {self.endpoint_uri}, Method: {method}")
+        return asyncio.run_coroutine_threadsafe(self.coro_make_request(method, params), self.loop).result()
+
+    async def make_request_async(self, method: str, params: Any) -> dict:
+        """Makes a request without blocking the event loop of the caller, whichever loop it is."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.coro_make_request(method, params),
+                                                                          self.loop))
+
+    async def coro_subscribe(self, params: list, callback: Callable) -> str:
+        response = await self.coro_make_request('eth_subscribe', params)
+        if 'error' in response:
+            raise ValueError(response['error'])
+
+        subscription_id = response['result']
+        self._subscriptions[subscription_id] = (self._websocket, callback)
+        return subscription_id
+
+    def subscribe(self, params: list, callback: Callable) -> str:
+        """Subscribes to notifications, for example `['newHeads']`, and returns the id of the subscription.
+
+        `callback` is called with the `result` of every notification, and with `None` once the subscription is
+        lost together with the connection. It is called on the websocket event loop thread, so it must return quickly
+        and must not make requests synchronously.
+        """
+        assert isinstance(params, list)
+        assert callable(callback)
+
+        return asyncio.run_coroutine_threadsafe(self.coro_subscribe(params, callback), self.loop).result()
+
+    def unsubscribe(self, subscription_id: str):
+        assert isinstance(subscription_id, str)
+
+        self._subscriptions.pop(subscription_id, None)
+        self.make_request('eth_unsubscribe', [subscription_id])
+
+    def disconnect(self):
+        """Closes the connection, failing the requests in flight. It will be reopened by the next request."""
+        async def close():
+            if self._websocket is not None:
+                await self._websocket.close()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+
+    def __str__(self):
+        return f"WS connection {self.endpoint_uri}"
@@ -0,0 +1,197 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, List
+
+from web3._utils.encoding import Web3JsonEncoder
+from web3.providers.base import BaseProvider
+
+logger = logging.getLogger()
+
+
+def request_key(method: str, params: Any) -> str:
+    """Identifies a JSON-RPC request by its method and parameters, whatever their Python types."""
+    return json.dumps([method, params], sort_keys=True, cls=Web3JsonEncoder)
+
+
+def load_recording(path: str) -> List[dict]:
+    """Reads a recording written by `RecordingProvider.save()`."""
+    with open(path) as file:
+        recording = json.load(file)
+
+    assert isinstance(recording, list)
+    return recording
+
+
+class RecordingProvider(BaseProvider):
+    """Records every request made to `provider`, and the response to it.
+
+    Wraps any provider, so a recording can be taken from a regular keeper session, e.g.
+    `web3.provider = RecordingProvider(web3.provider)`. The recording can then be served back by `ReplayProvider`
+    or `ReplayServer`, for offline benchmarks and tests of keeper code paths.
+    """
+
+    def __init__(self, provider: BaseProvider):
+        assert isinstance(provider, BaseProvider)
+        self.provider = provider
+        self.recording = []
+        self._lock = Lock()
+
+    def make_request(self, method, params):
+        response = self.provider.make_request(method, params)
+        # Round trip through json, so the recording does not change with later changes to `params` or `response`
+        entry = json.loads(json.dumps({"method": method, "params": params, "response": response},
+                                      cls=Web3JsonEncoder))
+        with self._lock:
+            self.recording.append(entry)
+
+        return response
+
+    def isConnected(self):
+        return self.provider.isConnected()
+
+    def save(self, path: str):
+        with self._lock:
+            recording = list(self.recording)
+
+        with open(path, "w") as file:
+            json.dump(recording, file, indent=1)
+        logger.info(f"Recorded {len(recording)} responses to {path}")
+
+    def __repr__(self):
+        return f"RecordingProvider({self.provider})"
+
+
+class RecordedResponses:
+    """Answers JSON-RPC requests from a recording.
+
+    Equal requests are answered in the order they were recorded in, the last response being repeated once they
+    are used up. Requests which were not recorded are answered with a -32601 error.
+    """
+
+    def __init__(self, recording: List[dict]):
+        assert isinstance(recording, list)
+        self.responses = defaultdict(list)
+        for entry in recording:
+            self.responses[request_key(entry['method'], entry['params'])].append(entry['response'])
+        self.served = defaultdict(int)
+        self.unanswered = []
+        self._lock = Lock()
+
+    def answer(self, request: dict) -> dict:
+        key = request_key(request['method'], request.get('params', []))
+        with self._lock:
+            responses = self.responses.get(key)
+            if not responses:
+                self.unanswered.append(key)
+                logger.warning(f"No recorded response to {key}")
+                return {"jsonrpc": "2.0", "id": request.get('id'),
+                        "error": {"code": -32601, "message": f"No recorded response to {key}"}}
+            response = responses[min(self.served[key], len(responses) - 1)]
+            self.served[key] += 1
+
+        return dict(response, id=request.get('id'))
+
+
+class ReplayProvider(BaseProvider):
+    """Serves a recording taken by `RecordingProvider`, in process.
+
+    Each request is delayed by `latency` seconds, to stand in for the round trip to a node.
+    """
+
+    def __init__(self, recording: List[dict], latency: float = 0.0):
+        assert isinstance(recording, list)
+        assert isinstance(latency, (int, float))
+        self.responses = RecordedResponses(recording)
+        self.latency = latency
+        self._request_counter = itertools.count()
+
+    def make_request(self, method, params):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self.responses.answer({"method": method, "params": params, "id": next(self._request_counter)})
+
+    def isConnected(self):
+        return True
+
+    def __repr__(self):
+        return f"ReplayProvider(latency={self.latency})"
+
+
+class ReplayServer:
+    """Serves a recording taken by `RecordingProvider` over HTTP, at `endpoint_uri`.
+
+    Unlike `ReplayProvider` it exercises the HTTP transport as well, including JSON-RPC batches. Each HTTP request
+    is delayed by `latency` seconds, however many JSON-RPC requests it carries.
+    """
+
+    def __init__(self, recording: List[dict], latency: float = 0.0, port: int = 0):
+        assert isinstance(recording, list)
+        assert isinstance(latency, (int, float))
+        assert isinstance(port, int)
+        self.responses = RecordedResponses(recording)
+        self.latency = latency
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if server.latency > 0:
+                    time.sleep(server.latency)
+                if isinstance(request, list):
+                    response = [server.responses.answer(r) for r in request]
+                else:
+                    response = server.responses.answer(request)
+
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._httpd.daemon_threads = True
+        self.endpoint_uri = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = Thread(target=self._httpd.serve_forever, name='pyflex-replay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __repr__(self):
+        return f"ReplayServer('{self.endpoint_uri}', latency={self.latency})"
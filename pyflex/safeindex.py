@@ -0,0 +1,193 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from threading import RLock
+from typing import Dict, List, Optional, Tuple
+
+from pyflex import Address
+from pyflex.eventindex import EventIndex
+from pyflex.gf import CollateralType, SAFE, SAFEEngine
+from pyflex.logs import LogFetcher
+from pyflex.numeric import Wad
+from pyflex.util import bytes_to_hexstring
+
+
+logger = logging.getLogger()
+
+
+class SafeIndex:
+    """Keeps the locked collateral and generated debt of every SAFE in memory, following `SAFEEngine` events.
+
+    The index is seeded from history (either fetched from the node with `seed()` or read from an
+    :py:class:`pyflex.eventindex.EventIndex` with `seed_from_index()`), and then kept up to date by calling `sync()`,
+    typically from a `Lifecycle.on_block` callback. Only `ModifySAFECollateralization`,
+    `TransferSAFECollateralAndDebt` and `ConfiscateSAFECollateralAndDebt` logs are retrieved, so no SAFE needs to
+    be read from the chain.
+
+    SAFEs with neither collateral nor debt are dropped from the index.
+
+    Attributes:
+        safe_engine: The `SAFEEngine` whose SAFEs are tracked.
+        last_block: The most recent block already applied to the index, or `None` if not seeded yet.
+        log_fetcher: Fetcher used to retrieve the logs from the node.
+    """
+
+    topics = [[bytes_to_hexstring(SAFEEngine.LogModifySAFECollateralization.topic),
+               bytes_to_hexstring(SAFEEngine.LogTransferSAFECollateralAndDebt.topic),
+               bytes_to_hexstring(SAFEEngine.LogConfiscateSAFECollateralAndDebt.topic)]]
+
+    def __init__(self, safe_engine: SAFEEngine, log_fetcher: Optional[LogFetcher] = None):
+        assert isinstance(safe_engine, SAFEEngine)
+        assert isinstance(log_fetcher, LogFetcher) or log_fetcher is None
+
+        self.safe_engine = safe_engine
+        self.log_fetcher = log_fetcher if log_fetcher is not None else LogFetcher(safe_engine.web3)
+        self.last_block = None
+        self._safes: Dict[Tuple[str, Address], Tuple[Wad, Wad]] = {}
+        self._lock = RLock()
+
+    def seed(self, from_block: int, to_block: Optional[int] = None) -> int:
+        """Rebuilds the index from the `SAFEEngine` logs emitted since `from_block`.
+
+        Args:
+            from_block: Block to start from, usually the block the `SAFEEngine` was deployed at.
+            to_block: Newest block to apply, defaults to the current block.
+
+        Returns:
+            The number of logs applied.
+        """
+        assert isinstance(from_block, int)
+        assert isinstance(to_block, int) or to_block is None
+
+        with self._lock:
+            self._safes.clear()
+            self.last_block = from_block - 1
+            return self.sync(to_block)
+
+    def seed_from_index(self, event_index: EventIndex) -> int:
+        """Rebuilds the index from the `SAFEEngine` logs already stored in an `EventIndex`.
+
+        Returns:
+            The number of logs applied.
+        """
+        assert isinstance(event_index, EventIndex)
+        assert self.safe_engine.address in event_index.addresses
+
+        with self._lock:
+            self._safes.clear()
+            self.last_block = event_index.last_block()
+            return self.apply(event_index.logs(address=self.safe_engine.address))
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """Applies all `SAFEEngine` logs emitted since the last applied block.
+
+        Args:
+            to_block: Newest block to apply, defaults to the current block.
+
+        Returns:
+            The number of logs applied.
+        """
+        assert isinstance(to_block, int) or to_block is None
+
+        with self._lock:
+            if self.last_block is None:
+                raise Exception("SafeIndex has to be seeded first")
+
+            if to_block is None:
+                to_block = self.safe_engine.web3.eth.blockNumber
+            if to_block <= self.last_block:
+                return 0
+
+            logs = self.log_fetcher.get_logs(self.safe_engine.address, self.topics, self.last_block + 1, to_block)
+            count = self.apply(logs)
+            self.last_block = to_block
+
+            logger.debug(f"Applied {count} SAFE updates up to block #{to_block}, tracking {len(self._safes)} SAFEs")
+            return count
+
+    def apply(self, logs: list) -> int:
+        """Applies raw `SAFEEngine` logs to the index, in the order given. Unrelated logs are ignored.
+
+        Returns:
+            The number of logs applied.
+        """
+        assert isinstance(logs, list)
+
+        count = 0
+        with self._lock:
+            for log in logs:
+                event = SAFEEngine.LogModifySAFECollateralization.from_event(log)
+                if event is not None:
+                    self._set(event.collateral_type, event.safe, event.locked_collateral, event.generated_debt)
+                    count += 1
+                    continue
+
+                event = SAFEEngine.LogTransferSAFECollateralAndDebt.from_event(log)
+                if event is not None:
+                    self._set(event.collateral_type, event.src, event.src_locked_collateral, event.src_generated_debt)
+                    self._set(event.collateral_type, event.dst, event.dst_locked_collateral, event.dst_generated_debt)
+                    count += 1
+                    continue
+
+                event = SAFEEngine.LogConfiscateSAFECollateralAndDebt.from_event(log)
+                if event is not None:
+                    # the event only carries deltas, so the SAFE has to be known already
+                    key = (event.collateral_type, event.safe)
+                    if key not in self._safes:
+                        logger.warning(f"Confiscation of an unknown SAFE {event.safe} ({event.collateral_type}),"
+                                       f" the index has probably been seeded too late")
+                    locked_collateral, generated_debt = self._safes.get(key, (Wad(0), Wad(0)))
+                    self._set(event.collateral_type, event.safe,
+                              locked_collateral + event.delta_collateral, generated_debt + event.delta_debt)
+                    count += 1
+
+        return count
+
+    def safe(self, collateral_type: CollateralType, address: Address) -> Optional[SAFE]:
+        """Returns the SAFE of `address` for `collateral_type`, or `None` if it is empty or unknown."""
+        assert isinstance(collateral_type, CollateralType)
+        assert isinstance(address, Address)
+
+        with self._lock:
+            state = self._safes.get((collateral_type.name, address))
+
+        return SAFE(address, CollateralType(collateral_type.name), *state) if state is not None else None
+
+    def safes(self, collateral_type: Optional[CollateralType] = None) -> List[SAFE]:
+        """Returns all non-empty SAFEs, optionally only the ones of a single collateral type."""
+        assert isinstance(collateral_type, CollateralType) or collateral_type is None
+
+        with self._lock:
+            items = list(self._safes.items())
+
+        return [SAFE(address, CollateralType(name), locked_collateral, generated_debt)
+                for (name, address), (locked_collateral, generated_debt) in items
+                if collateral_type is None or name == collateral_type.name]
+
+    def _set(self, collateral_type: str, address: Address, locked_collateral: Wad, generated_debt: Wad):
+        if locked_collateral == Wad(0) and generated_debt == Wad(0):
+            self._safes.pop((collateral_type, address), None)
+        else:
+            self._safes[(collateral_type, address)] = (locked_collateral, generated_debt)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._safes)
+
+    def __repr__(self):
+        return f"SafeIndex('{self.safe_engine.address}', last_block={self.last_block}, safes={len(self)})"
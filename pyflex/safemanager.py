@@ -17,6 +17,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from functools import cached_property
+
 from web3 import Web3
 from pyflex import Address, Contract, Transact
 from pyflex.gf import CollateralType, SAFE, SAFEEngine
@@ -39,7 +41,10 @@ class SafeManager(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
-        self.safe_engine = SAFEEngine(self.web3, Address(self._contract.functions.safeEngine().call()))
+
+    @cached_property
+    def safe_engine(self) -> SAFEEngine:
+        return SAFEEngine(self.web3, Address(self._contract.functions.safeEngine().call()))
 
     def open_safe(self, collateral_type: CollateralType, address: Address) -> Transact:
         assert isinstance(collateral_type, CollateralType)
@@ -18,6 +18,8 @@
 import asyncio
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from web3 import Web3
 
@@ -43,14 +45,61 @@ def http_response_summary(response) -> str:
     return f"{response.status_code} {response.reason} ({text})"
 
 
-# CAUTION: Used by Transact class, this breaks applications running their own asyncio event loop.
+_event_loop = None
+_event_loop_thread = None
+_event_loop_lock = threading.Lock()
+_rpc_executor = None
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the long-lived event loop `synchronize` runs coroutines on.
+
+    The loop is started in a daemon thread on first use and never closed, so transactions executed synchronously
+    share it instead of creating a new loop each, and applications running their own loop are not affected.
+    """
+    global _event_loop, _event_loop_thread
+
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            _event_loop_thread = threading.Thread(target=_event_loop.run_forever, name='pyflex-event-loop', daemon=True)
+            _event_loop_thread.start()
+
+        return _event_loop
+
+
+def rpc_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool blocking `web3` calls made from coroutines are run on."""
+    global _rpc_executor
+
+    with _event_loop_lock:
+        if _rpc_executor is None:
+            _rpc_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='pyflex-rpc')
+
+        return _rpc_executor
+
+
+async def run_blocking(function, *args, **kwargs):
+    """Runs a blocking call, like a `web3.eth` request, without blocking the event loop of the caller."""
+    return await asyncio.get_event_loop().run_in_executor(rpc_executor(), partial(function, *args, **kwargs))
+
+
+async def _gather(futures) -> list:
+    return list(await asyncio.gather(*futures))
+
+
 def synchronize(futures) -> list:
+    """Runs coroutines to completion on the shared `event_loop()`, and returns their results.
+
+    May be called from any thread, including from within a running event loop other than the shared one.
+    """
     if len(futures) > 0:
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(asyncio.gather(*futures, loop=loop))
-        finally:
-            loop.close()
+        loop = event_loop()
+        if threading.current_thread() is _event_loop_thread:
+            raise RuntimeError("synchronize() can not be called from a coroutine running on the pyflex event loop,"
+                               " await the coroutines instead")
+
+        return asyncio.run_coroutine_threadsafe(_gather(futures), loop).result()
     else:
         return []
 
@@ -117,7 +166,7 @@ class AsyncCallback:
         self.callback = callback
         self.thread = None
 
-    def trigger(self, on_start=None, on_finish=None) -> bool:
+    def trigger(self, on_start=None, on_finish=None, args: tuple = ()) -> bool:
         """Invokes the callback in a separate thread, unless one is already running.
 
         If callback isn't currently running, invokes it in a separate thread and returns `True`.
@@ -127,6 +176,7 @@ class AsyncCallback:
         Arguments:
             on_start: Optional method to be called before the actual callback. Can be `None`.
             on_finish: Optional method to be called after the actual callback. Can be `None`.
+            args: Optional arguments to call the callback with.
 
         Returns:
             `True` if callback has been invoked, or if it invocation attempt failed.
@@ -136,7 +186,7 @@ class AsyncCallback:
             def thread_target():
                 if on_start is not None:
                     on_start()
-                self.callback()
+                self.callback(*args)
                 if on_finish is not None:
                     on_finish()
 
@@ -0,0 +1,133 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import random
+
+import pytest
+from hexbytes import HexBytes
+from web3._utils.abi import exclude_indexed_event_inputs, get_indexed_event_inputs
+from web3._utils.events import get_event_data
+from web3.exceptions import LogTopicError, MismatchedABI
+
+import pyflex
+from pyflex.abiregistry import AbiRegistry, EventDecoder, LazyResource, abi_registry
+from pyflex.token import DSToken
+
+
+class TestAbiRegistry:
+    def setup_method(self):
+        self.abi_registry = AbiRegistry()
+
+    def test_loads_each_resource_once(self):
+        # when
+        abi = self.abi_registry.abi('pyflex.token', 'abi/DSToken.abi')
+        bin = self.abi_registry.bin('pyflex.token', 'abi/DSToken.bin')
+
+        # then
+        assert isinstance(abi, list)
+        assert any(member.get('name') == 'transfer' for member in abi)
+        assert self.abi_registry.abi('pyflex.token', 'abi/DSToken.abi') is abi
+        assert isinstance(bin, str) and len(bin) > 0
+
+    def test_selectors(self):
+        # when
+        selectors = self.abi_registry.selectors(DSToken.abi)
+
+        # then
+        assert selectors[HexBytes('0xa9059cbb')]['name'] == 'transfer'
+        assert self.abi_registry.selectors(DSToken.abi) is selectors
+
+    def test_topics(self):
+        # when
+        topics = self.abi_registry.topics(DSToken.abi)
+
+        # then
+        assert topics[HexBytes('0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef')]['name'] == 'Transfer'
+        assert all(member['type'] == 'event' for member in topics.values())
+
+
+def sample_value(type: str, generator: random.Random):
+    if type.endswith('[]'):
+        return [sample_value(type[:-2], generator) for _ in range(generator.randint(0, 3))]
+    elif type == 'address':
+        return '0x' + bytes(generator.getrandbits(8) for _ in range(20)).hex()
+    elif type == 'bool':
+        return generator.choice([True, False])
+    elif type.startswith('uint'):
+        return generator.getrandbits(int(type[4:] or 256))
+    elif type.startswith('int'):
+        return generator.getrandbits(int(type[3:] or 256) - 1) * generator.choice([1, -1])
+    elif type == 'bytes':
+        return bytes(generator.getrandbits(8) for _ in range(generator.randint(0, 40)))
+    elif type.startswith('bytes'):
+        return bytes(generator.getrandbits(8) for _ in range(int(type[5:])))
+    elif type == 'string':
+        return 'pyflex' * generator.randint(0, 5)
+    raise ValueError(type)
+
+
+def sample_log(event_abi: dict, generator: random.Random) -> dict:
+    codec = abi_registry.codec
+    topic_types = [input['type'] for input in get_indexed_event_inputs(event_abi)]
+    data_types = [input['type'] for input in exclude_indexed_event_inputs(event_abi)]
+    return {'address': '0x53EcCC9246C1E537D79199d0C7231E425A40F896',
+            'topics': [EventDecoder(codec, event_abi).topic] +
+                      [HexBytes(codec.encode_single(type, sample_value(type, generator))) for type in topic_types],
+            'data': '0x' + codec.encode_abi(data_types, [sample_value(type, generator) for type in data_types]).hex(),
+            'logIndex': 3, 'transactionIndex': 1, 'blockNumber': 100,
+            'transactionHash': HexBytes('0x' + '11' * 32), 'blockHash': HexBytes('0x' + '22' * 32)}
+
+
+class TestEventDecoder:
+    def event_abis(self):
+        abi_directory = os.path.join(os.path.dirname(pyflex.__file__), 'abi')
+        for file in sorted(os.listdir(abi_directory)):
+            if file.endswith('.abi'):
+                yield from abi_registry.topics(abi_registry.abi('pyflex', f'abi/{file}')).values()
+
+    def test_decodes_like_web3(self):
+        # given
+        generator = random.Random(42)
+
+        for event_abi in self.event_abis():
+            for _ in range(3):
+                log = sample_log(event_abi, generator)
+
+                # expect
+                assert EventDecoder(abi_registry.codec, event_abi).decode(log) == \
+                       get_event_data(abi_registry.codec, event_abi, log)
+
+    def test_rejects_logs_of_other_events(self):
+        # given
+        decoders = abi_registry.decoders(DSToken.abi)
+        transfer = decoders[HexBytes('0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef')]
+        log = sample_log(transfer.event_abi, random.Random(42))
+
+        # expect
+        with pytest.raises(MismatchedABI):
+            decoders[HexBytes('0x0f6798a560793a54c3bcfe86a93cde1e73087d944c0ea20544137d4121396885')].decode(log)
+        with pytest.raises(LogTopicError):
+            transfer.decode(dict(log, topics=log['topics'][:2]))
+
+
+class TestLazyResource:
+    def test_wrapper_abis_are_loaded_on_first_access(self):
+        # expect
+        assert isinstance(DSToken.__dict__['abi'], LazyResource)
+        assert DSToken.abi is abi_registry.abi('pyflex.token', 'abi/DSToken.abi')
+        assert DSToken.bin == abi_registry.bin('pyflex.token', 'abi/DSToken.bin')
@@ -0,0 +1,128 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pyflex import Address
+from pyflex.auctionpricing import IncreasingDiscountPricing, rpower
+from pyflex.auctions import IncreasingDiscountCollateralAuctionHouse
+from pyflex.numeric import Wad, Ray, Rad
+
+
+def bid(amount_to_sell: Wad = Wad.from_number(10), amount_to_raise: Rad = Rad.from_number(1000),
+        current_discount: Wad = Wad.from_number(0.95), max_discount: Wad = Wad.from_number(0.90),
+        latest_discount_update_time: int = 1000, discount_increase_deadline: int = 2000,
+        forgone_collateral_receiver: Address = Address('0x0000000000000000000000000000000000000001')):
+    return IncreasingDiscountCollateralAuctionHouse.Bid(id=1,
+                                                        amount_to_sell=amount_to_sell,
+                                                        amount_to_raise=amount_to_raise,
+                                                        current_discount=current_discount,
+                                                        max_discount=max_discount,
+                                                        per_second_discount_update_rate=Ray(999999410259856537771597932),
+                                                        latest_discount_update_time=latest_discount_update_time,
+                                                        discount_increase_deadline=discount_increase_deadline,
+                                                        forgone_collateral_receiver=forgone_collateral_receiver,
+                                                        auction_income_recipient=Address('0x0000000000000000000000000000000000000002'))
+
+
+def pricing(collateral_fsm_price: Wad = Wad.from_number(200), collateral_median_price: Wad = Wad.from_number(200),
+            system_coin_price: Ray = Ray.from_number(2)):
+    return IncreasingDiscountPricing(minimum_bid=Wad.from_number(5),
+                                     redemption_price=Ray.from_number(2),
+                                     collateral_fsm_price=collateral_fsm_price,
+                                     system_coin_price=system_coin_price,
+                                     collateral_median_price=collateral_median_price,
+                                     lower_collateral_median_deviation=Wad.from_number(0.90),
+                                     upper_collateral_median_deviation=Wad.from_number(0.95))
+
+
+class TestRpower:
+    def test_small_exponents(self):
+        assert rpower(Ray.from_number(2).value, 0, 10**27) == 10**27
+        assert rpower(Ray.from_number(2).value, 1, 10**27) == Ray.from_number(2).value
+        assert rpower(Ray.from_number(2).value, 10, 10**27) == Ray.from_number(1024).value
+        assert rpower(0, 0, 10**27) == 10**27
+        assert rpower(0, 5, 10**27) == 0
+
+    def test_matches_repeated_multiplication(self):
+        rate = 999999410259856537771597932
+        expected = 10**27
+        for _ in range(3600):
+            expected = expected * rate // 10**27
+
+        assert abs(rpower(rate, 3600, 10**27) - expected) < 10**19
+
+
+class TestIncreasingDiscountPricing:
+    def test_next_discount(self):
+        # before and during the discount increase
+        assert pricing().next_discount(bid(), 1000) == Wad.from_number(0.95)
+        discount = pricing().next_discount(bid(), 1100)
+        assert Wad.from_number(0.90) < discount < Wad.from_number(0.95)
+        assert pricing().next_discount(bid(), 1200) < discount
+
+        # bounded by the max discount, and set to it after the deadline
+        assert pricing().next_discount(bid(discount_increase_deadline=10**9), 10**8) == Wad.from_number(0.90)
+        assert pricing().next_discount(bid(), 2000) == Wad.from_number(0.90)
+        assert pricing().next_discount(bid(current_discount=Wad(0)), 1000) == Wad.from_number(0.90)
+
+        # auctions which do not exist
+        assert pricing().next_discount(bid(forgone_collateral_receiver=Address('0x0000000000000000000000000000000000000000')), 1000) == Wad(10**27)
+
+    def test_collateral_price_bounded_by_fsm(self):
+        assert pricing().collateral_price() == Wad.from_number(200)
+        assert pricing(collateral_median_price=Wad.from_number(190)).collateral_price() == Wad.from_number(190)
+        assert pricing(collateral_median_price=Wad.from_number(100)).collateral_price() == Wad.from_number(180)
+        assert pricing(collateral_median_price=Wad.from_number(205)).collateral_price() == Wad.from_number(205)
+        assert pricing(collateral_median_price=Wad.from_number(300)).collateral_price() == Wad.from_number(210)
+        assert pricing(collateral_median_price=Wad(0)).collateral_price() == Wad.from_number(200)
+
+    def test_discounted_collateral_price(self):
+        # 200 / 2 * 0.95
+        assert pricing().discounted_collateral_price(Wad.from_number(0.95)) == Wad.from_number(95)
+
+    def test_collateral_bought(self):
+        # 95 / 95 = 1
+        assert pricing().collateral_bought(bid(), Wad.from_number(95)) == (Wad.from_number(1), Wad.from_number(95))
+        # priced with an explicit discount, 90 / 90 = 1
+        assert pricing().collateral_bought(bid(), Wad.from_number(90), Wad.from_number(0.90)) == \
+               (Wad.from_number(1), Wad.from_number(90))
+
+    def test_collateral_bought_is_capped(self):
+        # the bid is capped by the amount left to raise
+        assert pricing().collateral_bought(bid(amount_to_sell=Wad.from_number(100)), Wad.from_number(2000)) == \
+               (Wad((Wad.from_number(1000).value + 1) * 10**18 // Wad.from_number(95).value),
+                Wad.from_number(1000) + Wad(1))
+        # the collateral bought is capped by the amount left to sell
+        assert pricing().collateral_bought(bid(), Wad.from_number(1000)) == (Wad.from_number(10), Wad.from_number(1000))
+
+    def test_collateral_bought_rejects_bids(self):
+        # below the minimum bid
+        assert pricing().collateral_bought(bid(), Wad.from_number(4)) == (Wad(0), Wad.from_number(4))
+        # leaving dust behind
+        dusty_bid = bid(amount_to_raise=Rad(Wad.from_number(95).value * 10**27 + 1))
+        assert pricing().collateral_bought(dusty_bid, Wad.from_number(95)) == (Wad(0), Wad.from_number(95))
+        # finished auction
+        assert pricing().collateral_bought(bid(amount_to_sell=Wad(0)), Wad.from_number(95)) == (Wad(0), Wad.from_number(95))
+        # invalid collateral price
+        assert pricing(collateral_fsm_price=Wad(0)).collateral_bought(bid(), Wad.from_number(95)) == \
+               (Wad(0), Wad.from_number(95))
+
+    def test_ladder_matches_single_quotes(self):
+        wads = [Wad.from_number(amount) for amount in [0, 1, 5, 47.5, 95, 500, 999.5, 1000, 5000]]
+        ladder = pricing().collateral_bought_ladder(bid(), [wad.value for wad in wads], Wad.from_number(0.92))
+
+        assert ladder == [pricing().collateral_bought(bid(), wad, Wad.from_number(0.92)) for wad in wads]
+        assert ladder[3] == (Wad(Wad.from_number(47.5).value * 10**18 // Wad.from_number(92).value), Wad.from_number(47.5))
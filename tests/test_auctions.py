@@ -28,8 +28,11 @@ from pyflex.auctions import FixedDiscountCollateralAuctionHouse, EnglishCollater
 from pyflex.auctions import IncreasingDiscountCollateralAuctionHouse
 from pyflex.auctions import PreSettlementSurplusAuctionHouse
 from pyflex.auctions import DebtAuctionHouse
+from pyflex.auctionbook import AuctionBook
+from pyflex.auctionpricing import IncreasingDiscountPricing
 from pyflex.deployment import GfDeployment
 from pyflex.gf import Collateral, SAFE, OracleRelayer
+from pyflex.multicall import Multicall
 from pyflex.numeric import Wad, Ray, Rad
 from tests.test_gf import wrap_eth, mint_prot, set_collateral_price, wait, wrap_modify_safe_collateralization
 from tests.test_gf import cleanup_safe, max_delta_debt
@@ -125,6 +128,15 @@ def check_active_auctions(auction: AuctionContract):
         assert isinstance(bid.high_bidder, Address)
         assert bid.high_bidder != Address("0x0000000000000000000000000000000000000000")
 
+def check_active_auctions_with_multicall(auction: AuctionContract, multicall: Multicall):
+    assert [bid.__dict__ for bid in auction.active_auctions(multicall)] == \
+           [bid.__dict__ for bid in auction.active_auctions()]
+
+def check_auction_book(book: AuctionBook):
+    book.sync()
+    assert [bid.__dict__ for bid in book.unfinished_auctions()] == \
+           [bid.__dict__ for bid in book.auction_house.unfinished_auctions()]
+
 class TestEnglishCollateralAuctionHouse:
     @pytest.fixture(scope="session")
     def collateral(self, geb: GfDeployment) -> Collateral:
@@ -305,6 +317,7 @@ class TestEnglishCollateralAuctionHouse:
         assert current_bid.bid_amount == current_bid.amount_to_raise
         assert len(english_collateral_auction_house.active_auctions()) == 1
         check_active_auctions(english_collateral_auction_house)
+        check_active_auctions_with_multicall(english_collateral_auction_house, geb.multicall)
         log = english_collateral_auction_house.past_logs(1)[0]
         assert isinstance(log, EnglishCollateralAuctionHouse.IncreaseBidSizeLog)
         assert log.high_bidder == current_bid.high_bidder
@@ -338,6 +351,9 @@ class TestEnglishCollateralAuctionHouse:
         assert 0 < current_bid.bid_expiry < now or current_bid.auction_deadline < now
         assert english_collateral_auction_house.settle_auction(start_auction).transact(from_address=our_address)
         assert len(english_collateral_auction_house.active_auctions()) == 0
+        assert len(english_collateral_auction_house.active_auctions(geb.multicall)) == 0
+        assert start_auction in english_collateral_auction_house._finished_auctions or \
+               english_collateral_auction_house._first_unfinished_auction > start_auction
         log = english_collateral_auction_house.past_logs(1)[0]
         assert isinstance(log, EnglishCollateralAuctionHouse.SettleAuctionLog)
 
@@ -458,6 +474,7 @@ class TestFixedDiscountCollateralAuctionHouse:
         # Ensure auction has been started
         assert fixed_collateral_auction_house.auctions_started() == auctions_started_before + 1
         assert len(fixed_collateral_auction_house.active_auctions()) == 1
+        check_active_auctions_with_multicall(fixed_collateral_auction_house, geb.multicall)
         auction_id = fixed_collateral_auction_house.auctions_started()
         assert auction_id == auctions_started_before + 1
         safe = geb.safe_engine.safe(collateral.collateral_type, deployment_address)
@@ -653,10 +670,14 @@ class TestPreSettlementSurplusAuctionHouse:
         assert log.id == start_auction
         assert log.amount_to_sell == current_bid.amount_to_sell
         assert log.initial_bid == current_bid.bid_amount
+        book = AuctionBook(surplus_auction_house, geb.multicall)
+        book.seed()
+        assert book.bid(start_auction).__dict__ == current_bid.__dict__
 
         # Allow the auction to expire, and then resurrect it
         wait(geb, our_address, surplus_auction_house.total_auction_length()+1)
         assert surplus_auction_house.restart_auction(start_auction).transact()
+        check_auction_book(book)
 
         # Bid on the resurrected auction
         mint_prot(geb.prot, our_address, Wad.from_number(10))
@@ -667,6 +688,8 @@ class TestPreSettlementSurplusAuctionHouse:
         current_bid = surplus_auction_house.bids(start_auction)
         assert current_bid.bid_amount == bid_amount
         assert current_bid.high_bidder == our_address
+        check_auction_book(book)
+        assert book.bid(start_auction).__dict__ == current_bid.__dict__
 
         # Exercise _settleAuction_ after bid has expired
         wait(geb, our_address, surplus_auction_house.bid_duration()+1)
@@ -678,6 +701,8 @@ class TestPreSettlementSurplusAuctionHouse:
         log = surplus_auction_house.past_logs(1)[0]
         assert isinstance(log, PreSettlementSurplusAuctionHouse.SettleAuctionLog)
         assert log.id == start_auction
+        book.sync()
+        assert book.bid(start_auction) is None
 
         # Grab our system_coin
         geb.approve_system_coin(our_address)
@@ -820,6 +845,9 @@ class TestIncreasingDiscountCollateralAuctionHouse:
         assert increasing_collateral_auction_house.get_collateral_bought(id, wad).transact(from_address=address)
         assert increasing_collateral_auction_house.last_read_redemption_price() >= Wad(0)
         assert increasing_collateral_auction_house.get_approximate_collateral_bought(id, wad)
+        pricing = IncreasingDiscountPricing.from_auction_house(increasing_collateral_auction_house)
+        assert pricing.collateral_bought(current_bid, wad) == \
+               increasing_collateral_auction_house.get_approximate_collateral_bought(id, wad)
         assert increasing_collateral_auction_house.buy_collateral(id, wad).transact(from_address=address)
 
     def test_discount(self, geb, increasing_collateral_auction_house):
@@ -1088,10 +1116,14 @@ class TestPreSettlementSurplusAuctionHouse:
         assert log.id == start_auction
         assert log.amount_to_sell == current_bid.amount_to_sell
         assert log.initial_bid == current_bid.bid_amount
+        book = AuctionBook(surplus_auction_house, geb.multicall)
+        book.seed()
+        assert book.bid(start_auction).__dict__ == current_bid.__dict__
 
         # Allow the auction to expire, and then resurrect it
         wait(geb, our_address, surplus_auction_house.total_auction_length()+1)
         assert surplus_auction_house.restart_auction(start_auction).transact()
+        check_auction_book(book)
 
         # Bid on the resurrected auction
         mint_prot(geb.prot, our_address, Wad.from_number(10))
@@ -1102,6 +1134,8 @@ class TestPreSettlementSurplusAuctionHouse:
         current_bid = surplus_auction_house.bids(start_auction)
         assert current_bid.bid_amount == bid_amount
         assert current_bid.high_bidder == our_address
+        check_auction_book(book)
+        assert book.bid(start_auction).__dict__ == current_bid.__dict__
 
         # Exercise _settleAuction_ after bid has expired
         wait(geb, our_address, surplus_auction_house.bid_duration()+1)
@@ -1113,6 +1147,8 @@ class TestPreSettlementSurplusAuctionHouse:
         log = surplus_auction_house.past_logs(1)[0]
         assert isinstance(log, PreSettlementSurplusAuctionHouse.SettleAuctionLog)
         assert log.id == start_auction
+        book.sync()
+        assert book.bid(start_auction) is None
 
         # Grab our system_coin
         geb.approve_system_coin(our_address)
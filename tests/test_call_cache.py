@@ -0,0 +1,145 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from web3 import Web3, HTTPProvider
+
+from pyflex import enable_call_cache, get_call_cache
+from pyflex.feed import DSValue
+
+
+class TestCallCache:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.dsvalue = DSValue.deploy(self.web3)
+        assert self.dsvalue.update_result(100).transact()
+
+    def test_disabled_by_default(self):
+        # expect
+        assert get_call_cache(self.web3) is None
+
+    def test_enable_is_idempotent(self):
+        # when
+        call_cache = enable_call_cache(self.web3)
+
+        # then
+        assert enable_call_cache(self.web3) is call_cache
+        assert get_call_cache(self.web3) is call_cache
+
+    def test_pass_through_until_first_block(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+
+        # when
+        assert self.dsvalue.read() == 100
+        assert self.dsvalue.read() == 100
+
+        # then
+        assert call_cache.hits == 0
+        assert call_cache.misses == 0
+
+    def test_cache_reads_within_block(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+        call_cache.new_block(self.web3.eth.blockNumber)
+
+        # when
+        assert self.dsvalue.read() == 100
+        assert self.dsvalue.read() == 100
+        assert self.dsvalue.has_value()
+
+        # then
+        assert call_cache.misses == 2
+        assert call_cache.hits == 1
+
+    def test_reads_pinned_to_block(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+        call_cache.new_block(self.web3.eth.blockNumber)
+        assert self.dsvalue.read() == 100
+
+        # when
+        assert self.dsvalue.update_result(200).transact()
+
+        # then
+        assert self.dsvalue.read() == 100
+
+        # when
+        call_cache.new_block(self.web3.eth.blockNumber)
+
+        # then
+        assert self.dsvalue.read() == 200
+        assert call_cache.misses == 2
+
+    def test_ignore_older_blocks(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+        call_cache.new_block(self.web3.eth.blockNumber)
+        assert self.dsvalue.read() == 100
+
+        # when
+        call_cache.new_block(self.web3.eth.blockNumber - 1)
+
+        # then
+        assert self.dsvalue.read() == 100
+        assert call_cache.hits == 1
+
+    def test_clear(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+        call_cache.new_block(self.web3.eth.blockNumber)
+        assert self.dsvalue.read() == 100
+        assert self.dsvalue.read() == 100
+
+        # when
+        call_cache.clear()
+
+        # then
+        assert call_cache.hits == 0
+        assert call_cache.misses == 0
+        assert self.dsvalue.read() == 100
+        assert call_cache.misses == 1
+
+    def test_cache_reads_at_explicit_block(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+        block_number = self.web3.eth.blockNumber
+        read = self.dsvalue._contract.functions.read()
+
+        # when
+        first = read.call(block_identifier=block_number)
+        assert self.dsvalue.update_result(200).transact()
+        second = read.call(block_identifier=block_number)
+
+        # then
+        assert first == second
+        assert call_cache.misses == 1
+        assert call_cache.hits == 1
+
+    def test_pass_through_pending_reads(self):
+        # given
+        call_cache = enable_call_cache(self.web3)
+        call_cache.new_block(self.web3.eth.blockNumber)
+        read = self.dsvalue._contract.functions.read()
+
+        # when
+        read.call(block_identifier='pending')
+        read.call(block_identifier='pending')
+
+        # then
+        assert call_cache.hits == 0
+        assert call_cache.misses == 0
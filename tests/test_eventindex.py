@@ -0,0 +1,189 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest.mock import Mock
+
+import pytest
+from web3 import Web3, HTTPProvider
+
+from pyflex.eventindex import EventIndex
+from pyflex.numeric import Wad
+from pyflex.token import DSToken
+from pyflex.util import bytes_to_hexstring
+
+
+class TestEventIndex:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.token = DSToken.deploy(self.web3, 'ABC', 'ABC')
+        self.other_token = DSToken.deploy(self.web3, 'XYZ', 'XYZ')
+        self.starting_block = self.web3.eth.blockNumber + 1
+        self.mint_topic = bytes_to_hexstring(self.web3.keccak(text="Mint(address,uint256)"))
+
+    def mint(self, times: int):
+        for _ in range(times):
+            assert self.token.mint(Wad(1)).transact()
+            assert self.other_token.mint(Wad(2)).transact()
+
+    def chain_logs(self, token: DSToken) -> list:
+        return self.web3.eth.getLogs({'address': token.address.address,
+                                      'fromBlock': self.starting_block,
+                                      'toBlock': self.web3.eth.blockNumber})
+
+    def index(self, path: str) -> EventIndex:
+        return EventIndex(self.web3, path, [self.token.address, self.other_token.address], self.starting_block,
+                          reorg_depth=3)
+
+    def test_sync(self):
+        # given
+        index = self.index(":memory:")
+        self.mint(3)
+
+        # when
+        count = index.sync()
+
+        # then
+        assert count == len(self.chain_logs(self.token)) + len(self.chain_logs(self.other_token))
+        assert index.last_block() == self.web3.eth.blockNumber
+        assert index.logs(address=self.token.address) == self.chain_logs(self.token)
+        assert index.logs(address=self.other_token.address) == self.chain_logs(self.other_token)
+
+    def test_filter_logs(self):
+        # given
+        index = self.index(":memory:")
+        self.mint(3)
+        index.sync()
+
+        # when
+        mints = index.logs(address=self.token.address, topic=self.mint_topic)
+
+        # then
+        assert len(mints) == 3
+        assert index.logs(address=self.token.address, topic=self.mint_topic,
+                          from_block=mints[1]['blockNumber'], to_block=mints[1]['blockNumber']) == [mints[1]]
+
+    def test_decode_events(self):
+        # given
+        index = self.index(":memory:")
+        self.mint(2)
+        index.sync()
+
+        def parser(log):
+            if bytes_to_hexstring(log['topics'][0]) == self.mint_topic:
+                return self.token._contract.events.Mint().processLog(log)
+
+        # when
+        events = index.events(self.token.address, parser)
+
+        # then
+        assert [event['args']['wad'] for event in events] == [Wad(1).value, Wad(1).value]
+
+    def test_resume_from_last_indexed_block(self, tmpdir):
+        # given
+        path = str(tmpdir.join("events.db"))
+        index = self.index(path)
+        self.mint(2)
+        index.sync()
+        index.close()
+
+        # when
+        self.mint(2)
+        index = self.index(path)
+        last_block = index.last_block()
+        count = index.sync()
+
+        # then
+        assert last_block < self.web3.eth.blockNumber
+        assert count == len(self.chain_logs(self.token)) // 2 + len(self.chain_logs(self.other_token)) // 2
+        assert index.logs(address=self.token.address) == self.chain_logs(self.token)
+
+    def test_nothing_to_sync(self):
+        # given
+        index = self.index(":memory:")
+        self.mint(1)
+        index.sync()
+
+        # expect
+        assert index.sync() == 0
+
+    def test_rollback_on_reorg(self):
+        # given
+        index = self.index(":memory:")
+        self.mint(3)
+        index.sync()
+        last_block = index.last_block()
+
+        # when
+        index._set_meta('last_block_hash', bytes_to_hexstring(bytes(32)))
+        index._connection.execute("DELETE FROM logs WHERE block_number = ?", (last_block - 1,))
+        index.sync()
+
+        # then
+        assert index.last_block() == last_block
+        assert index.logs(address=self.token.address) == self.chain_logs(self.token)
+        assert index.logs(address=self.other_token.address) == self.chain_logs(self.other_token)
+
+    def test_fail_on_different_contracts(self, tmpdir):
+        # given
+        path = str(tmpdir.join("events.db"))
+        self.index(path).sync()
+
+        # expect
+        with pytest.raises(Exception):
+            EventIndex(self.web3, path, [self.token.address], self.starting_block)
+
+    def test_filter_by_topics(self):
+        # given
+        index = EventIndex(self.web3, ":memory:", [self.token.address, self.other_token.address], self.starting_block,
+                           topics={self.token.address: [self.mint_topic]})
+        self.mint(3)
+        assert self.token.transfer(self.other_token.address, Wad(1)).transact()
+
+        # when
+        index.sync()
+
+        # then
+        mints = [log for log in self.chain_logs(self.token) if bytes_to_hexstring(log['topics'][0]) == self.mint_topic]
+        assert len(mints) < len(self.chain_logs(self.token))
+        assert index.logs(address=self.token.address) == mints
+        assert index.logs(address=self.other_token.address) == self.chain_logs(self.other_token)
+
+    def test_fetch_again_if_reorganized_during_sync(self):
+        # given
+        index = self.index(":memory:")
+        self.mint(2)
+        block_hash = index._block_hash(self.web3.eth.blockNumber)
+
+        # when
+        index._block_hash = Mock(side_effect=[bytes_to_hexstring(bytes(32)), block_hash, block_hash, block_hash])
+        index.sync()
+
+        # then
+        assert index._block_hash.call_count == 4
+        assert index._get_meta('last_block_hash') == block_hash
+        assert index.logs(address=self.token.address) == self.chain_logs(self.token)
+
+    def test_fail_on_different_events(self, tmpdir):
+        # given
+        path = str(tmpdir.join("events.db"))
+        self.index(path).sync()
+
+        # expect
+        with pytest.raises(Exception):
+            EventIndex(self.web3, path, [self.token.address, self.other_token.address], self.starting_block,
+                       topics={self.token.address: [self.mint_topic]})
@@ -15,13 +15,18 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import copy
+import pickle
+from unittest.mock import patch
+
 import pytest
 from hexbytes import HexBytes
 from web3 import HTTPProvider, Web3
 from web3._utils.request import _get_session
 
-from pyflex import Address, Calldata, Receipt, Transfer, web3_via_http
+from pyflex import Address, Calldata, Receipt, Transfer, prevalidate_contracts, web3_via_http
 from pyflex.numeric import Wad
+from pyflex.token import DSToken, ERC20Token
 from pyflex.util import eth_balance
 from tests.helpers import is_hashable
 
@@ -112,6 +117,71 @@ class TestAddress:
         assert address1 < address3
         assert address1 <= address3
 
+    def test_creation_from_bytes(self):
+        # given
+        address = Address('0x0000011111000001111100000111110000011111')
+
+        # expect
+        assert Address(address.as_bytes()) == address
+        assert Address(HexBytes(address.as_bytes())) == address
+
+    def test_should_intern_addresses(self):
+        # given
+        checksum = '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+
+        # expect
+        assert Address(checksum) is Address(checksum)
+        assert Address(checksum) is Address(checksum.lower())
+        assert Address(checksum) is Address(Address(checksum).as_bytes())
+        assert Address(checksum).address == checksum
+
+    def test_equality_and_hash_across_representations(self):
+        # given
+        address1 = Address('0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed')
+        address2 = Address('5aaeb6053f3e94c9b9a09f33669435e7ef1beaed')
+
+        # expect
+        assert address1 == address2
+        assert hash(address1) == hash(address2)
+        assert len({address1, address2}) == 1
+
+    def test_should_be_immutable_when_copied(self):
+        # given
+        address = Address('0x0000011111000001111100000111110000011111')
+
+        # expect
+        assert copy.copy(address) is address
+        assert copy.deepcopy(address) is address
+        assert pickle.loads(pickle.dumps(address)) == address
+
+
+class TestPrevalidateContracts:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.token = DSToken.deploy(self.web3, 'ABC', 'ABC')
+        self.empty = Address('0x0000000000000000000000000000000000000123')
+
+    def test_should_not_check_prevalidated_contracts_again(self):
+        # when
+        missing = prevalidate_contracts(self.web3, [self.token.address, self.empty, self.token.address])
+
+        # then
+        assert missing == [self.empty]
+        with patch('pyflex.is_contract_at') as is_contract_at:
+            assert DSToken(self.web3, self.token.address).address == self.token.address
+            assert not is_contract_at.called
+        with pytest.raises(Exception):
+            DSToken(self.web3, self.empty)
+
+    def test_should_trust_addresses(self):
+        # when
+        missing = prevalidate_contracts(self.web3, [self.empty], trusted=True)
+
+        # then
+        assert missing == []
+        assert DSToken(self.web3, self.empty).address == self.empty
+
 
 class TestCalldata:
     def test_creation(self):
@@ -254,6 +324,29 @@ class TestReceipt:
                                                 to_address=Address('0x0046f01ad360270605e0e5d693484ec3bfe43ba8'),
                                                 value=Wad.from_number(1))
 
+    def test_decoding_events(self, receipt_success):
+        # given
+        receipt = Receipt(receipt_success)
+
+        # when
+        events = receipt.events(ERC20Token)
+
+        # then
+        assert len(events) == 1
+        assert events[0]['event'] == 'Transfer'
+        assert events[0]['args']['value'] == Wad.from_number(1).value
+        assert receipt.events() == []
+
+    def test_should_skip_transfers_with_other_indexed_arguments(self, receipt_success):
+        # given
+        erc721_transfer = dict(receipt_success['logs'][0])
+        erc721_transfer['topics'] = erc721_transfer['topics'] + [HexBytes('0x' + '00' * 31 + '01')]
+        erc721_transfer['data'] = '0x'
+        receipt_success['logs'] = [erc721_transfer] + receipt_success['logs']
+
+        # expect
+        assert len(Receipt(receipt_success).transfers) == 1
+
     def test_should_recognize_successful_and_failed_transactions(self, receipt_success, receipt_failed):
         # expect
         assert Receipt(receipt_success).successful is True
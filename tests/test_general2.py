@@ -16,6 +16,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
+import threading
+import time
+
 import pytest
 from mock import MagicMock
 from web3 import Web3, HTTPProvider
@@ -151,6 +154,38 @@ class TestTransact:
         # then
         assert self.web3.eth.getBlock('latest', full_transactions=True).transactions[0].gasPrice == gas_price.gas_price
 
+    def test_broadcast_burst_concurrently(self):
+        # given
+        original_send_transaction = self.web3.eth.sendTransaction
+        next_nonce = [self.web3.eth.getTransactionCount(self.our_address.address)]
+        in_flight = [0, 0]
+        condition = threading.Condition()
+
+        def slow_send_transaction(transaction):
+            with condition:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.5)
+            # the chain under test only accepts transactions in nonce order
+            with condition:
+                condition.wait_for(lambda: transaction['nonce'] == next_nonce[0], timeout=10)
+                try:
+                    return original_send_transaction(transaction)
+                finally:
+                    next_nonce[0] += 1
+                    in_flight[0] -= 1
+                    condition.notify_all()
+
+        self.web3.eth.sendTransaction = MagicMock(side_effect=slow_send_transaction)
+
+        # when
+        receipts = synchronize([self.token.transfer(self.second_address, Wad(1)).transact_async() for _ in range(4)])
+
+        # then
+        assert all(receipt is not None and receipt.successful for receipt in receipts)
+        assert in_flight[1] > 1
+        assert self.token.balance_of(self.second_address) == Wad(4)
+
     def test_custom_from_address(self):
         # given
         self.token.transfer(self.second_address, Wad(self.token.balance_of(self.our_address))).transact()
@@ -295,6 +330,46 @@ class TestTransactReplace:
         # and
         assert self.token.balance_of(self.second_address) == Wad(500)
 
+    @pytest.mark.timeout(10)
+    def test_transaction_replace_of_mined_transaction(self):
+        # given
+        transact_1 = self.token.transfer(self.second_address, Wad(500))
+        receipt_1 = transact_1.transact()
+        assert receipt_1 is not None
+
+        # when
+        transact_2 = self.token.transfer(self.third_address, Wad(700))
+        receipt_2 = transact_2.transact(replace=transact_1)
+
+        # then
+        assert transact_2.status == TransactStatus.FINISHED
+        assert receipt_2 is not None
+        assert receipt_2.transaction_hash == receipt_1.transaction_hash
+        # and
+        assert self.token.balance_of(self.second_address) == Wad(500)
+        assert self.token.balance_of(self.third_address) == Wad(0)
+
+    @pytest.mark.timeout(15)
+    def test_transaction_replace_of_mined_transaction_with_late_receipt(self):
+        # given
+        transact_1 = self.token.transfer(self.second_address, Wad(500))
+        receipt_1 = transact_1.transact()
+        assert receipt_1 is not None
+
+        # when the node serves the receipt only a few seconds after the nonce got used
+        original_get_transaction_receipt = self.web3.eth.getTransactionReceipt
+        receipt_served_at = time.time() + 3
+        self.web3.eth.getTransactionReceipt = MagicMock(
+            side_effect=lambda tx_hash: original_get_transaction_receipt(tx_hash)
+            if time.time() >= receipt_served_at else None)
+        # and
+        transact_2 = self.token.transfer(self.third_address, Wad(700))
+        receipt_2 = transact_2.transact(replace=transact_1)
+
+        # then
+        assert receipt_2 is not None
+        assert receipt_2.transaction_hash == receipt_1.transaction_hash
+
 
 class TestTransactRecover:
     def setup_method(self):
@@ -346,6 +346,31 @@ class TestSAFEEngine:
         assert debt >= Rad(0)
         assert debt < geb.safe_engine.global_debt_ceiling()
 
+    def test_safes(self, geb, our_address, other_address):
+        # given
+        collateral_type = geb.collaterals['ETH-A'].collateral_type
+        addresses = [other_address, our_address, other_address]
+
+        # when
+        safes = geb.safe_engine.safes(collateral_type, addresses, geb.multicall)
+
+        # then
+        assert [safe.address for safe in safes] == addresses
+        for safe in safes:
+            expected = geb.safe_engine.safe(collateral_type, safe.address)
+            assert safe.locked_collateral == expected.locked_collateral
+            assert safe.generated_debt == expected.generated_debt
+
+    def test_collateral_types(self, geb):
+        # given
+        names = ['ETH-C', 'XXX', 'ETH-A']
+
+        # when
+        collateral_types = geb.safe_engine.collateral_types(names, geb.multicall)
+
+        # then
+        assert collateral_types == [geb.safe_engine.collateral_type(name) for name in names]
+
     def test_safe(self, safe):
         time.sleep(11)
         assert safe.collateral_type is not None
@@ -469,8 +494,11 @@ class TestSAFEEngine:
             assert mods[3].delta_collateral == Wad.from_number(30)
             assert mods[3].delta_debt == Wad(0)
 
+            log_fetcher = geb.safe_engine._log_fetcher
             assert len(geb.safe_engine.past_safe_modifications(from_block, collateral_type=collateral_type0)) == 1
             assert len(geb.safe_engine.past_safe_modifications(from_block, collateral_type=collateral_type1)) == 3
+            # the chunk size learned by one call is kept for the next one
+            assert geb.safe_engine._log_fetcher is log_fetcher
 
         finally:
             # teardown
@@ -16,16 +16,18 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import time
-from threading import Event
+from threading import Event, Thread
 from unittest.mock import Mock
 
 import pytest
+from hexbytes import HexBytes
 from mock import MagicMock
 from web3 import Web3, HTTPProvider
 
 import pyflex
 from pyflex import Address
 from pyflex.lifecycle import Lifecycle, trigger_event
+from tests.test_providers import MockedWebsocketNode
 
 
 @pytest.mark.timeout(60)
@@ -371,3 +373,73 @@ class TestLifecycle:
                 lifecycle.on_event(Event(), 1, event_callback_1)
                 lifecycle.on_event(Event(), 1, event_callback_2)
                 lifecycle.on_shutdown(shutdown_callback)  # assertions are in `shutdown_callback`
+
+
+@pytest.mark.timeout(60)
+class TestLifecycleNewHeads:
+    def setup_method(self):
+        pyflex.filter_threads = []
+        self.node = MockedWebsocketNode()
+        self.web3 = pyflex.web3_via_websocket(self.node.endpoint_uri)
+
+    def teardown_method(self):
+        self.node.stop()
+
+    def test_should_push_new_blocks(self):
+        blocks = []
+
+        def callback(block):
+            blocks.append(block)
+            if len(blocks) >= 2:
+                lifecycle.terminate("Unit test is over")
+
+        def startup():
+            def mine():
+                while not self.node.subscribers:
+                    time.sleep(0.01)
+                for block_number in range(1, 4):
+                    self.node.mine(block_number)
+                    time.sleep(0.2)
+
+            Thread(target=mine, daemon=True).start()
+
+        # when
+        with pytest.raises(SystemExit):
+            with Lifecycle(self.web3) as lifecycle:
+                lifecycle.on_startup(startup)
+                lifecycle.on_block(callback, with_block=True)
+
+        # then
+        assert [block.number for block in blocks[:2]] == [1, 2]
+        assert blocks[0].hash == HexBytes("0x" + f"{1:064x}")
+
+    def test_should_advance_call_cache_while_callback_is_busy(self):
+        call_cache = pyflex.enable_call_cache(self.web3)
+        pinned_blocks = []
+
+        def callback():
+            # blocks 2 and 3 arrive while this callback is still running
+            started = time.time()
+            while call_cache.block_number != 3 and time.time() - started < 5:
+                time.sleep(0.01)
+            pinned_blocks.append(call_cache.block_number)
+            lifecycle.terminate("Unit test is over")
+
+        def startup():
+            def mine():
+                while not self.node.subscribers:
+                    time.sleep(0.01)
+                for block_number in range(1, 4):
+                    self.node.mine(block_number)
+                    time.sleep(0.2)
+
+            Thread(target=mine, daemon=True).start()
+
+        # when
+        with pytest.raises(SystemExit):
+            with Lifecycle(self.web3) as lifecycle:
+                lifecycle.on_startup(startup)
+                lifecycle.on_block(callback)
+
+        # then
+        assert pinned_blocks == [3]
@@ -0,0 +1,201 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+from pyflex import Address
+from pyflex.gf import CollateralType, SAFE
+from pyflex.liquidation import LiquidationCandidate, SafeHealthQueue, screen_safes
+from pyflex.numeric import Wad, Ray, Rad
+
+
+def address(index: int) -> Address:
+    return Address('0x' + format(index + 1, '040x'))
+
+
+def safe(index: int, locked_collateral: Wad, generated_debt: Wad) -> SAFE:
+    return SAFE(address(index), CollateralType('ETH-A'), locked_collateral, generated_debt)
+
+
+def is_critical(safe: SAFE, accumulated_rate: Ray, liquidation_price: Ray) -> bool:
+    return safe.locked_collateral.value * liquidation_price.value < safe.generated_debt.value * accumulated_rate.value
+
+
+class TestSafeHealthQueue:
+    def setup_method(self):
+        self.collateral_type = CollateralType('ETH-A')
+        self.queue = SafeHealthQueue(self.collateral_type)
+
+    def test_order_by_health(self):
+        # given
+        self.queue.update(safe(0, Wad.from_number(30), Wad.from_number(10)))
+        self.queue.update(safe(1, Wad.from_number(10), Wad.from_number(10)))
+        self.queue.update(safe(2, Wad.from_number(20), Wad.from_number(10)))
+
+        # expect
+        assert [s.address for s in self.queue.safes()] == [address(1), address(2), address(0)]
+
+    def test_critical(self):
+        # given
+        self.queue.update(safe(0, Wad.from_number(30), Wad.from_number(10)))
+        self.queue.update(safe(1, Wad.from_number(10), Wad.from_number(10)))
+        self.queue.update(safe(2, Wad.from_number(20), Wad.from_number(10)))
+
+        # expect
+        assert self.queue.critical(Ray.from_number(1), Ray.from_number(3)) == []
+        assert [s.address for s in self.queue.critical(Ray.from_number(1), Ray.from_number(0.9))] == [address(1)]
+        assert [s.address for s in self.queue.critical(Ray.from_number(1), Ray.from_number(0.4))] == \
+               [address(1), address(2)]
+        assert len(self.queue.critical(Ray.from_number(1), Ray(0))) == 3
+
+    def test_boundary_is_not_critical(self):
+        # given
+        self.queue.update(safe(0, Wad.from_number(15), Wad.from_number(10)))
+
+        # expect
+        assert self.queue.critical(Ray.from_number(1.5), Ray.from_number(1)) == []
+        assert len(self.queue.critical(Ray(Ray.from_number(1.5).value + 1), Ray.from_number(1))) == 1
+
+    def test_update_moves_safe(self):
+        # given
+        self.queue.update(safe(0, Wad.from_number(30), Wad.from_number(10)))
+        self.queue.update(safe(1, Wad.from_number(10), Wad.from_number(10)))
+
+        # when
+        self.queue.update(safe(0, Wad.from_number(5), Wad.from_number(10)))
+
+        # then
+        assert len(self.queue) == 2
+        assert [s.address for s in self.queue.safes()] == [address(0), address(1)]
+        assert self.queue.safes()[0].locked_collateral == Wad.from_number(5)
+
+    def test_remove_safe_without_debt(self):
+        # given
+        self.queue.update(safe(0, Wad.from_number(30), Wad.from_number(10)))
+
+        # when
+        self.queue.update(safe(0, Wad.from_number(30), Wad(0)))
+
+        # then
+        assert len(self.queue) == 0
+        assert address(0) not in self.queue
+
+    def test_remove(self):
+        # given
+        self.queue.update(safe(0, Wad.from_number(30), Wad.from_number(10)))
+        self.queue.update(safe(1, Wad.from_number(30), Wad.from_number(10)))
+
+        # when
+        self.queue.remove(address(0))
+        self.queue.remove(address(2))
+
+        # then
+        assert [s.address for s in self.queue.safes()] == [address(1)]
+
+    def test_matches_exhaustive_check(self):
+        # given
+        generator = random.Random(1)
+        safes = [safe(index, Wad(generator.randint(0, 10**22)), Wad(generator.randint(0, 10**21)))
+                 for index in range(500)]
+        queue = SafeHealthQueue.from_safes(self.collateral_type, safes)
+        for index in range(0, 500, 7):
+            safes[index] = safe(index, Wad(generator.randint(0, 10**22)), Wad(generator.randint(0, 10**21)))
+            queue.update(safes[index])
+
+        for _ in range(20):
+            accumulated_rate = Ray(generator.randint(10**27, 2 * 10**27))
+            liquidation_price = Ray(generator.randint(10**26, 10**29))
+
+            # when
+            critical = queue.critical(accumulated_rate, liquidation_price)
+
+            # then
+            expected = [s for s in safes if is_critical(s, accumulated_rate, liquidation_price)]
+            assert sorted(s.address for s in critical) == sorted(s.address for s in expected)
+
+
+class TestScreenSafes:
+    def setup_method(self):
+        self.collateral_type = CollateralType('ETH-A', accumulated_rate=Ray.from_number(1.05),
+                                              liquidation_price=Ray.from_number(150), debt_floor=Rad.from_number(100))
+        self.liquidation_quantity = Rad.from_number(50000)
+        self.liquidation_penalty = Wad.from_number(1.1)
+        self.room = Rad.from_number(1000000)
+
+    def screen(self, locked_collateral: list, generated_debt: list, room: Rad = None) -> list:
+        return screen_safes(self.collateral_type, locked_collateral, generated_debt, self.liquidation_quantity,
+                            self.liquidation_penalty, room if room is not None else self.room)
+
+    def expected(self, locked_collateral: list, generated_debt: list) -> list:
+        rate = self.collateral_type.accumulated_rate.value
+        price = self.collateral_type.liquidation_price.value
+        limit = min(self.liquidation_quantity.value, self.room.value) * 10**18 // rate // self.liquidation_penalty.value
+
+        candidates = []
+        for index, (locked, debt) in enumerate(zip(locked_collateral, generated_debt)):
+            if locked * price < debt * rate:
+                delta_debt = min(debt, limit)
+                delta_collateral = min(locked, locked * delta_debt // debt)
+                if delta_debt > 0 and delta_collateral > 0:
+                    candidates.append(LiquidationCandidate(index, Wad(delta_debt), Wad(delta_collateral)))
+        return candidates
+
+    def test_screen(self):
+        # given
+        locked_collateral = [Wad.from_number(10).value, Wad.from_number(10).value, Wad.from_number(1000).value]
+        generated_debt = [Wad.from_number(1000).value, Wad.from_number(2000).value, Wad.from_number(200000).value]
+
+        # when
+        candidates = self.screen(locked_collateral, generated_debt)
+
+        # then
+        assert [candidate.index for candidate in candidates] == [1, 2]
+        assert candidates[0].delta_debt == Wad.from_number(2000)
+        assert candidates[0].delta_collateral == Wad.from_number(10)
+        assert candidates[1].delta_debt < Wad.from_number(200000)
+        assert candidates[1].delta_collateral < Wad.from_number(1000)
+        assert candidates == self.expected(locked_collateral, generated_debt)
+
+    def test_boundary(self):
+        # given
+        rate = self.collateral_type.accumulated_rate.value
+        price = self.collateral_type.liquidation_price.value
+        debt = Wad.from_number(1000).value * price
+        locked_collateral = [debt * rate // price // price, debt * rate // price // price - 1]
+        generated_debt = [debt // price, debt // price]
+
+        # expect
+        assert self.screen(locked_collateral, generated_debt) == self.expected(locked_collateral, generated_debt)
+
+    def test_no_room(self):
+        # given
+        locked_collateral = [Wad.from_number(10).value]
+        generated_debt = [Wad.from_number(2000).value]
+
+        # expect
+        assert self.screen(locked_collateral, generated_debt, Rad(0)) == []
+        assert self.screen(locked_collateral, generated_debt, Rad.from_number(50)) == []
+        assert self.screen([], []) == []
+
+    def test_matches_exhaustive_check(self):
+        # given
+        generator = random.Random(2)
+        generated_debt = [generator.randint(0, 10**24) for _ in range(2000)]
+        locked_collateral = [debt * generator.randint(1, 2 * 10**9) // 10**11 for debt in generated_debt]
+
+        # expect
+        assert self.screen(locked_collateral, generated_debt) == self.expected(locked_collateral, generated_debt)
@@ -0,0 +1,150 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import requests
+from web3 import Web3, HTTPProvider
+
+from pyflex.logs import LogFetcher, is_too_many_results
+from pyflex.numeric import Wad
+from pyflex.token import DSToken
+from pyflex.util import bytes_to_hexstring
+
+
+def fail_with(message: str):
+    def fail_with_middleware(make_request, web3):
+        def middleware(method, params):
+            if method == 'eth_getLogs':
+                return {'error': {'code': -32000, 'message': message}}
+            return make_request(method, params)
+        return middleware
+    return fail_with_middleware
+
+
+def limit_results(max_results: int):
+    """Makes `eth_getLogs` fail the way Infura does when a query matches more than `max_results` logs."""
+    def limit_results_middleware(make_request, web3):
+        def middleware(method, params):
+            response = make_request(method, params)
+            if method == 'eth_getLogs' and len(response.get('result', [])) > max_results:
+                return {'error': {'code': -32005, 'message': f"query returned more than {max_results} results"}}
+            return response
+        return middleware
+    return limit_results_middleware
+
+
+def time_out_over(max_blocks: int):
+    """Makes `eth_getLogs` time out on queries covering more than `max_blocks` blocks."""
+    def time_out_over_middleware(make_request, web3):
+        def middleware(method, params):
+            if method == 'eth_getLogs' and int(params[0]['toBlock'], 16) - int(params[0]['fromBlock'], 16) >= max_blocks:
+                raise requests.exceptions.ReadTimeout("Read timed out. (read timeout=10)")
+            return make_request(method, params)
+        return middleware
+    return time_out_over_middleware
+
+
+class TestLogFetcher:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.token = DSToken.deploy(self.web3, 'ABC', 'ABC')
+        self.from_block = self.web3.eth.blockNumber + 1
+        for _ in range(10):
+            assert self.token.mint(Wad(1)).transact()
+        self.to_block = self.web3.eth.blockNumber
+        self.mint_topic = bytes_to_hexstring(self.web3.keccak(text="Mint(address,uint256)"))
+
+    def expected_logs(self) -> list:
+        return self.web3.eth.getLogs({'address': self.token.address.address,
+                                      'fromBlock': self.from_block,
+                                      'toBlock': self.to_block})
+
+    def test_is_too_many_results(self):
+        assert is_too_many_results(ValueError({'code': -32005, 'message': 'query returned more than 10000 results'}))
+        assert is_too_many_results(ValueError({'code': -32602, 'message': 'Log response size exceeded.'}))
+        assert is_too_many_results(ValueError({'code': -32000, 'message': 'exceed maximum block range: 5000'}))
+        assert not is_too_many_results(ValueError({'code': -32000, 'message': 'header not found'}))
+        assert not is_too_many_results(ValueError('invalid argument'))
+        assert is_too_many_results(requests.exceptions.ReadTimeout("Read timed out. (read timeout=10)"))
+
+    @pytest.mark.parametrize("chunk_size,max_workers", [(1, 1), (3, 4), (1000, 2)])
+    def test_get_logs(self, chunk_size, max_workers):
+        # given
+        log_fetcher = LogFetcher(self.web3, chunk_size=chunk_size, min_chunk_size=1, max_workers=max_workers)
+
+        # when
+        logs = log_fetcher.get_logs(self.token.address, None, self.from_block, self.to_block)
+
+        # then
+        assert logs == self.expected_logs()
+
+    def test_filter_by_topic(self):
+        # given
+        log_fetcher = LogFetcher(self.web3, chunk_size=2, min_chunk_size=1)
+
+        # when
+        logs = log_fetcher.get_logs(self.token.address, [self.mint_topic], self.from_block, self.to_block)
+
+        # then
+        assert len(logs) == 10
+        assert all(bytes_to_hexstring(log['topics'][0]) == self.mint_topic for log in logs)
+
+    def test_grow_chunk_size_on_small_responses(self):
+        # given
+        log_fetcher = LogFetcher(self.web3, chunk_size=1, min_chunk_size=1, max_workers=1)
+
+        # when
+        log_fetcher.get_logs(self.token.address, None, self.from_block, self.to_block)
+
+        # then
+        assert log_fetcher.chunk_size > 1
+
+    def test_split_range_on_too_many_results(self):
+        # given
+        expected_logs = self.expected_logs()
+        self.web3.middleware_onion.add(limit_results(3), name='limit_results')
+        log_fetcher = LogFetcher(self.web3, chunk_size=1000, min_chunk_size=1, max_workers=2)
+
+        # when
+        logs = log_fetcher.get_logs(self.token.address, None, self.from_block, self.to_block)
+
+        # then
+        assert logs == expected_logs
+        assert log_fetcher.chunk_size < 1000
+
+    def test_split_range_on_timeout(self):
+        # given
+        expected_logs = self.expected_logs()
+        self.web3.middleware_onion.add(time_out_over(2), name='time_out_over')
+        log_fetcher = LogFetcher(self.web3, chunk_size=1000, min_chunk_size=1, max_workers=2)
+
+        # when
+        logs = log_fetcher.get_logs(self.token.address, None, self.from_block, self.to_block)
+
+        # then
+        assert logs == expected_logs
+        assert log_fetcher.chunk_size < 1000
+
+    def test_fail_on_other_errors(self):
+        # given
+        self.web3.middleware_onion.add(fail_with('header not found'), name='fail_with')
+        log_fetcher = LogFetcher(self.web3, chunk_size=2, min_chunk_size=1)
+
+        # expect
+        with pytest.raises(ValueError):
+            log_fetcher.get_logs(self.token.address, None, self.from_block, self.to_block)
@@ -0,0 +1,86 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from web3 import Web3, HTTPProvider
+
+from pyflex import Address, Calldata, Invocation
+from pyflex.feed import DSValue
+from pyflex.multicall import Multicall
+
+
+class TestMulticall:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.multicall = Multicall.deploy(self.web3)
+        self.dsvalues = [DSValue.deploy(self.web3) for _ in range(5)]
+        for index, dsvalue in enumerate(self.dsvalues):
+            assert dsvalue.update_result(index + 100).transact()
+
+    def invocations(self) -> list:
+        return [Invocation(dsvalue.address, Calldata.from_signature(self.web3, "read()", []))
+                for dsvalue in self.dsvalues]
+
+    def test_fail_when_no_contract_under_that_address(self):
+        # expect
+        with pytest.raises(Exception):
+            Multicall(web3=self.web3, address=Address('0xdeadadd1e5500000000000000000000000000000'))
+
+    def test_chunks_by_number_of_calls(self):
+        # given
+        self.multicall.max_calls = 2
+
+        # when
+        chunks = self.multicall.chunks(self.invocations())
+
+        # then
+        assert list(map(len, chunks)) == [2, 2, 1]
+
+    def test_chunks_by_calldata_size(self):
+        # given
+        self.multicall.max_calldata = 50
+
+        # when
+        chunks = self.multicall.chunks(self.invocations())
+
+        # then
+        assert list(map(len, chunks)) == [2, 2, 1]
+
+    def test_aggregate_returns_results_in_order(self):
+        # given
+        self.multicall.max_calls = 2
+
+        # when
+        results = self.multicall.aggregate(self.invocations())
+
+        # then
+        assert [int.from_bytes(result, byteorder='big') for result in results] == [100, 101, 102, 103, 104]
+
+    def test_aggregate_at_pinned_block(self):
+        # given
+        block_number = self.web3.eth.blockNumber
+        assert self.dsvalues[0].update_result(200).transact()
+
+        # when
+        results = self.multicall.aggregate(self.invocations()[:1], block_identifier=block_number)
+
+        # then
+        assert int.from_bytes(results[0], byteorder='big') == 100
+
+    def test_aggregate_nothing(self):
+        assert self.multicall.aggregate([]) == []
@@ -0,0 +1,133 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest.mock import Mock
+
+from web3 import Web3
+
+from pyflex import Address, NonceCalculation, NonceManager, get_nonce_manager, nonce_calc
+
+
+def mocked_web3(nonce_calculation: NonceCalculation = NonceCalculation.TX_COUNT) -> Web3:
+    web3 = Mock(Web3)
+    web3.eth = Mock()
+    web3.eth.getTransactionCount = Mock(return_value=5)
+    nonce_calc[web3] = nonce_calculation
+    return web3
+
+
+class TestNonceManager:
+    def setup_method(self):
+        self.web3 = mocked_web3()
+        self.nonce_manager = NonceManager(self.web3, Address('0x0000000000000000000000000000000000000001'))
+
+    def test_allocates_a_burst_without_node_requests(self):
+        # when
+        nonces = [self.nonce_manager.allocate() for _ in range(20)]
+
+        # then
+        assert nonces == list(range(5, 25))
+        assert self.web3.eth.getTransactionCount.call_count == 1
+
+    def test_reconciles_when_idle(self):
+        # given
+        nonce = self.nonce_manager.allocate()
+        self.nonce_manager.finish(nonce)
+        self.web3.eth.getTransactionCount.return_value = 9
+
+        # expect
+        assert self.nonce_manager.allocate() == 9
+        assert self.web3.eth.getTransactionCount.call_count == 2
+
+    def test_reconciles_on_schedule(self):
+        # given
+        self.nonce_manager.reconcile_interval = 0
+        self.nonce_manager.allocate()
+        self.web3.eth.getTransactionCount.return_value = 9
+
+        # expect
+        assert self.nonce_manager.allocate() == 9
+
+    def test_fills_released_nonces_first(self):
+        # given
+        assert [self.nonce_manager.allocate() for _ in range(3)] == [5, 6, 7]
+
+        # when
+        self.nonce_manager.release(6)
+
+        # then
+        assert self.nonce_manager.allocate() == 6
+        assert self.nonce_manager.allocate() == 8
+
+    def test_fills_gaps_left_by_dropped_transactions(self):
+        # given
+        assert [self.nonce_manager.allocate() for _ in range(4)] == [5, 6, 7, 8]
+
+        # when the transaction with nonce 6 gets dropped
+        self.nonce_manager.finish(6)
+        self.web3.eth.getTransactionCount.return_value = 6
+        self.nonce_manager.reconcile()
+
+        # then
+        assert self.nonce_manager.allocate() == 6
+        assert self.nonce_manager.allocate() == 9
+
+    def test_rewinds_when_the_most_recent_transactions_got_dropped(self):
+        # given
+        assert [self.nonce_manager.allocate() for _ in range(4)] == [5, 6, 7, 8]
+
+        # when
+        self.nonce_manager.finish(7)
+        self.nonce_manager.finish(8)
+        self.web3.eth.getTransactionCount.return_value = 7
+        self.nonce_manager.reconcile()
+
+        # then
+        assert self.nonce_manager.allocate() == 7
+        assert self.nonce_manager.allocate() == 8
+
+    def test_does_not_look_for_gaps_with_serial_nonces(self):
+        # given
+        web3 = mocked_web3(NonceCalculation.SERIAL)
+        nonce_manager = NonceManager(web3, Address('0x0000000000000000000000000000000000000001'))
+        assert [nonce_manager.allocate() for _ in range(3)] == [5, 6, 7]
+
+        # when
+        nonce_manager.finish(6)
+        nonce_manager.reconcile()
+
+        # then
+        assert nonce_manager.allocate() == 8
+
+    def test_catches_up_with_transactions_sent_elsewhere(self):
+        # given
+        assert self.nonce_manager.allocate() == 5
+
+        # when
+        self.web3.eth.getTransactionCount.return_value = 12
+        self.nonce_manager.reconcile()
+
+        # then
+        assert self.nonce_manager.allocate() == 12
+
+    def test_one_manager_per_account(self):
+        first = Address('0x0000000000000000000000000000000000000001')
+        second = Address('0x0000000000000000000000000000000000000002')
+
+        assert get_nonce_manager(self.web3, first) is get_nonce_manager(self.web3, first)
+        assert get_nonce_manager(self.web3, first) is not get_nonce_manager(self.web3, second)
+        assert get_nonce_manager(self.web3, first) is not get_nonce_manager(mocked_web3(), first)
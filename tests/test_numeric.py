@@ -15,9 +15,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import random
+from decimal import Context, Decimal, ROUND_DOWN, localcontext
+
 import pytest
 
-from pyflex.numeric import Wad, Ray, Rad
+from pyflex.numeric import Wad, Ray, Rad, WadArray, RayArray, RadArray
 from tests.helpers import is_hashable
 
 
@@ -708,3 +711,175 @@ class TestRad:
         assert round(Rad.from_number(123.4567), 2) == Rad.from_number(123.46)
         assert round(Rad.from_number(123.4567), 0) == Rad.from_number(123.0)
         assert round(Rad.from_number(123.4567), -2) == Rad.from_number(100.0)
+
+
+class TestIntegerArithmetic:
+    """Checks the integer arithmetic against the `Decimal` arithmetic it replaced, for random operands.
+
+    The `Decimal` expressions are evaluated with enough precision to be exact, the results being truncated.
+    """
+
+    context = Context(prec=1000, rounding=ROUND_DOWN)
+    scales = {Wad: 18, Ray: 27, Rad: 45}
+
+    @staticmethod
+    def operands(count: int = 500):
+        generator = random.Random(42)
+        for _ in range(count):
+            yield tuple(generator.randint(-10**digits, 10**digits)
+                        for digits in (generator.choice([0, 9, 18, 27, 36, 45, 60, 77]) for _ in range(2)))
+
+    def reference(self, expression) -> int:
+        with localcontext(self.context):
+            return int(expression().quantize(1, context=self.context))
+
+    @pytest.mark.parametrize('left', [Wad, Ray, Rad])
+    @pytest.mark.parametrize('right', [Wad, Ray, Rad])
+    def test_multiply(self, left, right):
+        for x, y in self.operands():
+            expected = self.reference(lambda: Decimal(x) * Decimal(y) / (Decimal(10) ** self.scales[right]))
+            assert (left(x) * right(y)).value == expected
+
+    @pytest.mark.parametrize('cls', [Wad, Ray, Rad])
+    def test_multiply_by_int(self, cls):
+        for x, y in self.operands():
+            assert (cls(x) * y).value == self.reference(lambda: Decimal(x) * Decimal(y))
+
+    @pytest.mark.parametrize('cls', [Wad, Ray, Rad])
+    def test_divide(self, cls):
+        for x, y in self.operands():
+            if y != 0:
+                expected = self.reference(lambda: Decimal(x) * (Decimal(10) ** self.scales[cls]) / Decimal(y))
+                assert (cls(x) / cls(y)).value == expected
+
+    @pytest.mark.parametrize('source', [Wad, Ray, Rad])
+    @pytest.mark.parametrize('target', [Wad, Ray, Rad])
+    def test_convert(self, source, target):
+        for x, _ in self.operands():
+            expected = self.reference(lambda: Decimal(x) * (Decimal(10) ** self.scales[target])
+                                      / (Decimal(10) ** self.scales[source]))
+            assert target(source(x)).value == expected
+
+    @pytest.mark.parametrize('cls', [Wad, Ray, Rad])
+    def test_cast_to_int(self, cls):
+        for x, _ in self.operands():
+            assert int(cls(x)) == self.reference(lambda: Decimal(x) / (Decimal(10) ** self.scales[cls]))
+
+    @pytest.mark.parametrize('cls', [Wad, Ray, Rad])
+    def test_from_number(self, cls):
+        for number in [0, 1, -1, 0.1, -4.5, 1.9999999999, 123456789.123456789, "0.000000000000000000123",
+                       "-98765432109876543210.98765432109876543210", Decimal("1e-50"), 2**100]:
+            expected = self.reference(lambda: Decimal(str(number)) * Decimal(10) ** self.scales[cls])
+            assert cls.from_number(number).value == expected
+
+    def test_divide_by_zero(self):
+        with pytest.raises(ZeroDivisionError):
+            Wad(1) / Wad(0)
+        with pytest.raises(ZeroDivisionError):
+            Ray(0) / Ray(0)
+
+    def test_should_not_have_instance_dict(self):
+        for value in [Wad(1), Ray(1), Rad(1)]:
+            with pytest.raises(AttributeError):
+                value.other = 1
+
+
+class TestFixedPointArrays:
+    arrays = {Wad: WadArray, Ray: RayArray, Rad: RadArray}
+
+    @staticmethod
+    def operands():
+        return list(zip(*TestIntegerArithmetic.operands(200)))
+
+    def test_should_instantiate_from_values_and_ints(self):
+        array = WadArray([Wad(1), 2, Wad.from_number(3)])
+        assert array.to_list() == [Wad(1), Wad(2), Wad.from_number(3)]
+        assert len(array) == 3
+        assert list(array) == array.to_list()
+        assert repr(array) == "WadArray([1, 2, 3000000000000000000])"
+
+    def test_should_fail_to_instantiate_from_other_types(self):
+        with pytest.raises(ArithmeticError):
+            WadArray([Wad(1), Ray(2)])
+        with pytest.raises(ArithmeticError):
+            WadArray([1.5])
+
+    def test_should_index(self):
+        array = RayArray([1, 2, 3])
+        assert array[1] == Ray(2)
+        assert array[-1] == Ray(3)
+        assert array[1:].to_list() == [Ray(2), Ray(3)]
+        assert array[array > Ray(1)].to_list() == [Ray(2), Ray(3)]
+
+    @pytest.mark.parametrize('source', [Wad, Ray, Rad])
+    @pytest.mark.parametrize('target', [Wad, Ray, Rad])
+    def test_convert(self, source, target):
+        x, _ = self.operands()
+        assert self.arrays[target](self.arrays[source](x)).to_list() == [target(source(value)) for value in x]
+
+    @pytest.mark.parametrize('cls', [Wad, Ray, Rad])
+    def test_add_and_subtract(self, cls):
+        x, y = self.operands()
+        array = self.arrays[cls]
+        assert (array(x) + array(y)).to_list() == [cls(a) + cls(b) for a, b in zip(x, y)]
+        assert (array(x) - array(y)).to_list() == [cls(a) - cls(b) for a, b in zip(x, y)]
+        assert (array(x) - cls(y[0])).to_list() == [cls(a) - cls(y[0]) for a in x]
+
+    @pytest.mark.parametrize('left', [Wad, Ray, Rad])
+    @pytest.mark.parametrize('right', [Wad, Ray, Rad])
+    def test_multiply(self, left, right):
+        x, y = self.operands()
+        expected = [left(a) * right(b) for a, b in zip(x, y)]
+        assert (self.arrays[left](x) * self.arrays[right](y)).to_list() == expected
+        assert (self.arrays[left](x) * right(y[0])).to_list() == [left(a) * right(y[0]) for a in x]
+
+    def test_multiply_by_int(self):
+        x, y = self.operands()
+        assert (WadArray(x) * 3).to_list() == [Wad(a) * 3 for a in x]
+        assert (3 * WadArray(x)).to_list() == [Wad(a) * 3 for a in x]
+
+    @pytest.mark.parametrize('cls', [Wad, Ray, Rad])
+    def test_divide(self, cls):
+        x, y = self.operands()
+        y = [b or 1 for b in y]
+        array = self.arrays[cls]
+        assert (array(x) / array(y)).to_list() == [cls(a) / cls(b) for a, b in zip(x, y)]
+        assert (array(x) / cls(y[0])).to_list() == [cls(a) / cls(y[0]) for a in x]
+
+    def test_should_fail_to_divide_by_zero(self):
+        with pytest.raises(ZeroDivisionError):
+            WadArray([1, 2]) / WadArray([1, 0])
+
+    def test_should_fail_to_mix_types(self):
+        with pytest.raises(ArithmeticError):
+            WadArray([1]) + RayArray([1])
+        with pytest.raises(ArithmeticError):
+            WadArray([1]) / Ray(1)
+        with pytest.raises(ArithmeticError):
+            WadArray([1]) < Rad(1)
+        with pytest.raises(ArithmeticError):
+            WadArray([1]) * 1.5
+
+    def test_compare(self):
+        x, y = self.operands()
+        assert list(WadArray(x) < WadArray(y)) == [a < b for a, b in zip(x, y)]
+        assert list(WadArray(x) >= Wad(0)) == [a >= 0 for a in x]
+        assert list(WadArray(x) == WadArray(x)) == [True] * len(x)
+
+    def test_minimum_and_maximum(self):
+        x, y = self.operands()
+        assert WadArray(x).minimum(WadArray(y)).to_list() == [Wad.min(Wad(a), Wad(b)) for a, b in zip(x, y)]
+        assert WadArray(x).maximum(Wad(0)).to_list() == [Wad.max(Wad(a), Wad(0)) for a in x]
+
+    def test_reductions(self):
+        x, _ = self.operands()
+        assert WadArray(x).sum() == Wad(sum(x))
+        assert WadArray(x).min() == Wad(min(x))
+        assert WadArray(x).max() == Wad(max(x))
+        assert WadArray([]).sum() == Wad(0)
+
+    def test_abs(self):
+        assert abs(RadArray([-1, 0, 1])).to_list() == [Rad(1), Rad(0), Rad(1)]
+
+    def test_should_not_be_hashable(self):
+        assert not is_hashable(WadArray([1]))
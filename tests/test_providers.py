@@ -0,0 +1,290 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+import websockets
+
+from pyflex import web3_via_http, web3_via_websocket
+from pyflex.providers import BatchingHTTPProvider, MultiplexingWebsocketProvider
+
+
+class MockedNode:
+    """Answers JSON-RPC requests with their params, or with an error for `params == ['fail']`."""
+
+    def __init__(self, supports_batches: bool = True):
+        self.supports_batches = supports_batches
+        self.posts = []
+
+    def answer(self, request: dict) -> dict:
+        if request['params'] == ['fail']:
+            return {"jsonrpc": "2.0", "id": request['id'], "error": {"code": -32000, "message": "execution reverted"}}
+        return {"jsonrpc": "2.0", "id": request['id'], "result": request['params']}
+
+    def make_post_request(self, endpoint_uri, data, **kwargs):
+        request = json.loads(data)
+        self.posts.append(request)
+        if isinstance(request, list):
+            if not self.supports_batches:
+                return json.dumps({"jsonrpc": "2.0", "id": None,
+                                   "error": {"code": -32600, "message": "batch requests not supported"}}).encode()
+            # Responses to a batch may come back in any order
+            return json.dumps([self.answer(r) for r in reversed(request)]).encode()
+        return json.dumps(self.answer(request)).encode()
+
+
+@pytest.fixture
+def node():
+    node = MockedNode()
+    with patch('pyflex.providers.make_post_request', side_effect=node.make_post_request), \
+            patch('web3.providers.rpc.make_post_request', side_effect=node.make_post_request):
+        yield node
+
+
+def make_requests(provider: BatchingHTTPProvider, requests: list) -> list:
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        return list(executor.map(lambda request: provider.make_request(*request), requests))
+
+
+class TestBatchingHTTPProvider:
+    def test_coalesces_concurrent_requests(self, node):
+        # given
+        provider = BatchingHTTPProvider('http://localhost:8545', flush_interval=0.1)
+
+        # when
+        responses = make_requests(provider, [('eth_call', [i]) for i in range(10)])
+
+        # then
+        assert [response['result'] for response in responses] == [[i] for i in range(10)]
+        assert len(node.posts) == 1
+        assert len(node.posts[0]) == 10
+
+    def test_splits_batches_at_max_batch_size(self, node):
+        # given
+        provider = BatchingHTTPProvider('http://localhost:8545', max_batch_size=4, flush_interval=0.1)
+
+        # when
+        responses = make_requests(provider, [('eth_getLogs', [i]) for i in range(10)])
+
+        # then
+        assert [response['result'] for response in responses] == [[i] for i in range(10)]
+        assert all(len(post) <= 4 for post in node.posts if isinstance(post, list))
+        assert sum(len(post) if isinstance(post, list) else 1 for post in node.posts) == 10
+
+    def test_splits_errors_per_request(self, node):
+        # given
+        provider = BatchingHTTPProvider('http://localhost:8545', flush_interval=0.1)
+
+        # when
+        responses = make_requests(provider, [('eth_call', [1]), ('eth_call', ['fail']), ('eth_call', [3])])
+
+        # then
+        assert responses[0]['result'] == [1]
+        assert responses[1]['error']['message'] == "execution reverted"
+        assert responses[2]['result'] == [3]
+
+    def test_does_not_batch_other_methods(self, node):
+        # given
+        provider = BatchingHTTPProvider('http://localhost:8545', flush_interval=0.1)
+
+        # when
+        make_requests(provider, [('eth_sendRawTransaction', [i]) for i in range(3)])
+
+        # then
+        assert len(node.posts) == 3
+        assert all(isinstance(post, dict) for post in node.posts)
+
+    def test_falls_back_to_single_requests(self, node):
+        # given
+        node.supports_batches = False
+        provider = BatchingHTTPProvider('http://localhost:8545', flush_interval=0.1)
+
+        # when
+        responses = make_requests(provider, [('eth_call', [i]) for i in range(3)])
+
+        # then
+        assert [response['result'] for response in responses] == [[i] for i in range(3)]
+        assert isinstance(node.posts[0], list)
+        assert len(node.posts) == 4
+
+    def test_propagates_transport_errors(self, node):
+        # given
+        provider = BatchingHTTPProvider('http://localhost:8545', flush_interval=0.1)
+
+        # when
+        with patch('pyflex.providers.make_post_request', side_effect=ConnectionError("connection refused")):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(provider.make_request, 'eth_call', [i]) for i in range(2)]
+
+                # then
+                for future in futures:
+                    with pytest.raises(ConnectionError):
+                        future.result()
+
+    def test_web3_via_http(self):
+        assert isinstance(web3_via_http('http://localhost:8545', max_batch_size=10).provider, BatchingHTTPProvider)
+        assert not isinstance(web3_via_http('http://localhost:8545').provider, BatchingHTTPProvider)
+
+
+class MockedWebsocketNode:
+    """Answers each JSON-RPC request with its params after `params[0]` seconds, so responses can come out of order.
+
+    Also answers the requests `Lifecycle` makes, and pushes `newHeads` notifications on `mine()`.
+    """
+
+    RESULTS = {'web3_clientVersion': "TestRPC", 'eth_syncing': False, 'eth_subscribe': "0x1", 'eth_unsubscribe': True}
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self.subscribers = []
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(websockets.serve(self.handler, 'localhost', 0, loop=self.loop))
+        self.endpoint_uri = f"ws://localhost:{self.server.sockets[0].getsockname()[1]}"
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    async def handler(self, websocket, path):
+        self.connections += 1
+        async for message in websocket:
+            asyncio.ensure_future(self.answer(websocket, json.loads(message)))
+
+    async def answer(self, websocket, request: dict):
+        if request['method'] in self.RESULTS:
+            if request['method'] == 'eth_subscribe':
+                self.subscribers.append(websocket)
+            await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request['id'],
+                                             "result": self.RESULTS[request['method']]}))
+            return
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(request['params'][0])
+        self.in_flight -= 1
+        await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request['id'], "result": request['params']}))
+
+    def mine(self, block_number: int):
+        head = {"number": hex(block_number), "hash": "0x" + f"{block_number:064x}", "timestamp": hex(1600000000)}
+
+        async def notify():
+            for websocket in self.subscribers:
+                await websocket.send(json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                                                 "params": {"subscription": "0x1", "result": head}}))
+
+        asyncio.run_coroutine_threadsafe(notify(), self.loop).result()
+
+    def stop(self):
+        async def close():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+@pytest.fixture
+def websocket_node():
+    node = MockedWebsocketNode()
+    yield node
+    node.stop()
+
+
+class TestMultiplexingWebsocketProvider:
+    def test_keeps_requests_in_flight_on_one_connection(self, websocket_node):
+        # given
+        provider = MultiplexingWebsocketProvider(websocket_node.endpoint_uri)
+
+        # when
+        responses = make_requests(provider, [('eth_call', [0.5 - i * 0.05]) for i in range(10)])
+
+        # then
+        assert [response['result'] for response in responses] == [[0.5 - i * 0.05] for i in range(10)]
+        assert websocket_node.max_in_flight == 10
+        assert websocket_node.connections == 1
+
+    def test_limits_concurrency(self, websocket_node):
+        # given
+        provider = MultiplexingWebsocketProvider(websocket_node.endpoint_uri, max_concurrency=3)
+
+        # when
+        make_requests(provider, [('eth_call', [0.05]) for _ in range(10)])
+
+        # then
+        assert websocket_node.max_in_flight == 3
+
+    def test_times_out(self, websocket_node):
+        # given
+        provider = MultiplexingWebsocketProvider(websocket_node.endpoint_uri, timeout=0.1)
+
+        # expect
+        with pytest.raises(asyncio.TimeoutError):
+            provider.make_request('eth_call', [1])
+        assert provider.make_request('eth_call', [0])['result'] == [0]
+
+    def test_reconnects(self, websocket_node):
+        # given
+        provider = MultiplexingWebsocketProvider(websocket_node.endpoint_uri)
+        assert provider.make_request('eth_call', [0])['result'] == [0]
+
+        # when
+        provider.disconnect()
+
+        # then
+        assert provider.make_request('eth_call', [0])['result'] == [0]
+        assert websocket_node.connections == 2
+
+    def test_make_request_async(self, websocket_node):
+        # given
+        provider = MultiplexingWebsocketProvider(websocket_node.endpoint_uri)
+
+        # when
+        async def requests():
+            return await asyncio.gather(*[provider.make_request_async('eth_call', [0.1]) for _ in range(5)])
+
+        # then
+        assert [response['result'] for response in asyncio.run(requests())] == [[0.1]] * 5
+
+    def test_subscribe(self, websocket_node):
+        # given
+        provider = MultiplexingWebsocketProvider(websocket_node.endpoint_uri)
+        heads = queue.Queue()
+
+        # when
+        assert provider.subscribe(['newHeads'], heads.put) == "0x1"
+        websocket_node.mine(1)
+        websocket_node.mine(2)
+
+        # then
+        assert heads.get(timeout=5)['number'] == "0x1"
+        assert heads.get(timeout=5)['number'] == "0x2"
+
+        # when
+        provider.disconnect()
+
+        # then
+        assert heads.get(timeout=5) is None
+
+    def test_web3_via_websocket(self):
+        assert isinstance(web3_via_websocket('ws://localhost:8546').provider, MultiplexingWebsocketProvider)
+        with pytest.raises(ValueError):
+            web3_via_websocket('http://localhost:8545')
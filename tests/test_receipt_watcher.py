@@ -0,0 +1,154 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from unittest.mock import Mock
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from pyflex import Address, ReceiptWatcher
+
+
+SENDER = Address('0x0000000000000000000000000000000000000001')
+OTHER = Address('0x0000000000000000000000000000000000000002')
+
+
+class MockedChain:
+    def __init__(self):
+        self.fork = 0
+        self.blocks = [{'number': 0, 'hash': self.block_hash(0), 'parentHash': HexBytes(bytes(32)), 'transactions': []}]
+        self.web3 = Mock(Web3)
+        self.web3.eth = Mock()
+        type(self.web3.eth).blockNumber = property(lambda eth: len(self.blocks) - 1)
+        self.web3.eth.getBlock = Mock(side_effect=lambda number, full_transactions: self.blocks[number])
+
+    def block_hash(self, number: int) -> HexBytes:
+        return HexBytes(bytes([self.fork]) + number.to_bytes(31, 'big'))
+
+    def mine(self, *transactions):
+        number = len(self.blocks)
+        self.blocks.append({'number': number,
+                            'hash': self.block_hash(number),
+                            'parentHash': self.blocks[-1]['hash'],
+                            'transactions': [{'from': address.address, 'nonce': nonce, 'hash': HexBytes(tx_hash)}
+                                             for address, nonce, tx_hash in transactions]})
+
+    def reorg(self, depth: int):
+        """Drops the `depth` most recent blocks, so that blocks mined next have different hashes."""
+        self.fork += 1
+        del self.blocks[-depth:]
+
+
+def wait_for(condition, timeout: float = 5.0):
+    started = time.time()
+    while not condition():
+        assert time.time() - started < timeout
+        time.sleep(0.01)
+
+
+class TestReceiptWatcher:
+    def setup_method(self):
+        self.chain = MockedChain()
+        self.receipt_watcher = ReceiptWatcher(self.chain.web3, poll_interval=0.01)
+
+    def test_finds_mined_transactions(self):
+        # given
+        self.receipt_watcher.watch(SENDER, 1)
+        self.receipt_watcher.watch(SENDER, 2)
+
+        # when
+        self.chain.mine((OTHER, 1, '0x01'), (SENDER, 1, '0x02'))
+
+        # then
+        wait_for(lambda: self.receipt_watcher.mined(SENDER, 1) is not None)
+        assert self.receipt_watcher.mined(SENDER, 1) == '0x02'
+        assert self.receipt_watcher.mined(SENDER, 2) is None
+
+    def test_reads_each_block_once(self):
+        # given
+        self.receipt_watcher.watch(SENDER, 1)
+
+        # when
+        for _ in range(3):
+            self.chain.mine((OTHER, 1, '0x01'))
+        self.chain.mine((SENDER, 1, '0x02'))
+
+        # then
+        wait_for(lambda: self.receipt_watcher.mined(SENDER, 1) is not None)
+        assert [call[0][0] for call in self.chain.web3.eth.getBlock.call_args_list] == [1, 2, 3, 4]
+
+    def test_stops_when_nothing_is_watched(self):
+        # given
+        self.receipt_watcher.watch(SENDER, 1)
+        self.receipt_watcher.watch(SENDER, 1)
+
+        # when
+        self.receipt_watcher.unwatch(SENDER, 1)
+        self.chain.mine((SENDER, 1, '0x02'))
+
+        # then
+        wait_for(lambda: self.receipt_watcher.mined(SENDER, 1) is not None)
+
+        # when
+        self.receipt_watcher.unwatch(SENDER, 1)
+
+        # then
+        wait_for(lambda: self.receipt_watcher.last_block is None)
+        assert self.receipt_watcher.mined(SENDER, 1) is None
+
+    def test_reads_reorganized_blocks_again(self):
+        # given
+        self.receipt_watcher.watch(SENDER, 1)
+        self.chain.mine((SENDER, 1, '0x02'))
+        wait_for(lambda: self.receipt_watcher.mined(SENDER, 1) is not None)
+
+        # when
+        self.chain.reorg(1)
+        self.chain.mine((SENDER, 1, '0x03'))
+        self.chain.mine()
+
+        # then
+        wait_for(lambda: self.receipt_watcher.mined(SENDER, 1) == '0x03')
+        wait_for(lambda: self.receipt_watcher.last_block == 2)
+
+    def test_forgets_transactions_of_reorganized_blocks(self):
+        # given
+        self.receipt_watcher.watch(SENDER, 1)
+        self.chain.mine((SENDER, 1, '0x02'))
+        wait_for(lambda: self.receipt_watcher.mined(SENDER, 1) is not None)
+
+        # when
+        self.chain.reorg(1)
+        self.chain.mine()
+        self.chain.mine()
+
+        # then
+        wait_for(lambda: self.receipt_watcher.last_block == 2)
+        assert self.receipt_watcher.mined(SENDER, 1) is None
+
+    def test_counts_read_errors(self):
+        # given
+        self.chain.web3.eth.getBlock.side_effect = ValueError("header not found")
+        self.receipt_watcher.watch(SENDER, 1)
+
+        # when
+        self.chain.mine((SENDER, 1, '0x02'))
+
+        # then
+        wait_for(lambda: self.receipt_watcher.read_errors > 0)
+        assert self.receipt_watcher.mined(SENDER, 1) is None
@@ -0,0 +1,124 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from pyflex import Address, web3_via_http
+from pyflex.providers import BatchingHTTPProvider
+from pyflex.replay import RecordingProvider, ReplayProvider, ReplayServer, load_recording
+
+
+class MockedProvider(BaseProvider):
+    """Answers `eth_blockNumber` with an increasing block number, and `eth_getBalance` with a fixed balance."""
+
+    def __init__(self):
+        self.block_number = 100
+
+    def make_request(self, method, params):
+        if method == 'eth_blockNumber':
+            self.block_number += 1
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.block_number)}
+        if method == 'eth_getBalance':
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(10**18)}
+        return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32601, "message": "method not found"}}
+
+    def isConnected(self):
+        return True
+
+
+ADDRESS = Address('0x0000000000000000000000000000000000000001')
+
+
+def take_recording(path) -> list:
+    web3 = Web3(RecordingProvider(MockedProvider()))
+    web3.eth.blockNumber
+    web3.eth.blockNumber
+    web3.eth.getBalance(ADDRESS.address)
+    web3.provider.save(str(path))
+    return load_recording(str(path))
+
+
+def replay(web3: Web3):
+    return [web3.eth.blockNumber, web3.eth.blockNumber, web3.eth.blockNumber, web3.eth.getBalance(ADDRESS.address)]
+
+
+class TestRecordingProvider:
+    def test_records_requests_and_responses(self, tmpdir):
+        # when
+        recording = take_recording(tmpdir.join("recording.json"))
+
+        # then
+        assert [entry['method'] for entry in recording] == ['eth_blockNumber', 'eth_blockNumber', 'eth_getBalance']
+        assert recording[0]['response']['result'] == hex(101)
+        assert recording[2]['params'] == [ADDRESS.address, 'latest']
+
+
+class TestReplayProvider:
+    def test_replays_responses_in_recorded_order(self, tmpdir):
+        # given
+        web3 = Web3(ReplayProvider(take_recording(tmpdir.join("recording.json"))))
+
+        # expect
+        assert replay(web3) == [101, 102, 102, 10**18]
+
+    def test_answers_unrecorded_requests_with_an_error(self, tmpdir):
+        # given
+        provider = ReplayProvider(take_recording(tmpdir.join("recording.json")))
+
+        # when
+        response = provider.make_request('eth_gasPrice', [])
+
+        # then
+        assert response['error']['code'] == -32601
+        assert provider.responses.unanswered == ['["eth_gasPrice", []]']
+
+    def test_latency(self, tmpdir):
+        # given
+        web3 = Web3(ReplayProvider(take_recording(tmpdir.join("recording.json")), latency=0.05))
+
+        # when
+        started = time.perf_counter()
+        replay(web3)
+
+        # then
+        assert time.perf_counter() - started >= 4 * 0.05
+
+
+class TestReplayServer:
+    def test_replays_responses_over_http(self, tmpdir):
+        # given
+        with ReplayServer(take_recording(tmpdir.join("recording.json"))) as server:
+            # expect
+            assert replay(web3_via_http(server.endpoint_uri)) == [101, 102, 102, 10**18]
+
+    def test_replays_batches(self, tmpdir):
+        # given
+        with ReplayServer(take_recording(tmpdir.join("recording.json")), latency=0.05) as server:
+            provider = BatchingHTTPProvider(server.endpoint_uri, flush_interval=0.1)
+            requests = [('eth_getBalance', [ADDRESS.address, 'latest'])] * 3 + [('eth_getCode', [ADDRESS.address])]
+
+            # when
+            with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+                responses = list(executor.map(lambda request: provider.make_request(*request), requests))
+
+            # then
+            assert [response.get('result') for response in responses] == [hex(10**18)] * 3 + [None]
+            assert responses[3]['error']['code'] == -32601
@@ -0,0 +1,98 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2021 Reflexer Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyflex.deployment import GfDeployment
+from pyflex.eventindex import EventIndex
+from pyflex.numeric import Wad
+from pyflex.safeindex import SafeIndex
+from tests.test_gf import wrap_eth, cleanup_safe
+
+
+class TestSafeIndex:
+    def assert_matches_chain(self, geb: GfDeployment, safe_index: SafeIndex):
+        assert len(safe_index) > 0
+        for safe in safe_index.safes():
+            on_chain = geb.safe_engine.safe(safe.collateral_type, safe.address)
+            assert safe.locked_collateral == on_chain.locked_collateral
+            assert safe.generated_debt == on_chain.generated_debt
+
+    def test_fail_when_not_seeded(self, geb):
+        # expect
+        with pytest.raises(Exception):
+            SafeIndex(geb.safe_engine).sync()
+
+    def test_seed_and_sync(self, geb, our_address, other_address):
+        # given
+        collateral = geb.collaterals['ETH-B']
+        collateral_type = collateral.collateral_type
+        safe_index = SafeIndex(geb.safe_engine)
+        safe_index.seed(geb.starting_block_number)
+
+        try:
+            # when
+            wrap_eth(geb, our_address, Wad.from_number(20))
+            collateral.approve(our_address)
+            assert collateral.adapter.join(our_address, Wad.from_number(20)).transact()
+            assert geb.safe_engine.modify_safe_collateralization(collateral_type, our_address,
+                                                                 Wad.from_number(20), Wad(0)).transact()
+            assert geb.safe_engine.modify_safe_collateralization(collateral_type, our_address,
+                                                                 Wad.from_number(-5), Wad(0)).transact()
+            safe_index.sync()
+
+            # then
+            assert safe_index.last_block == geb.web3.eth.blockNumber
+            assert safe_index.safe(collateral_type, our_address).locked_collateral == Wad.from_number(15)
+            assert safe_index.safe(collateral_type, other_address) is None
+            assert our_address in [safe.address for safe in safe_index.safes(collateral_type)]
+            self.assert_matches_chain(geb, safe_index)
+
+        finally:
+            cleanup_safe(geb, collateral, our_address)
+
+        # when
+        safe_index.sync()
+
+        # then
+        assert safe_index.safe(collateral_type, our_address) is None
+
+    def test_seed_from_index(self, geb, our_address):
+        # given
+        collateral = geb.collaterals['ETH-C']
+        collateral_type = collateral.collateral_type
+
+        try:
+            wrap_eth(geb, our_address, Wad.from_number(10))
+            collateral.approve(our_address)
+            assert collateral.adapter.join(our_address, Wad.from_number(10)).transact()
+            assert geb.safe_engine.modify_safe_collateralization(collateral_type, our_address,
+                                                                 Wad.from_number(10), Wad(0)).transact()
+            event_index = EventIndex.for_deployment(geb, ":memory:")
+            event_index.sync()
+
+            # when
+            safe_index = SafeIndex(geb.safe_engine)
+            safe_index.seed_from_index(event_index)
+
+            # then
+            assert safe_index.last_block == event_index.last_block()
+            assert safe_index.safe(collateral_type, our_address).locked_collateral == Wad.from_number(10)
+            self.assert_matches_chain(geb, safe_index)
+
+        finally:
+            cleanup_safe(geb, collateral, our_address)
@@ -131,6 +131,20 @@ class TestERC20Token:
         assert receipt.transfers[0].to_address == self.second_address
         assert receipt.transfers[0].value == Wad(500)
 
+    def test_transfer_events(self):
+        # given
+        other_token = DSToken.deploy(self.web3, 'DEF', 'DEF')
+
+        # when
+        receipt = self.token.transfer(self.second_address, Wad(500)).transact()
+
+        # then
+        events = receipt.events(self.token)
+        assert [event['event'] for event in events] == ['Transfer']
+        assert events[0]['args']['wad'] == 500
+        assert receipt.events(ERC20Token)[0]['address'] == self.token.address.address
+        assert receipt.events(other_token) == []
+
     def test_transfer_from(self):
         # given
         self.token.approve(self.second_address).transact()
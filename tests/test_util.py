@@ -23,7 +23,7 @@ import pytest
 from web3 import Web3
 
 from pyflex import Address
-from pyflex.util import synchronize, int_to_bytes32, bytes_to_int, bytes_to_hexstring, hexstring_to_bytes, \
+from pyflex.util import synchronize, run_blocking, int_to_bytes32, bytes_to_int, bytes_to_hexstring, hexstring_to_bytes, \
     AsyncCallback, chain
 
 
@@ -36,6 +36,10 @@ async def async_exception():
     raise Exception("Exception to be passed further down")
 
 
+async def async_loop():
+    return asyncio.get_event_loop()
+
+
 def mocked_web3(block_0_hash: str) -> Web3:
     def side_effect(block_number):
         if block_number == 0:
@@ -120,6 +124,40 @@ def test_synchronize_should_pass_exceptions():
         synchronize([async_return(1), async_exception(), async_return(3)])
 
 
+def test_synchronize_should_reuse_the_event_loop():
+    loop = synchronize([async_loop()])[0]
+    assert loop.is_running()
+    assert synchronize([async_loop()])[0] is loop
+
+
+def test_synchronize_should_work_within_a_running_event_loop():
+    async def nested():
+        return synchronize([async_return(1), async_return(2)])
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(nested()) == [1, 2]
+    finally:
+        loop.close()
+
+
+def test_synchronize_should_not_deadlock_on_its_own_event_loop():
+    async def nested():
+        return synchronize([async_return(1)])
+
+    with pytest.raises(RuntimeError):
+        synchronize([nested()])
+
+
+def test_run_blocking_should_not_block_the_event_loop():
+    async def sleep_concurrently():
+        started = time.time()
+        await asyncio.gather(*[run_blocking(time.sleep, 0.5) for _ in range(8)])
+        return time.time() - started
+
+    assert synchronize([sleep_concurrently()])[0] < 2
+
+
 def test_int_to_bytes32():
     assert int_to_bytes32(0) == bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
                                        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
@@ -0,0 +1,161 @@
+""" Measure the speed and allocations of pyflex.numeric, to catch regressions in the types every keeper loop uses
+
+Each benchmark reports operations per second, and the memory blocks and bytes allocated per operation and still
+held once it returns, i.e. by its result. The report can be written as json and compared with one of an earlier
+commit.
+
+    python utils/benchmark_numeric.py --output baseline.json
+    # ... change pyflex.numeric ...
+    python utils/benchmark_numeric.py --compare baseline.json
+
+Only the benchmarks whose name contains one of the `--filter` arguments are run, e.g. `--filter mul can_liquidate`.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from pyflex.numeric import Wad, Ray, Rad, WadArray, RayArray
+
+locked_collateral = Wad.from_number(153.123456789012345678)
+generated_debt = Wad.from_number(41234.567890123456789012)
+liquidation_price = Ray.from_number(279.123456789012345678901234567)
+accumulated_rate = Ray.from_number(1.023456789012345678901234567)
+liquidation_quantity = Rad.from_number(90000)
+liquidation_penalty = Wad.from_number(1.1)
+room = Rad.from_number(1234567.123456789)
+
+wad, other_wad = Wad.from_number(1234.5678), Wad.from_number(0.987654321)
+ray, other_ray = Ray.from_number(1.000000001234), Ray.from_number(279.12)
+rad, other_rad = Rad.from_number(98765.4321), Rad.from_number(1.5)
+
+generator = random.Random(42)
+wads = [Wad(generator.randint(0, 10**24)) for _ in range(1000)]
+wad_keys = {value: index for index, value in enumerate(wads)}
+wad_set = set(wads)
+locked_array = WadArray(wads)
+debt_array = WadArray(reversed(wads))
+
+
+def is_critical():
+    return Ray(locked_collateral) * liquidation_price < Ray(generated_debt) * accumulated_rate
+
+
+def delta_collateral():
+    # As in `LiquidationEngine.can_liquidate`
+    delta_debt = min(generated_debt, Wad(min(liquidation_quantity, room) / Rad(accumulated_rate)
+                                         / Rad(liquidation_penalty)))
+    return min(locked_collateral, locked_collateral * delta_debt / generated_debt)
+
+
+BENCHMARKS = {
+    "construct.wad_from_int": lambda: Wad(1234567890123456789),
+    "construct.wad_from_number_int": lambda: Wad.from_number(1234),
+    "construct.wad_from_number_float": lambda: Wad.from_number(1234.5678),
+    "construct.wad_from_number_str": lambda: Wad.from_number("1234.567890123456789"),
+    "construct.ray_from_number_float": lambda: Ray.from_number(1.0234),
+    "construct.rad_from_number_float": lambda: Rad.from_number(90000.5),
+    "convert.ray_from_wad": lambda: Ray(wad),
+    "convert.rad_from_wad": lambda: Rad(wad),
+    "convert.wad_from_ray": lambda: Wad(ray),
+    "convert.wad_from_rad": lambda: Wad(rad),
+    "add.wad": lambda: wad + other_wad,
+    "mul.wad_wad": lambda: wad * other_wad,
+    "mul.wad_ray": lambda: wad * ray,
+    "mul.wad_int": lambda: wad * 3,
+    "mul.ray_ray": lambda: ray * other_ray,
+    "mul.ray_wad": lambda: ray * wad,
+    "mul.rad_ray": lambda: rad * ray,
+    "mul.rad_wad": lambda: rad * wad,
+    "div.wad": lambda: wad / other_wad,
+    "div.ray": lambda: ray / other_ray,
+    "div.rad": lambda: rad / other_rad,
+    "str.wad": lambda: str(wad),
+    "str.ray": lambda: str(ray),
+    "str.rad": lambda: str(rad),
+    "compare.wad_lt": lambda: wad < other_wad,
+    "compare.wad_eq": lambda: wad == other_wad,
+    "hash.wad": lambda: hash(wad),
+    "hash.dict_lookup": lambda: wad_keys[wads[500]],
+    "hash.set_contains": lambda: wads[500] in wad_set,
+    "hash.build_set_1000": lambda: set(wads),
+    "sort.wads_1000": lambda: sorted(wads),
+    "can_liquidate.is_critical": is_critical,
+    "can_liquidate.delta_collateral": delta_collateral,
+    "array.is_critical_1000": lambda: (RayArray(locked_array) * liquidation_price
+                                       < RayArray(debt_array) * accumulated_rate),
+    "array.sum_1000": lambda: debt_array.sum(),
+}
+
+
+def measure_allocations(function, number: int) -> dict:
+    # Results are kept, so what they hold is counted; the list holding them is allocated upfront, so it is not
+    results = [None] * number
+    blocks = sys.getallocatedblocks()
+    for index in range(number):
+        results[index] = function()
+    blocks = sys.getallocatedblocks() - blocks
+
+    results = [None] * number
+    tracemalloc.start()
+    for index in range(number):
+        results[index] = function()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"blocks_per_op": blocks / number, "bytes_per_op": size / number}
+
+
+def commit():
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def measure(function, number: int, repeat: int) -> dict:
+    seconds = min(timeit.repeat(function, number=number, repeat=repeat)) / number
+    return dict({"ops_per_second": 1 / seconds, "seconds_per_op": seconds},
+                **measure_allocations(function, min(number, 1000)))
+
+
+def compare(report: dict, baseline: dict):
+    for name in sorted(report["benchmarks"].keys() & baseline["benchmarks"].keys()):
+        current, previous = report["benchmarks"][name], baseline["benchmarks"][name]
+        change = current["ops_per_second"] / previous["ops_per_second"] - 1
+        print(f"{name:35} {previous['ops_per_second']:>14,.0f} -> {current['ops_per_second']:>14,.0f} ops/s"
+              f" {change:+7.1%}   {previous['blocks_per_op']:>7.2f} -> {current['blocks_per_op']:>7.2f} blocks/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the speed and allocations of pyflex.numeric")
+    parser.add_argument("--number", type=int, default=20000, help="Number of operations per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of each benchmark")
+    parser.add_argument("--filter", nargs="*", help="Run only the benchmarks whose name contains one of these")
+    parser.add_argument("--output", help="Write the report as json to this file")
+    parser.add_argument("--compare", help="Report file to compare the results with")
+    arguments = parser.parse_args()
+
+    report = {"python": platform.python_version(), "commit": commit(), "benchmarks": {}}
+    for name, function in BENCHMARKS.items():
+        if arguments.filter and not any(part in name for part in arguments.filter):
+            continue
+        # Benchmarks over whole collections get fewer operations per run
+        number = arguments.number // 1000 if name.endswith("_1000") else arguments.number
+        result = measure(function, max(number, 1), arguments.repeat)
+        report["benchmarks"][name] = result
+        print(f"{name:35} {result['ops_per_second']:>14,.0f} ops/s {result['seconds_per_op'] * 1e6:>12.3f} us/op"
+              f" {result['blocks_per_op']:>8.2f} blocks/op {result['bytes_per_op']:>10.1f} bytes/op")
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare(report, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
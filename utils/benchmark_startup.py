@@ -0,0 +1,177 @@
+""" Measure the startup cost of pyflex: import time, ABI loading and deployment construction
+
+Deployment construction runs against a local stand-in JSON-RPC server (`pyflex.replay.ReplayServer`), serving
+responses recorded once from a node, so results are comparable between runs and machines. `--latency` adds a fixed
+delay to each HTTP request, to see how startup behaves with a remote node.
+
+    # record the responses a deployment is built from, once
+    python utils/benchmark_startup.py --record $ETH_RPC_URL --responses startup.json config/rai-mainnet-addresses.json
+
+    # benchmark against them, and compare with an earlier report
+    python utils/benchmark_startup.py --responses startup.json --output report.json --compare baseline.json \\
+        config/rai-mainnet-addresses.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from web3 import Web3
+
+from pyflex import web3_via_http
+from pyflex.deployment import GfDeployment
+from pyflex.replay import RecordingProvider, ReplayServer, load_recording
+
+IMPORT_SNIPPET = """
+import resource, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+ABI_SNIPPET = """
+import time
+import pyflex.deployment
+from pyflex import Contract
+from pyflex.abiregistry import LazyResource
+
+def subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from subclasses(subclass)
+
+resources = {(attribute.package, attribute.resource): attribute for cls in subclasses(Contract)
+             for attribute in vars(cls).values() if isinstance(attribute, LazyResource)}
+started = time.perf_counter()
+for attribute in resources.values():
+    attribute.__get__(None, None)
+print(time.perf_counter() - started, len(resources))
+"""
+
+
+def measure_imports(modules: list, repeat: int) -> dict:
+    result = {}
+    for module in modules:
+        runs = [subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(module=module)], check=True,
+                               capture_output=True, text=True).stdout.split() for _ in range(repeat)]
+        seconds = [float(run[0]) for run in runs]
+        result[module] = {"min_seconds": min(seconds), "median_seconds": statistics.median(seconds),
+                          "max_rss_kb": max(int(run[1]) for run in runs)}
+
+    return result
+
+
+def measure_abi_load(repeat: int) -> dict:
+    runs = [subprocess.run([sys.executable, '-c', ABI_SNIPPET], check=True,
+                           capture_output=True, text=True).stdout.split() for _ in range(repeat)]
+    seconds = [float(run[0]) for run in runs]
+    return {"resources": int(runs[0][1]), "min_seconds": min(seconds), "median_seconds": statistics.median(seconds)}
+
+
+def count_requests(web3: Web3, on_request):
+    """Calls `on_request(method, params, response, seconds)` for every request made to the provider."""
+    make_request = web3.provider.make_request
+
+    def timed_make_request(method, params):
+        started = time.perf_counter()
+        response = make_request(method, params)
+        on_request(method, params, response, time.perf_counter() - started)
+        return response
+
+    web3.provider.make_request = timed_make_request
+
+
+def measure_deployment(endpoint_uri: str, max_batch_size, addresses_path: str, trusted: bool) -> dict:
+    web3 = web3_via_http(endpoint_uri, max_batch_size=max_batch_size)
+    requests = defaultdict(list)
+    count_requests(web3, lambda method, params, response, seconds: requests[method].append(seconds))
+
+    started = time.perf_counter()
+    GfDeployment.from_file(web3, addresses_path, trusted)
+    seconds = time.perf_counter() - started
+
+    # Tracing allocations slows everything down, so the memory is measured in a separate run
+    tracemalloc.start()
+    GfDeployment.from_file(web3_via_http(endpoint_uri, max_batch_size=max_batch_size), addresses_path, trusted)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": seconds,
+            "peak_memory_bytes": peak_memory,
+            "rpc_count": sum(len(latencies) for latencies in requests.values()),
+            "rpc_seconds": sum(sum(latencies) for latencies in requests.values()),
+            "rpc": {method: {"count": len(latencies), "total_seconds": sum(latencies),
+                             "mean_seconds": statistics.mean(latencies)}
+                    for method, latencies in sorted(requests.items())}}
+
+
+def record(endpoint_uri: str, addresses_path: str, responses_path: str):
+    web3 = web3_via_http(endpoint_uri)
+    web3.provider = RecordingProvider(web3.provider)
+    GfDeployment.from_file(web3, addresses_path)
+
+    web3.provider.save(responses_path)
+    print(f"Recorded {len(web3.provider.recording)} responses to {responses_path}")
+
+
+def flatten(report: dict, prefix: str = "") -> dict:
+    values = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            values[f"{prefix}{key}"] = value
+
+    return values
+
+
+def compare(report: dict, baseline: dict):
+    current, previous = flatten(report), flatten(baseline)
+    for key in sorted(current.keys() & previous.keys()):
+        change = f"{(current[key] - previous[key]) / previous[key]:+.1%}" if previous[key] else ""
+        print(f"{key:60} {previous[key]:>14.6g} -> {current[key]:>14.6g} {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup cost of pyflex")
+    parser.add_argument("addresses", help="Deployment addresses file, e.g. config/rai-mainnet-addresses.json")
+    parser.add_argument("--responses", required=True, help="File with the recorded node responses")
+    parser.add_argument("--record", metavar="ETH_RPC_URL", help="Record the responses from this node and exit")
+    parser.add_argument("--output", help="Write the report as json to this file")
+    parser.add_argument("--compare", help="Report file to compare the results with")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of each import measurement")
+    parser.add_argument("--max-batch-size", type=int, help="Batch concurrent requests, see `BatchingHTTPProvider`")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Delay of each HTTP request to the stand-in, in seconds")
+    parser.add_argument("--trusted", action="store_true", help="Skip address validation of the deployment")
+    arguments = parser.parse_args()
+
+    if arguments.record:
+        record(arguments.record, arguments.addresses, arguments.responses)
+        return
+
+    with ReplayServer(load_recording(arguments.responses), latency=arguments.latency) as server:
+        deployment = measure_deployment(server.endpoint_uri, arguments.max_batch_size, arguments.addresses,
+                                        arguments.trusted)
+
+    report = {"python": platform.python_version(),
+              "imports": measure_imports(["pyflex", "pyflex.deployment"], arguments.repeat),
+              "abi_load": measure_abi_load(arguments.repeat),
+              "deployment": deployment}
+
+    print(json.dumps(report, indent=2))
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare(report, json.load(file))
+
+
+if __name__ == '__main__':
+    main()